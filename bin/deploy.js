@@ -3,6 +3,8 @@
 const { spawn } = require('child_process');
 const path = require('path');
 const fs = require('fs');
+const net = require('net');
+const os = require('os');
 
 // Determine paths
 const projectRoot = path.resolve(__dirname, '..');
@@ -23,15 +25,148 @@ if (process.platform === 'win32' && fs.existsSync(venvPythonWin)) {
 // Arguments passed to this script
 const args = process.argv.slice(2);
 
-console.log(`🚀 Deployment Automation (Wrapper)`);
+// On stderr: stdout carries the command's own output ($(deploy -o quiet outputs NAME), -o json)
+console.error(`🚀 Deployment Automation (Wrapper)`);
 // console.log(`Debug: Using Python at: ${pythonPath}`);
 
-const child = spawn(pythonPath, [srcCli, ...args], {
-  stdio: 'inherit',
-  cwd: projectRoot,
-  shell: false
-});
+// Opt-in: talk to a resident Python worker instead of starting Python each time
+const useDaemon = process.env.DEPLOY_DAEMON && process.env.DEPLOY_DAEMON !== '0' && process.platform !== 'win32';
 
-child.on('exit', (code) => {
-  process.exit(code);
-});
+// Must match worker.socket_dir() / worker.default_socket_path()
+const uid = process.getuid ? process.getuid() : null;
+const socketDir = process.env.XDG_RUNTIME_DIR || path.join(os.tmpdir(), `ctrl-alt-deploy-${uid}`);
+const socketPath = process.env.DEPLOY_DAEMON_SOCKET || path.join(socketDir, 'ctrl-alt-deploy.sock');
+
+const WORKER_START_TIMEOUT_MS = 15000;
+const WORKER_RETRY_MS = 50;
+
+// Piped input, read before talking to the worker (null: stdin is a terminal)
+let stdinData = null;
+
+// Same check as worker.ensure_private_dir(): another user must not be able to create the socket
+function isPrivateDir(dir) {
+  try {
+    fs.mkdirSync(dir, { mode: 0o700 });
+  } catch (e) {
+    if (e.code !== 'EEXIST') return false;
+  }
+  const stat = fs.lstatSync(dir);
+  return stat.isDirectory() && stat.uid === uid && (stat.mode & 0o077) === 0;
+}
+
+// true: our socket, false: someone else's (never connect), null: no socket yet
+function socketOwnership() {
+  try {
+    const stat = fs.lstatSync(socketPath);
+    return stat.isSocket() && stat.uid === uid;
+  } catch (e) {
+    return e.code === 'ENOENT' ? null : false;
+  }
+}
+
+function runDirect() {
+  // stdin was already read for the worker: hand it over instead of inheriting
+  const child = spawn(pythonPath, [srcCli, ...args], {
+    stdio: [stdinData === null ? 'inherit' : 'pipe', 'inherit', 'inherit'],
+    cwd: projectRoot,
+    shell: false
+  });
+  if (stdinData !== null) {
+    child.stdin.end(stdinData);
+  }
+
+  child.on('exit', (code) => {
+    process.exit(code);
+  });
+}
+
+function startWorker() {
+  const worker = spawn(pythonPath, [srcCli, 'worker', '--socket', socketPath], {
+    detached: true,
+    stdio: 'ignore',
+    cwd: projectRoot,
+    shell: false
+  });
+  worker.unref();
+}
+
+function connect(onConnected, onError) {
+  if (socketOwnership() === false) {
+    console.error(`⚠️  ${socketPath} is not a socket owned by you, running without the worker`);
+    runDirect();
+    return;
+  }
+  const client = net.createConnection(socketPath);
+  client.once('connect', () => onConnected(client));
+  client.once('error', onError);
+}
+
+function runInWorker(client) {
+  // Same working directory as the direct mode, so relative spec paths behave the same
+  client.write(JSON.stringify({
+    argv: args,
+    cwd: projectRoot,
+    stdin: stdinData || '',
+    tty: Boolean(process.stdout.isTTY)
+  }) + '\n');
+
+  let buffer = '';
+  let exitCode = null;
+
+  client.on('data', (chunk) => {
+    buffer += chunk.toString('utf8');
+    let newline;
+    while ((newline = buffer.indexOf('\n')) >= 0) {
+      const frame = JSON.parse(buffer.slice(0, newline));
+      buffer = buffer.slice(newline + 1);
+      if (frame.stream === 'stderr') {
+        process.stderr.write(frame.data);
+      } else if (frame.stream === 'stdout') {
+        process.stdout.write(frame.data);
+      } else if ('exit' in frame) {
+        exitCode = frame.exit;
+      }
+    }
+  });
+
+  client.on('close', () => {
+    process.exit(exitCode === null ? 1 : exitCode);
+  });
+}
+
+function runWithDaemon() {
+  connect(runInWorker, () => {
+    // No worker yet: start one and wait for its socket
+    startWorker();
+    const deadline = Date.now() + WORKER_START_TIMEOUT_MS;
+
+    const retry = () => {
+      connect(runInWorker, () => {
+        if (Date.now() > deadline) {
+          console.error('⚠️  Deploy worker did not start, running without it');
+          runDirect();
+        } else {
+          setTimeout(retry, WORKER_RETRY_MS);
+        }
+      });
+    };
+    retry();
+  });
+}
+
+if (!useDaemon) {
+  runDirect();
+} else if (!process.env.DEPLOY_DAEMON_SOCKET && !isPrivateDir(socketDir)) {
+  console.error(`⚠️  ${socketDir} is not a private directory (0700, owned by you), running without the worker`);
+  runDirect();
+} else if (process.stdin.isTTY) {
+  runWithDaemon();
+} else {
+  // Forward piped input, so commands behave as they do without the worker
+  const chunks = [];
+  process.stdin.on('data', (chunk) => chunks.push(chunk));
+  process.stdin.on('end', () => {
+    stdinData = Buffer.concat(chunks).toString('utf8');
+    runWithDaemon();
+  });
+}
@@ -1,28 +1,191 @@
 import typer
+import json
 import sys
+import time
 from pathlib import Path
-from rich.console import Console
+from typing import List
 from orchestrator import DeploymentOrchestrator
+from fleet import FleetDeployer, DEFAULT_WORKSPACES_ROOT
+from drift import DriftDetector, discover_workspaces, default_workspaces, DRIFTED, FAILED, DEFAULT_TTL, DEFAULT_PARALLELISM
+from infrastructure.executors.runners import RecordingRunner, ReplayRunner
+from infrastructure.executors.retry import RetryPolicy
+from infrastructure.timing_store import TimingStore
+from infrastructure.inventory import Inventory
+from infrastructure.workspace import Workspace, PLAN_SUMMARY_FILE, INVENTORY_FILE
+from utils.events import configure, emit, emit_table, SINKS, INFO, DETAIL, WARNING, ERROR, OUTPUT
 
 # Add current directory to path to ensure imports work if run directly
 sys.path.insert(0, str(Path(__file__).parent))
 
 app = typer.Typer(help="🚀 Deployment Automation CLI")
-console = Console()
+
+@app.callback()
+def main(
+    output: str = typer.Option("rich", "--output", "-o", help=f"Progress output: {', '.join(SINKS)} (json = one event per line)")
+):
+    if output not in SINKS:
+        raise typer.BadParameter(f"must be one of: {', '.join(SINKS)}", param_hint="--output")
+    configure(output)
 
 @app.command()
 def run(
-    spec_file: str = typer.Argument(..., help="Path to the deployment specification file (JSON/YAML)")
+    spec_files: List[str] = typer.Argument(..., help="Deployment specification file(s) (JSON/YAML)"),
+    workers: int = typer.Option(None, "--workers", min=1, help="Fleet mode: deploy several specs in parallel, each in its own workspace"),
+    workspaces_root: str = typer.Option(DEFAULT_WORKSPACES_ROOT, "--workspaces-root", help="Fleet mode: parent directory of the per-spec workspaces"),
+    force: bool = typer.Option(False, "--force", help="Run Terraform even if nothing changed since the last deployment"),
+    only: str = typer.Option(None, "--only", help="Comma-separated services to deploy (their dependencies are included)"),
+    record: str = typer.Option(None, "--record", help="Record Terraform commands into a cassette file"),
+    replay: str = typer.Option(None, "--replay", help="Replay Terraform commands from a cassette file instead of running them"),
+    replay_time_scale: float = typer.Option(1.0, "--replay-time-scale", help="Multiplier for recorded durations when replaying (0 = no waiting)"),
+    retries: int = typer.Option(3, "--retries", min=0, help="Retries for throttled or transient Terraform failures")
 ):
     """
-    Run the full deployment pipeline from a spec file.
+    Run the full deployment pipeline from one or more spec files.
     """
-    orchestrator = DeploymentOrchestrator()
-    success = orchestrator.run(spec_file)
+    services = [name.strip() for name in only.split(",") if name.strip()] if only else None
+    fleet_mode = len(spec_files) > 1 or workers is not None
+
+    runner = None
+    if replay:
+        runner = ReplayRunner(replay, time_scale=replay_time_scale, echo=not fleet_mode)
+    elif record:
+        runner = RecordingRunner(record)
+    retry_policy = RetryPolicy(max_attempts=retries + 1)
+
+    if fleet_mode:
+        fleet = FleetDeployer(
+            workers=workers or 1,
+            workspaces_root=workspaces_root,
+            runner=runner,
+            retry_policy=retry_policy
+        )
+        results = fleet.run(spec_files, force=force, only=services)
+        success = all(result.success for result in results)
+    else:
+        orchestrator = DeploymentOrchestrator(runner=runner, retry_policy=retry_policy)
+        success = orchestrator.run(spec_files[0], force=force, only=services)
     
     if not success:
         raise typer.Exit(code=1)
 
+@app.command()
+def resume(
+    workspace_dir: str = typer.Option("terraform_output", "--workspace", help="Workspace of the deployment to resume"),
+    replay: str = typer.Option(None, "--replay", help="Replay Terraform commands from a cassette file instead of running them"),
+    retries: int = typer.Option(3, "--retries", min=0, help="Retries for throttled or transient Terraform failures")
+):
+    """
+    Continue the last deployment of a workspace, skipping the stages that are still valid.
+    """
+    request = Workspace(workspace_dir).checkpoints().get("run")
+    if not request:
+        emit("resume.nothing", f"Nothing to resume in {workspace_dir}: no deployment was started there.", ERROR)
+        raise typer.Exit(code=1)
+
+    orchestrator = DeploymentOrchestrator(
+        output_dir=workspace_dir,
+        runner=ReplayRunner(replay) if replay else None,
+        retry_policy=RetryPolicy(max_attempts=retries + 1)
+    )
+    success = orchestrator.run(request["spec_path"], only=request.get("only"), resume=True)
+
+    if not success:
+        raise typer.Exit(code=1)
+
+@app.command()
+def bake(
+    spec_file: str = typer.Argument(..., help="Deployment specification file (JSON/YAML)"),
+    only: str = typer.Option(None, "--only", help="Comma-separated EC2 services to bake (default: all)"),
+    force: bool = typer.Option(False, "--force", help="Rebuild even if images.lock.json has an image for the current definition"),
+    workspace_dir: str = typer.Option("terraform_output", "--workspace", help="Workspace where the Packer definitions are written"),
+    replay: str = typer.Option(None, "--replay", help="Replay Packer commands from a cassette file instead of running them")
+):
+    """
+    Build golden images (Docker and the service image pre-installed) and lock their AMIs.
+    """
+    services = [name.strip() for name in only.split(",") if name.strip()] if only else None
+    orchestrator = DeploymentOrchestrator(output_dir=workspace_dir, runner=ReplayRunner(replay) if replay else None)
+    if not orchestrator.bake(spec_file, only=services, force=force):
+        raise typer.Exit(code=1)
+
+@app.command()
+def history(
+    workspace_dir: str = typer.Option("terraform_output", "--workspace", help="Deployed workspace")
+):
+    """
+    List the applied generations of a workspace (for 'deploy rollback').
+    """
+    generations = Workspace(workspace_dir).generations()
+    if not generations:
+        emit("history.empty", f"No applied generation in {workspace_dir} yet.", WARNING)
+        return
+
+    rows = []
+    for generation in reversed(generations):
+        applied_at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(generation["applied_at"]))
+        source = f"rollback to {generation['rollback_of']}" if generation.get("rollback_of") else generation.get("spec_path") or "-"
+        rows.append([generation["number"], applied_at, generation["tree"][:12], source])
+    emit_table("history.generations", f"🗃  Generations of {workspace_dir}", ["Generation", "Applied", "Tree", "Source"], rows)
+
+@app.command()
+def rollback(
+    generation: int = typer.Argument(..., help="Generation to restore (see 'deploy history')"),
+    workspace_dir: str = typer.Option("terraform_output", "--workspace", help="Deployed workspace"),
+    plan_only: bool = typer.Option(False, "--plan-only", help="Restore and plan, but do not apply"),
+    replay: str = typer.Option(None, "--replay", help="Replay Terraform commands from a cassette file instead of running them"),
+    retries: int = typer.Option(3, "--retries", min=0, help="Retries for throttled or transient Terraform failures")
+):
+    """
+    Restore a previously applied configuration and apply it, without regenerating.
+    """
+    orchestrator = DeploymentOrchestrator(
+        output_dir=workspace_dir,
+        runner=ReplayRunner(replay) if replay else None,
+        retry_policy=RetryPolicy(max_attempts=retries + 1)
+    )
+    if not orchestrator.rollback(generation, plan_only=plan_only):
+        raise typer.Exit(code=1)
+
+@app.command()
+def drift(
+    workspace_dirs: List[str] = typer.Argument(None, help=f"Workspaces to check (default: terraform_output and every workspace under {DEFAULT_WORKSPACES_ROOT})"),
+    workspaces_root: str = typer.Option(None, "--workspaces-root", help="Only check the per-spec workspaces under this directory"),
+    workers: int = typer.Option(4, "--workers", min=1, help="Workspaces checked at the same time"),
+    ttl: float = typer.Option(DEFAULT_TTL, "--ttl", min=0, help="Reuse a result younger than this many seconds if nothing changed (0 = always check)"),
+    parallelism: int = typer.Option(DEFAULT_PARALLELISM, "--parallelism", min=1, help="Concurrent API calls per workspace refresh"),
+    start_interval: float = typer.Option(0.0, "--start-interval", min=0, help="Minimum seconds between two refresh starts across the fleet"),
+    replay: str = typer.Option(None, "--replay", help="Replay Terraform commands from a cassette file instead of running them"),
+    retries: int = typer.Option(3, "--retries", min=0, help="Retries for throttled or transient Terraform failures")
+):
+    """
+    Check deployed workspaces for drift (exit code 2 if any drifted, 1 on errors).
+    """
+    if workspace_dirs:
+        workspaces = workspace_dirs
+    elif workspaces_root:
+        workspaces = discover_workspaces(workspaces_root)
+    else:
+        workspaces = default_workspaces()
+    if not workspaces:
+        where = workspaces_root or f"terraform_output or {DEFAULT_WORKSPACES_ROOT}"
+        emit("drift.empty", f"No workspaces to check under {where}.", WARNING)
+        return
+
+    detector = DriftDetector(
+        workers=workers,
+        ttl=ttl,
+        parallelism=parallelism,
+        start_interval=start_interval,
+        runner=ReplayRunner(replay, echo=False) if replay else None,
+        retry_policy=RetryPolicy(max_attempts=retries + 1)
+    )
+    results = detector.run(workspaces)
+
+    if any(result.status == DRIFTED for result in results):
+        raise typer.Exit(code=2)
+    if any(result.status == FAILED for result in results):
+        raise typer.Exit(code=1)
+
 @app.command()
 def validate(
     spec_file: str = typer.Argument(..., help="Path to the deployment specification file")
@@ -36,5 +199,150 @@ def validate(
     if not success:
         raise typer.Exit(code=1)
 
+@app.command()
+def stats(
+    spec_file: str = typer.Argument(None, help="Only use the history of this spec"),
+    workspace_dir: str = typer.Option("terraform_output", "--workspace", help="Workspace whose last plan gets an apply-time prediction"),
+    by_service: bool = typer.Option(False, "--by-service", help="Group resource durations by service instead of resource type")
+):
+    """
+    Show where deployment time goes (p50/p95) and predict the pending apply.
+    """
+    store = TimingStore()
+    spec = str(Path(spec_file).resolve()) if spec_file else None
+    stages = store.stage_stats(spec)
+    if not stages:
+        emit("stats.empty", "No deployment timings recorded yet. Run 'deploy run' first.", WARNING)
+        return
+
+    columns = ["Samples", "p50", "p95"]
+    emit_table(
+        "stats.stages", "⏱  Stages", ["Stage"] + columns,
+        [[s.key, s.count, f"{s.p50:.1f}s", f"{s.p95:.1f}s"] for s in stages]
+    )
+    resources = store.resource_stats(spec, by="service" if by_service else "resource_type")
+    if resources:
+        emit_table(
+            "stats.resources", "⏱  Resource creation", ["Service" if by_service else "Resource type"] + columns,
+            [[s.key, s.count, f"{s.p50:.1f}s", f"{s.p95:.1f}s"] for s in resources]
+        )
+
+    summary = Workspace(workspace_dir).read_json(PLAN_SUMMARY_FILE)
+    if summary and summary.get("resource_types"):
+        prediction = store.predict(summary["resource_types"])
+        emit(
+            "stats.prediction",
+            f"🔮 Pending plan in {workspace_dir}: {prediction.resources} change(s), "
+            f"apply expected in ~{prediction.p50:.0f}s (p95 {prediction.p95:.0f}s)",
+            INFO,
+            p50=round(prediction.p50, 1),
+            p95=round(prediction.p95, 1),
+            unknown_types=prediction.unknown_types
+        )
+        if prediction.unknown_types:
+            emit("stats.prediction", f"   No history yet for: {', '.join(prediction.unknown_types)}", DETAIL)
+
+def _open_inventory(workspace_dir: str, refresh: bool) -> Inventory:
+    """Inventory of a workspace, rebuilt first with --refresh; exits if there is none."""
+    if refresh and not DeploymentOrchestrator(output_dir=workspace_dir).refresh_inventory():
+        raise typer.Exit(code=1)
+
+    inventory = Inventory(Workspace(workspace_dir).metadata_dir / INVENTORY_FILE)
+    if not inventory.exists():
+        emit("inventory.missing", f"No inventory in {workspace_dir} yet. Run 'deploy run', or pass --refresh.", ERROR)
+        raise typer.Exit(code=1)
+    return inventory
+
+def _format_value(value) -> str:
+    return value if isinstance(value, str) else json.dumps(value)
+
+@app.command()
+def status(
+    service: str = typer.Option(None, "--service", help="Only show the resources of this service"),
+    resource_type: str = typer.Option(None, "--type", help="Only show resources of this type (e.g. aws_instance)"),
+    resource_id: str = typer.Option(None, "--id", help="Find the resource with this cloud ID"),
+    workspace_dir: str = typer.Option("terraform_output", "--workspace", help="Deployed workspace"),
+    refresh: bool = typer.Option(False, "--refresh", help="Rebuild the inventory from the current state first")
+):
+    """
+    List the deployed resources, from the local inventory (no Terraform call).
+    """
+    inventory = _open_inventory(workspace_dir, refresh)
+    info = inventory.info()
+    resources = inventory.resources(service=service, resource_type=resource_type, resource_id=resource_id)
+
+    if not resources:
+        emit("status.empty", f"No matching resources in {workspace_dir}.", WARNING)
+        return
+
+    serial = f" (state serial {info['serial']})" if info.get("serial") is not None else ""
+    emit_table(
+        "status.resources",
+        f"🗂  Resources in {workspace_dir}{serial}",
+        ["Service", "Type", "Address", "ID"],
+        [[r["service"], r["resource_type"], r["address"], r["resource_id"] or "-"] for r in resources],
+        serial=info.get("serial"),
+        updated_at=info.get("updated_at")
+    )
+
+@app.command()
+def outputs(
+    name: str = typer.Argument(None, help="Print only the value of this output"),
+    service: str = typer.Option(None, "--service", help="Only show the outputs of this service"),
+    workspace_dir: str = typer.Option("terraform_output", "--workspace", help="Deployed workspace"),
+    refresh: bool = typer.Option(False, "--refresh", help="Rebuild the inventory from the current state first")
+):
+    """
+    Show the Terraform outputs (ALB DNS, DB endpoints, ...) from the local inventory.
+    """
+    inventory = _open_inventory(workspace_dir, refresh)
+
+    if name:
+        output = inventory.output(name)
+        if output is None:
+            emit("outputs.missing", f"No output named '{name}' in {workspace_dir}.", ERROR)
+            raise typer.Exit(code=1)
+        if output["sensitive"]:
+            emit("outputs.sensitive", f"'{name}' is sensitive; read it with 'terraform output {name}'.", WARNING)
+            raise typer.Exit(code=1)
+        # Raw value on its own line, for scripts: $(deploy outputs backend_lb_dns)
+        emit("outputs.value", _format_value(output["value"]) + "\n", OUTPUT, name=name, value=output["value"])
+        return
+
+    rows = inventory.outputs(service=service)
+    emit_table(
+        "outputs.list",
+        f"📤 Outputs of {workspace_dir}",
+        ["Service", "Name", "Value"],
+        [[o["service"], o["name"], "(sensitive)" if o["sensitive"] else _format_value(o["value"])] for o in rows]
+    )
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", "--host", help="Address to listen on"),
+    port: int = typer.Option(8765, "--port", help="TCP port to listen on"),
+    socket_path: str = typer.Option(None, "--socket", help="Listen on this Unix socket instead of TCP"),
+    workers: int = typer.Option(1, "--workers", min=1, help="Jobs running at the same time"),
+    workspaces_root: str = typer.Option(DEFAULT_WORKSPACES_ROOT, "--workspaces-root", help="Parent directory of the per-spec workspaces")
+):
+    """
+    Keep a warm deploy process running and accept jobs over HTTP.
+    """
+    from server import serve as start_server
+
+    start_server(host=host, port=port, socket_path=socket_path, workers=workers, workspaces_root=workspaces_root)
+
+@app.command(hidden=True)
+def worker(
+    socket_path: str = typer.Option(None, "--socket", help="Unix socket to listen on (default: DEPLOY_DAEMON_SOCKET or a per-user temp path)"),
+    idle_timeout: float = typer.Option(900, "--idle-timeout", help="Exit after this many seconds without a command")
+):
+    """
+    Resident worker used by the Node wrapper when DEPLOY_DAEMON=1.
+    """
+    from worker import serve_worker
+
+    serve_worker(socket_path, idle_timeout)
+
 if __name__ == "__main__":
     app()
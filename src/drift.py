@@ -0,0 +1,274 @@
+"""
+Drift detection across many deployment workspaces.
+
+`deploy drift` runs `terraform plan -refresh-only -detailed-exitcode` in each
+workspace and reports the resources whose real configuration no longer
+matches the state. A refresh reads every resource from the AWS API, so:
+
+- a bounded worker pool checks several workspaces at a time
+- each workspace's refresh runs with a capped -parallelism, and plan starts
+  are spaced out across the fleet, to stay under the API rate limits
+- results are cached in the workspace (`.deploy/drift.json`) and reused for
+  `ttl` seconds as long as the generated files and the state did not change
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from fleet import DEFAULT_WORKSPACES_ROOT
+from infrastructure.executors.plan_analyzer import PlanAnalyzer
+from infrastructure.executors.runners import CommandRunner, SubprocessRunner
+from infrastructure.executors.retry import RetryPolicy
+from infrastructure.executors.terraform_executor import TerraformExecutor
+from infrastructure.workspace import (
+    Workspace, WorkspaceLockedError, LOG_FILE, DRIFT_FILE, DRIFT_LOG_FILE, RESOURCES_FILE
+)
+from utils.events import emit, emit_table, bind, BANNER, WARNING
+
+DEFAULT_TTL = 900.0
+DEFAULT_PARALLELISM = 4
+DEFAULT_OUTPUT_DIR = "terraform_output"  # Workspace of `deploy run` without --workers
+
+# Result statuses
+CLEAN = "clean"
+DRIFTED = "drifted"
+FAILED = "error"
+BUSY = "busy"  # Workspace locked by a running deployment
+
+
+def discover_workspaces(root: str | Path) -> list[Path]:
+    """Directories under root that hold generated Terraform files."""
+    root = Path(root)
+    if not root.is_dir():
+        return []
+    return sorted(path for path in root.iterdir() if path.is_dir() and any(path.glob("*.tf")))
+
+
+def default_workspaces(
+    output_dir: str | Path = DEFAULT_OUTPUT_DIR,
+    workspaces_root: str | Path = DEFAULT_WORKSPACES_ROOT
+) -> list[Path]:
+    """Workspaces checked when none is given: the `deploy run` workspace, then every fleet workspace."""
+    output_dir = Path(output_dir)
+    single = [output_dir] if output_dir.is_dir() and any(output_dir.glob("*.tf")) else []
+    return single + discover_workspaces(workspaces_root)
+
+
+def parse_drift_log(path: str | Path) -> list[dict]:
+    """
+    Drifted resources of a `terraform plan -refresh-only -json` log:
+    one {"address", "resource_type", "action"} per drifted resource (the log
+    holds every attempt, so a resource may be reported more than once).
+    """
+    drifted = {}
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if '"resource_drift"' not in line:
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            change = event.get("change") or {}
+            resource = change.get("resource") or {}
+            if event.get("type") != "resource_drift":
+                continue
+            drifted[resource.get("addr", "")] = {
+                "address": resource.get("addr", ""),
+                "resource_type": resource.get("resource_type", ""),
+                "action": change.get("action", ""),
+            }
+    return list(drifted.values())
+
+
+class StartLimiter:
+    """Space out the starts of rate-limited operations by at least `interval` seconds."""
+
+    def __init__(self, interval: float):
+        self.interval = max(0.0, interval)
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class DriftResult:
+    """Drift status of one workspace."""
+
+    def __init__(
+        self,
+        workspace: Path,
+        status: str,
+        resources: list[dict] | None = None,
+        checked_at: float | None = None,
+        duration: float = 0.0,
+        cached: bool = False,
+        error: str | None = None
+    ):
+        self.workspace = workspace
+        self.status = status
+        self.resources = resources or []
+        self.checked_at = checked_at or time.time()
+        self.duration = duration
+        self.cached = cached
+        self.error = error
+
+    @property
+    def services(self) -> list[str]:
+        return sorted({resource["service"] for resource in self.resources})
+
+    def to_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "resources": self.resources,
+            "checked_at": self.checked_at,
+            "duration": self.duration,
+        }
+
+
+class DriftDetector:
+    """
+    Check many workspaces for drift.
+
+    Args:
+        workers: Maximum number of workspaces checked at the same time
+        ttl: Seconds a cached result stays valid (0 = always check)
+        parallelism: -parallelism of each refresh (concurrent API calls per workspace)
+        start_interval: Minimum seconds between two plan starts across the fleet
+        runner: Shared command runner (defaults to one quiet SubprocessRunner
+            per workspace, logging to its .deploy/terraform.log)
+        retry_policy: Retry policy passed to every executor
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        ttl: float = DEFAULT_TTL,
+        parallelism: int = DEFAULT_PARALLELISM,
+        start_interval: float = 0.0,
+        runner: CommandRunner | None = None,
+        retry_policy: RetryPolicy | None = None
+    ):
+        self.workers = max(1, workers)
+        self.ttl = ttl
+        self.parallelism = parallelism
+        self.limiter = StartLimiter(start_interval)
+        self.runner = runner
+        self.retry_policy = retry_policy
+
+    def run(self, workspace_dirs: list[str | Path]) -> list[DriftResult]:
+        emit(
+            "drift.start",
+            f"🔎 Drift check: {len(workspace_dirs)} workspace(s), {self.workers} worker(s)",
+            BANNER,
+            workspaces=len(workspace_dirs),
+            workers=self.workers
+        )
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self.check, Path(path)) for path in workspace_dirs]
+            results = [future.result() for future in futures]
+
+        self.print_report(results)
+        return results
+
+    def cached(self, workspace: Workspace) -> DriftResult | None:
+        """Last result, if younger than the TTL and the files and state did not change since."""
+        if self.ttl <= 0:
+            return None
+        entry = workspace.read_json(DRIFT_FILE)
+        if not entry or entry.get("fingerprint") != workspace.fingerprint():
+            return None
+        if time.time() - entry.get("checked_at", 0) > self.ttl or entry.get("status") not in (CLEAN, DRIFTED):
+            return None
+        return DriftResult(
+            workspace.terraform_dir, entry["status"], entry.get("resources"), entry["checked_at"],
+            entry.get("duration", 0.0), cached=True
+        )
+
+    def check(self, workspace_dir: Path) -> DriftResult:
+        workspace = Workspace(workspace_dir)
+        with bind(workspace=str(workspace_dir)):
+            result = self.cached(workspace)
+            if result is not None:
+                return result
+
+            start = time.monotonic()
+            try:
+                with workspace.lock():
+                    result = self._check(workspace)
+            except WorkspaceLockedError:
+                return DriftResult(workspace_dir, BUSY, error="deployment in progress")
+            except Exception as e:
+                return DriftResult(workspace_dir, FAILED, error=str(e))
+            result.duration = time.monotonic() - start
+
+            if result.status in (CLEAN, DRIFTED):
+                workspace.write_json(DRIFT_FILE, {**result.to_dict(), "fingerprint": workspace.fingerprint()})
+            return result
+
+    def _check(self, workspace: Workspace) -> DriftResult:
+        runner = self.runner or SubprocessRunner(echo=False, log_path=workspace.metadata_dir / LOG_FILE)
+        executor = TerraformExecutor(workspace.terraform_dir, runner=runner, retry_policy=self.retry_policy)
+
+        if workspace.needs_init():
+            if not executor.init():
+                return DriftResult(workspace.terraform_dir, FAILED, error="terraform init failed")
+            workspace.record_init()
+
+        self.limiter.wait()
+        drift_log = workspace.metadata_dir / DRIFT_LOG_FILE
+        code = executor.plan_refresh_only(drift_log, parallelism=self.parallelism)
+        if code is None:
+            return DriftResult(workspace.terraform_dir, FAILED, error="terraform plan -refresh-only failed")
+
+        analyzer = PlanAnalyzer(workspace.read_json(RESOURCES_FILE))
+        resources = [
+            {**resource, "service": analyzer.service_for(resource["address"])}
+            for resource in (parse_drift_log(drift_log) if drift_log.exists() else [])
+        ]
+        # Exit code 2 with no drift event (e.g. only output changes) still counts as drift
+        status = DRIFTED if code == 2 or resources else CLEAN
+        return DriftResult(workspace.terraform_dir, status, resources)
+
+    @staticmethod
+    def print_report(results: list[DriftResult]) -> None:
+        rows = []
+        for result in results:
+            status = {CLEAN: "✓ clean", DRIFTED: "⚠ drifted", BUSY: "… busy"}.get(result.status, "✗ error")
+            if result.error:
+                status += f" ({result.error})"
+            age = time.time() - result.checked_at
+            checked = f"{age / 60:.0f}m ago (cached)" if result.cached else f"{result.duration:.1f}s"
+            rows.append([
+                str(result.workspace), status, len(result.resources), ", ".join(result.services) or "-", checked
+            ])
+        emit_table("drift.report", "🔎 Drift Report", ["Workspace", "Status", "Drifted", "Services", "Checked"], rows)
+
+        for result in results:
+            for resource in result.resources:
+                emit(
+                    "drift.resource",
+                    f"  ~ {result.workspace}: {resource['address']} ({resource['action']})",
+                    WARNING,
+                    workspace=str(result.workspace),
+                    **resource
+                )
+
+        counts = {status: sum(1 for r in results if r.status == status) for status in (CLEAN, DRIFTED, BUSY, FAILED)}
+        cached = sum(1 for r in results if r.cached)
+        emit(
+            "drift.completed",
+            f"{counts[CLEAN]} clean, {counts[DRIFTED]} drifted, {counts[BUSY]} busy, "
+            f"{counts[FAILED]} failed ({cached} from cache)",
+            BANNER,
+            success=counts[DRIFTED] == 0 and counts[FAILED] == 0,
+            cached=cached,
+            **counts
+        )
@@ -0,0 +1,117 @@
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from orchestrator import DeploymentOrchestrator
+from infrastructure.executors.runners import CommandRunner, SubprocessRunner
+from infrastructure.executors.retry import RetryPolicy
+from infrastructure.workspace import Workspace, LOG_FILE
+from utils.events import emit, emit_table, bind, BANNER
+
+DEFAULT_WORKSPACES_ROOT = "terraform_workspaces"
+
+
+def workspace_dir_for(spec_path: str | Path, root: str | Path = DEFAULT_WORKSPACES_ROOT) -> Path:
+    """
+    Working directory of a spec in fleet mode.
+
+    The directory is addressed by a hash of the spec's resolved path, so every
+    spec gets its own directory and Terraform state. Editing a spec keeps the
+    same directory (and state).
+    """
+    resolved = str(Path(spec_path).resolve())
+    digest = hashlib.sha256(resolved.encode("utf-8")).hexdigest()[:12]
+    return Path(root) / f"{Path(spec_path).stem}-{digest}"
+
+
+class FleetResult:
+    """Outcome of one spec in a fleet run."""
+
+    def __init__(self, spec_path: str, workspace: Path, success: bool, duration: float, error: str | None = None):
+        self.spec_path = spec_path
+        self.workspace = workspace
+        self.success = success
+        self.duration = duration
+        self.error = error
+
+
+class FleetDeployer:
+    """
+    Deploy many specs concurrently, each in its own locked workspace.
+
+    Args:
+        workers: Maximum number of deployments running at the same time
+        workspaces_root: Parent directory of the per-spec workspaces
+        runner: Shared command runner (defaults to one quiet SubprocessRunner
+            per spec, logging to the workspace's .deploy/terraform.log)
+        retry_policy: Retry policy passed to every executor
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        workspaces_root: str | Path = DEFAULT_WORKSPACES_ROOT,
+        runner: CommandRunner | None = None,
+        retry_policy: RetryPolicy | None = None
+    ):
+        self.workers = max(1, workers)
+        self.workspaces_root = Path(workspaces_root)
+        self.runner = runner
+        self.retry_policy = retry_policy
+
+    def run(self, spec_paths: list[str], force: bool = False, only: list[str] | None = None) -> list[FleetResult]:
+        emit(
+            "fleet.start",
+            f"🚢 Fleet deployment: {len(spec_paths)} spec(s), {self.workers} worker(s)",
+            BANNER,
+            specs=len(spec_paths),
+            workers=self.workers
+        )
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self._deploy_one, spec_path, force, only) for spec_path in spec_paths]
+            results = [future.result() for future in futures]
+
+        self.print_results(results)
+        return results
+
+    def _deploy_one(self, spec_path: str, force: bool, only: list[str] | None) -> FleetResult:
+        workspace_dir = workspace_dir_for(spec_path, self.workspaces_root)
+        runner = self.runner or SubprocessRunner(
+            echo=False,
+            log_path=Workspace(workspace_dir).metadata_dir / LOG_FILE
+        )
+        orchestrator = DeploymentOrchestrator(
+            output_dir=str(workspace_dir),
+            runner=runner,
+            retry_policy=self.retry_policy
+        )
+
+        start = time.monotonic()
+        # Tag every event of this deployment with its spec, so interleaved output can be split
+        with bind(spec=spec_path):
+            try:
+                success = orchestrator.run(spec_path, force=force, only=only)
+                error = None
+            except Exception as e:
+                success, error = False, str(e)
+        return FleetResult(spec_path, workspace_dir, success, time.monotonic() - start, error)
+
+    @staticmethod
+    def print_results(results: list[FleetResult]) -> None:
+        rows = []
+        for result in results:
+            status = "✓ deployed" if result.success else "✗ failed"
+            if result.error:
+                status += f" ({result.error})"
+            rows.append([result.spec_path, str(result.workspace), status, f"{result.duration:.1f}s"])
+        emit_table("fleet.results", "🚢 Fleet Results", ["Spec", "Workspace", "Status", "Duration"], rows)
+
+        failed = sum(1 for result in results if not result.success)
+        emit(
+            "fleet.completed",
+            f"{len(results) - failed} succeeded, {failed} failed",
+            BANNER,
+            success=failed == 0,
+            succeeded=len(results) - failed,
+            failed=failed
+        )
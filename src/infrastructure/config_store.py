@@ -0,0 +1,164 @@
+"""
+Content-addressed store of applied Terraform configurations.
+
+Every generated tree that was applied successfully is kept in the per-user
+home (`~/.ctrl-alt-deploy/store/`):
+
+- `objects/ab/abcdef...`: one blob per distinct file content (SHA-256), shared
+  by every tree and every workspace, so an unchanged file is stored once
+- `trees/<tree hash>.json`: the manifest of a tree (file name -> blob) plus
+  the service -> Terraform address mapping needed to analyse its plans
+
+The store is private to its user (directories 0700, files 0600), and the
+provider credentials are not kept: the access and secret keys of main.tf are
+stored redacted and taken from the workspace's current main.tf on restore.
+
+Each workspace keeps its own pointer history (`.deploy/generations.json`,
+see Workspace.generations). `deploy rollback <n>` restores a stored tree
+as-is, without parsing the spec or rendering templates.
+"""
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict
+
+from infrastructure.workspace import Workspace, deploy_home, RESOURCES_FILE, PROVIDER_FILE
+
+
+STORE_DIR = "store"
+REDACTED = b'"<redacted>"'
+
+# `access_key = "..."` / `secret_key = "..."` in the provider block of main.tf
+_CREDENTIAL_RE = re.compile(rb'^([ \t]*(access_key|secret_key)[ \t]*=[ \t]*)(.*)$', re.MULTILINE)
+
+
+class StoreError(LookupError):
+    """Raised when a tree or one of its blobs is missing from the store"""
+    pass
+
+
+def _make_private_dir(path: Path) -> None:
+    """mkdir -p where every created directory is 0700 (Path.mkdir applies mode to the last one only)."""
+    if path.is_dir():
+        return
+    _make_private_dir(path.parent)
+    path.mkdir(mode=0o700, exist_ok=True)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    _make_private_dir(path.parent)
+    tmp = path.with_name(f".{path.name}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    tmp.replace(path)
+
+
+def redact_credentials(data: bytes) -> bytes:
+    """Provider file without the values of its access and secret keys."""
+    return _CREDENTIAL_RE.sub(lambda match: match.group(1) + REDACTED, data)
+
+
+def restore_credentials(data: bytes, current: bytes | None) -> bytes:
+    """
+    Put back the credentials of the current provider file into a redacted one.
+    A key the current file does not set is dropped (the provider then reads
+    the environment).
+    """
+    values = {match.group(2): match.group(3) for match in _CREDENTIAL_RE.finditer(current or b"")}
+
+    def restore(match: re.Match) -> bytes:
+        if match.group(3) != REDACTED:
+            return match.group(0)
+        if match.group(2) not in values:
+            return b""
+        return match.group(1) + values[match.group(2)]
+
+    return _CREDENTIAL_RE.sub(restore, data)
+
+
+class ConfigStore:
+    """
+    Deduplicated store of generated trees.
+
+    Args:
+        root: Store directory (defaults to `store/` in the per-user home)
+    """
+
+    def __init__(self, root: str | Path | None = None):
+        self.root = Path(root) if root else deploy_home() / STORE_DIR
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest
+
+    def _tree_path(self, tree_id: str) -> Path:
+        return self.root / "trees" / f"{tree_id}.json"
+
+    def has_tree(self, tree_id: str) -> bool:
+        return self._tree_path(tree_id).exists()
+
+    def put_tree(self, workspace: Workspace) -> str:
+        """
+        Store the generated files of a workspace. Returns the tree id
+        (Workspace.tree_hash, the same hash the fingerprint uses).
+        """
+        tree_id = workspace.tree_hash()
+        if self.has_tree(tree_id):
+            return tree_id
+
+        # Also closes a store created before it was made private
+        _make_private_dir(self.root)
+        self.root.chmod(0o700)
+        files = {}
+        for path in workspace.tf_files():
+            data = path.read_bytes()
+            if path.name == PROVIDER_FILE:
+                data = redact_credentials(data)
+            digest = hashlib.sha256(data).hexdigest()
+            blob = self._blob_path(digest)
+            if not blob.exists():
+                _write_atomic(blob, data)
+            files[path.name] = digest
+
+        manifest = {"files": files, "resources": workspace.read_json(RESOURCES_FILE) or {}}
+        # Written last: a tree is only visible once all its blobs are stored
+        _write_atomic(self._tree_path(tree_id), json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+        return tree_id
+
+    def get_tree(self, tree_id: str) -> Dict[str, Any]:
+        """Manifest of a stored tree: {"files": {name: blob}, "resources": {...}}."""
+        try:
+            return json.loads(self._tree_path(tree_id).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            raise StoreError(f"Configuration {tree_id[:12]} is not in the store ({self.root})") from None
+
+    def restore_tree(self, tree_id: str, workspace: Workspace) -> None:
+        """
+        Make the workspace's .tf files exactly those of a stored tree, with
+        the credentials of the workspace's current provider file.
+        Every blob is checked before the first file is touched.
+        """
+        manifest = self.get_tree(tree_id)
+        contents = {}
+        for name, digest in manifest["files"].items():
+            blob = self._blob_path(digest)
+            if not blob.exists():
+                raise StoreError(f"Blob {digest[:12]} of {name} is missing from the store")
+            data = blob.read_bytes()
+            if hashlib.sha256(data).hexdigest() != digest:
+                raise StoreError(f"Blob {digest[:12]} of {name} is corrupted")
+            contents[name] = data
+
+        provider = workspace.terraform_dir / PROVIDER_FILE
+        if PROVIDER_FILE in contents:
+            current = provider.read_bytes() if provider.exists() else None
+            contents[PROVIDER_FILE] = restore_credentials(contents[PROVIDER_FILE], current)
+
+        for path in workspace.tf_files():
+            if path.name not in contents:
+                path.unlink()
+        for name, data in contents.items():
+            _write_atomic(workspace.terraform_dir / name, data)
+        workspace.write_json(RESOURCES_FILE, manifest.get("resources") or {})
@@ -0,0 +1,127 @@
+"""
+Plan analysis: a compact "what will this touch" summary of a saved Terraform plan.
+
+The JSON produced by `terraform show -json <plan>` is read with the streaming
+reader in `infrastructure.json_stream`, one `resource_changes` entry at a
+time, so even plans of hundreds of MB are summarised with bounded memory.
+"""
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from infrastructure.json_stream import iter_json_array
+
+
+ACTIONS = ("create", "update", "replace", "delete")
+
+# Resources that belong to no service (VPC, subnets, route tables...)
+SHARED = "(shared)"
+
+_INDEX_RE = re.compile(r'\[[^\]]*\]')
+
+
+def classify_actions(actions: List[str]) -> Optional[str]:
+    """Map Terraform's action list to create/update/replace/delete (None for no-op/read)."""
+    if "create" in actions and "delete" in actions:
+        return "replace"
+    for action in ACTIONS:
+        if action in actions:
+            return action
+    return None
+
+
+def _format_path(path: list) -> str:
+    return ".".join(str(step) for step in path)
+
+
+class PlanSummary:
+    """Per-service action counts and replacement reasons for a plan."""
+
+    def __init__(self):
+        self.services: Dict[str, Dict[str, int]] = {}
+        self.resource_types: Dict[str, Dict[str, int]] = {}
+        self.replacements: List[Dict[str, str]] = []
+
+    def add(self, service: str, resource_type: str, action: str) -> None:
+        for table, key in ((self.services, service), (self.resource_types, resource_type)):
+            counts = table.setdefault(key, dict.fromkeys(ACTIONS, 0))
+            counts[action] += 1
+
+    def totals(self) -> Dict[str, int]:
+        totals = dict.fromkeys(ACTIONS, 0)
+        for counts in self.services.values():
+            for action, count in counts.items():
+                totals[action] += count
+        return totals
+
+    @property
+    def has_changes(self) -> bool:
+        return any(self.totals().values())
+
+    def to_dict(self) -> dict:
+        return {
+            "services": self.services,
+            "resource_types": self.resource_types,
+            "replacements": self.replacements,
+            "totals": self.totals(),
+        }
+
+
+class PlanAnalyzer:
+    """
+    Summarise `terraform show -json` output per service.
+
+    Args:
+        resource_addresses: Mapping service -> Terraform addresses, as recorded
+            by TerraformGenerator. Addresses not found there are attributed by
+            name prefix (`backend_sg` -> `backend`) or to SHARED.
+    """
+
+    def __init__(self, resource_addresses: Optional[Dict[str, List[str]]] = None):
+        self.resource_addresses = resource_addresses or {}
+        self._owners = {
+            address: service
+            for service, addresses in self.resource_addresses.items()
+            for address in addresses
+        }
+        # Longest names first so "api_v2" wins over "api"
+        self._services_by_length = sorted(self.resource_addresses, key=len, reverse=True)
+
+    def service_for(self, address: str) -> str:
+        """Return the service owning a resource address."""
+        base = _INDEX_RE.sub("", address)
+        if base in self._owners:
+            return self._owners[base]
+
+        name = base.rsplit(".", 1)[-1]
+        for service in self._services_by_length:
+            if name == service or name.startswith(service + "_"):
+                return service
+        return SHARED
+
+    def analyze(self, plan_json_path: str | Path) -> PlanSummary:
+        summary = PlanSummary()
+
+        with open(plan_json_path, "r", encoding="utf-8") as f:
+            for change in iter_json_array(f, "resource_changes"):
+                if change.get("mode") == "data":
+                    continue
+
+                action = classify_actions(change.get("change", {}).get("actions", []))
+                if action is None:
+                    continue
+
+                address = change.get("address", "")
+                service = self.service_for(address)
+                summary.add(service, change.get("type", ""), action)
+
+                if action == "replace":
+                    paths = change.get("change", {}).get("replace_paths") or []
+                    summary.replacements.append({
+                        "service": service,
+                        "address": address,
+                        "reason": change.get("action_reason", "replace"),
+                        "attributes": ", ".join(_format_path(p) for p in paths),
+                    })
+
+        return summary
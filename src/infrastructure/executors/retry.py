@@ -0,0 +1,119 @@
+"""
+Failure classification and retry policy for Terraform runs.
+
+Terraform prints the AWS error codes it received, so the captured output is
+enough to tell an API throttle or a network hiccup (worth retrying) from a
+configuration error (not worth retrying).
+"""
+import random
+import re
+import time
+from typing import Callable
+
+
+THROTTLED = "throttled"
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+# AWS API rate limiting: retry and lower -parallelism
+THROTTLING_PATTERNS = [
+    r"RequestLimitExceeded",
+    r"Throttling(Exception)?\b",
+    r"TooManyRequestsException",
+    r"Rate exceeded",
+    r"SlowDown",
+    r"RequestThrottled",
+]
+
+# Network and service-side errors: retry as is
+TRANSIENT_PATTERNS = [
+    r"RequestTimeout",
+    r"ServiceUnavailable",
+    r"InternalError",
+    r"InternalFailure",
+    r"connection reset by peer",
+    r"i/o timeout",
+    r"TLS handshake timeout",
+    r"no such host",
+    r"timeout while waiting for plugin to start",
+    r"Failed to query available provider packages",
+]
+
+_THROTTLING_RE = re.compile("|".join(THROTTLING_PATTERNS), re.IGNORECASE)
+_TRANSIENT_RE = re.compile("|".join(TRANSIENT_PATTERNS), re.IGNORECASE)
+
+
+def classify_failure(output: str) -> str:
+    """
+    Classify a failed Terraform run from its output.
+
+    Returns:
+        THROTTLED, TRANSIENT or PERMANENT
+    """
+    if _THROTTLING_RE.search(output):
+        return THROTTLED
+    if _TRANSIENT_RE.search(output):
+        return TRANSIENT
+    return PERMANENT
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff with adaptive Terraform parallelism.
+
+    Args:
+        max_attempts: Total attempts, including the first one
+        base_delay: Backoff base in seconds (doubled after each attempt)
+        max_delay: Upper bound for a single backoff
+        initial_parallelism: Terraform's default -parallelism
+        min_parallelism: Parallelism never goes below this
+        sleep: Injected for tests
+        rng: Injected for tests
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 5.0,
+        max_delay: float = 120.0,
+        initial_parallelism: int = 10,
+        min_parallelism: int = 1,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: random.Random | None = None,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.initial_parallelism = initial_parallelism
+        self.min_parallelism = min_parallelism
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+
+    def delay(self, attempt: int) -> float:
+        """Full-jitter backoff before retry number `attempt` (1-based)."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return self.rng.uniform(0, ceiling)
+
+    def next_parallelism(self, current: int) -> int:
+        """Halve the parallelism after a throttled attempt."""
+        return max(self.min_parallelism, current // 2)
+
+
+def with_parallelism(command: list[str], parallelism: int) -> list[str]:
+    """
+    Return command with its -parallelism flag set (replacing any existing one).
+    The flag goes before a trailing positional argument (`terraform apply <plan file>`).
+    """
+    args = [arg for arg in command if not arg.startswith("-parallelism=")]
+    flag = f"-parallelism={parallelism}"
+    if len(args) > 2 and not args[-1].startswith("-"):
+        return args[:-1] + [flag, args[-1]]
+    return args + [flag]
+
+
+def parallelism_of(command: list[str]) -> int | None:
+    """Return the -parallelism value of a command, or None if it has no such flag."""
+    for arg in command:
+        if arg.startswith("-parallelism="):
+            return int(arg.split("=", 1)[1])
+    return None
@@ -0,0 +1,212 @@
+"""
+Command runners used by TerraformExecutor.
+
+A runner executes one command and returns a CommandResult. The default
+SubprocessRunner calls the real binary; RecordingRunner captures what happened
+into a cassette file and ReplayRunner plays a cassette back, so the
+orchestration layer can be tested and benchmarked without Terraform or network.
+
+Cassette format (JSON):
+
+    {
+      "version": 1,
+      "interactions": [
+        {"command": ["terraform", "init"], "returncode": 0,
+         "output": "...", "duration": 3.2, "stdout_file": null}
+      ]
+    }
+
+When a command wrote its stdout to a file (e.g. `terraform show -json`), the
+content is stored next to the cassette and referenced by `stdout_file`.
+"""
+import json
+import shutil
+import subprocess
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from utils.events import emit, OUTPUT
+
+
+CASSETTE_VERSION = 1
+
+
+class ReplayError(LookupError):
+    """Raised when a replayed command has no recorded interaction"""
+    pass
+
+
+class CommandResult:
+    """Outcome of one command run."""
+
+    def __init__(self, command: list[str], returncode: int, output: str, duration: float):
+        self.command = command
+        self.returncode = returncode
+        self.output = output
+        self.duration = duration
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+class CommandRunner:
+    """
+    Interface for running external commands.
+
+    `stdout_path`, when given, receives the command's stdout instead of the
+    captured output (used for large machine-readable output).
+    """
+
+    def run(self, command: list[str], cwd: str | Path, stdout_path: str | Path | None = None) -> CommandResult:
+        raise NotImplementedError
+
+
+class SubprocessRunner(CommandRunner):
+    """
+    Run commands with subprocess, echoing their output to the terminal.
+
+    Args:
+        echo: Print the output while the command runs
+        log_path: Also append the output to this file
+    """
+
+    def __init__(self, echo: bool = True, log_path: str | Path | None = None):
+        self.echo = echo
+        self.log_path = Path(log_path) if log_path else None
+
+    def _log(self, command: list[str], output: str) -> None:
+        if self.log_path is None:
+            return
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, "a", encoding="utf-8") as log:
+            log.write(f"$ {' '.join(command)}\n{output}\n")
+
+    def run(self, command: list[str], cwd: str | Path, stdout_path: str | Path | None = None) -> CommandResult:
+        start = time.monotonic()
+
+        if stdout_path is not None:
+            with open(stdout_path, "wb") as out:
+                result = subprocess.run(command, cwd=cwd, shell=False, stdout=out, stderr=subprocess.PIPE)
+            output = result.stderr.decode("utf-8", errors="replace")
+            if self.echo and output:
+                emit("command.output", output, OUTPUT)
+            self._log(command, output)
+            return CommandResult(command, result.returncode, output, time.monotonic() - start)
+
+        process = subprocess.Popen(
+            command,
+            cwd=cwd,
+            shell=False,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+        lines = []
+        for line in process.stdout:
+            lines.append(line)
+            if self.echo:
+                emit("command.output", line, OUTPUT)
+        returncode = process.wait()
+
+        output = "".join(lines)
+        self._log(command, output)
+        return CommandResult(command, returncode, output, time.monotonic() - start)
+
+
+class RecordingRunner(CommandRunner):
+    """Wrap another runner and record every interaction into a cassette file."""
+
+    def __init__(self, cassette_path: str | Path, inner: CommandRunner | None = None):
+        self.cassette_path = Path(cassette_path)
+        self.inner = inner or SubprocessRunner()
+        self.interactions: list[dict] = []
+        self._lock = threading.Lock()
+
+    def run(self, command: list[str], cwd: str | Path, stdout_path: str | Path | None = None) -> CommandResult:
+        result = self.inner.run(command, cwd, stdout_path)
+
+        with self._lock:
+            stdout_file = None
+            if stdout_path is not None and Path(stdout_path).exists():
+                stdout_file = f"{self.cassette_path.stem}.{len(self.interactions)}.stdout"
+                shutil.copyfile(stdout_path, self.cassette_path.parent / stdout_file)
+
+            self.interactions.append({
+                "command": list(command),
+                "returncode": result.returncode,
+                "output": result.output,
+                "duration": round(result.duration, 3),
+                "stdout_file": stdout_file,
+            })
+            self._save()
+
+        return result
+
+    def _save(self) -> None:
+        self.cassette_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cassette_path.with_suffix(self.cassette_path.suffix + ".tmp")
+        tmp.write_text(
+            json.dumps({"version": CASSETTE_VERSION, "interactions": self.interactions}, indent=2),
+            encoding="utf-8"
+        )
+        tmp.replace(self.cassette_path)
+
+
+class ReplayRunner(CommandRunner):
+    """
+    Replay a cassette instead of running commands.
+
+    Interactions are matched on the exact command, in recording order. Once
+    the recorded interactions for a command are used up, the last one keeps
+    being replayed, so one recorded deploy can drive many replayed runs.
+
+    Args:
+        cassette_path: Cassette file written by RecordingRunner
+        time_scale: Multiplier applied to recorded durations (0 = no waiting)
+        echo: Print the recorded output like the real command would
+    """
+
+    def __init__(self, cassette_path: str | Path, time_scale: float = 1.0, echo: bool = True):
+        self.cassette_path = Path(cassette_path)
+        self.time_scale = time_scale
+        self.echo = echo
+        self._lock = threading.Lock()
+
+        data = json.loads(self.cassette_path.read_text(encoding="utf-8"))
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version: {data.get('version')}")
+
+        self._queues: dict[tuple, deque] = defaultdict(deque)
+        for interaction in data["interactions"]:
+            self._queues[tuple(interaction["command"])].append(interaction)
+
+    def _next(self, command: list[str]) -> dict:
+        with self._lock:
+            queue = self._queues.get(tuple(command))
+            if not queue:
+                raise ReplayError(f"No recorded interaction for: {' '.join(command)}")
+            return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def run(self, command: list[str], cwd: str | Path, stdout_path: str | Path | None = None) -> CommandResult:
+        interaction = self._next(command)
+
+        duration = interaction.get("duration", 0.0)
+        if self.time_scale > 0 and duration > 0:
+            time.sleep(duration * self.time_scale)
+
+        output = interaction.get("output", "")
+        if self.echo and output:
+            emit("command.output", output, OUTPUT)
+
+        if stdout_path is not None:
+            stdout_file = interaction.get("stdout_file")
+            if stdout_file:
+                shutil.copyfile(self.cassette_path.parent / stdout_file, stdout_path)
+            else:
+                Path(stdout_path).write_bytes(b"")
+
+        return CommandResult(command, interaction["returncode"], output, duration * self.time_scale)
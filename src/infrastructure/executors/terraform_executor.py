@@ -1,40 +1,206 @@
-import subprocess
+import contextvars
+import io
+import json
+import shutil
+import threading
+import time
 from pathlib import Path
-from rich.console import Console
-from rich.panel import Panel
+from typing import Callable
+from infrastructure.executors.runners import CommandRunner, CommandResult, SubprocessRunner
+from infrastructure.executors.retry import (
+    RetryPolicy, classify_failure, with_parallelism, parallelism_of, PERMANENT, THROTTLED
+)
+from utils.events import emit, STEP, BANNER, SUCCESS, WARNING, ERROR, OUTPUT
 
-console = Console()
+# How often the JSON log of a running command is polled for new lines
+_FOLLOW_INTERVAL = 0.2
+
+
+def _emit_json_line(line: str) -> None:
+    """Show one line of Terraform's -json output like its human-readable output."""
+    try:
+        message = json.loads(line)
+    except ValueError:
+        return
+    if message.get("type") == "version" or "@message" not in message:
+        return
+    emit("command.output", message["@message"] + "\n", OUTPUT, type=message.get("type"))
+
+
+def _follow_json_log(path: Path, done: threading.Event) -> None:
+    """Emit the lines appended to `path` until `done` is set and the file is drained."""
+    position, pending = 0, ""
+    while True:
+        finished = done.is_set()
+        if path.exists():
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                f.seek(position)
+                pending += f.read()
+                position = f.tell()
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                _emit_json_line(line)
+        if finished:
+            break
+        done.wait(_FOLLOW_INTERVAL)
+    if pending.strip():
+        _emit_json_line(pending)
+
+
+def _json_diagnostics(path: Path) -> str:
+    """Error and warning diagnostics of a -json log, as text (for failure classification)."""
+    if not path.exists():
+        return ""
+    lines = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if '"diagnostic"' not in line:
+                continue
+            try:
+                diagnostic = json.loads(line).get("diagnostic") or {}
+            except ValueError:
+                continue
+            lines.append(f"{diagnostic.get('severity', 'error').capitalize()}: {diagnostic.get('summary', '')}")
+            if diagnostic.get("detail"):
+                lines.append(diagnostic["detail"])
+    return "\n".join(lines)
 
 
 class TerraformExecutor:
-    def __init__(self, terraform_dir: str | Path):
+    def __init__(
+        self,
+        terraform_dir: str | Path,
+        runner: CommandRunner | None = None,
+        retry_policy: RetryPolicy | None = None
+    ):
         self.terraform_dir = Path(terraform_dir)
+        self.runner = runner or SubprocessRunner()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retries = 0
+        self.retry_seconds = 0.0  # Time spent in failed attempts and backoff
         self._step_header_printed = False  # ✅ NEW (minimal)
+        self.timings: dict[str, float] = {}  # Wall time per command, retries included
+        self.last_result: CommandResult | None = None
+
+    def _attempt(self, command: list[str], json_log: Path | None) -> CommandResult:
+        """
+        Run a command once. With json_log, stdout (-json) is shown as it arrives
+        and appended to json_log, after the output of the previous attempts.
+        """
+        if json_log is None:
+            return self.runner.run(command, self.terraform_dir)
+
+        # Runners truncate stdout_path: each attempt writes its own file first
+        attempt_log = json_log.with_name(f"{json_log.name}.attempt")
+        attempt_log.unlink(missing_ok=True)
+        done = threading.Event()
+        follower = threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(_follow_json_log, attempt_log, done),
+            daemon=True
+        )
+        follower.start()
+        try:
+            result = self.runner.run(command, self.terraform_dir, stdout_path=attempt_log)
+        finally:
+            done.set()
+            follower.join()
 
-    def _run(self, command: list[str], title: str) -> bool:
+        # Only this attempt's diagnostics decide whether it is retried
+        diagnostics = _json_diagnostics(attempt_log)
+        if attempt_log.exists():
+            with open(json_log, "ab") as log, open(attempt_log, "rb") as attempt:
+                shutil.copyfileobj(attempt, log)
+                # An interrupted attempt may end mid-line
+                if attempt.tell():
+                    attempt.seek(-1, io.SEEK_END)
+                    if attempt.read(1) != b"\n":
+                        log.write(b"\n")
+            attempt_log.unlink()
+        if diagnostics:
+            result = CommandResult(result.command, result.returncode, f"{result.output}\n{diagnostics}", result.duration)
+        return result
+
+    def _run(
+        self,
+        command: list[str],
+        title: str,
+        adaptive_parallelism: bool = False,
+        json_log: Path | None = None,
+        success_codes: tuple[int, ...] = (0,),
+        before_retry: Callable[[list[str]], bool] | None = None
+    ) -> bool:
         """
         Run a Terraform command and stream output directly to the terminal.
+
+        Throttled and transient failures are retried with jittered exponential
+        backoff. When adaptive_parallelism is set, -parallelism is halved after
+        each throttled attempt. With json_log, the command's -json output is
+        written there (and shown as it arrives); the log holds every attempt,
+        so events of a failed attempt (resources it did apply) are kept. Exit codes in success_codes
+        count as success (`-detailed-exitcode` returns 2 for changes); the
+        last result is kept in self.last_result. before_retry runs before
+        each new attempt with the command about to run; returning False
+        stops retrying.
         """
         # Print step header ONCE before the first terraform command
         if not self._step_header_printed:
-            console.print("\n[bold cyan]🔍 Step 3: Execute Terraform[/bold cyan]\n")
+            emit("terraform.step", "🔍 Step 3: Execute Terraform", STEP)
             self._step_header_printed = True
 
-        console.print(Panel.fit(f"[bold cyan]{title}[/bold cyan]"))
+        emit("terraform.command", title, BANNER, command=command[1])
 
-        result = subprocess.run(
-            command,
-            cwd=self.terraform_dir,
-            shell=False
-        )
+        if json_log is not None:
+            json_log.unlink(missing_ok=True)
+        policy = self.retry_policy
+        parallelism = parallelism_of(command) or policy.initial_parallelism
+        retry_seconds = 0.0
+        started = time.monotonic()
+
+        for attempt in range(1, policy.max_attempts + 1):
+            result = self._attempt(command, json_log)
+            if result.returncode in success_codes:
+                break
+
+            failure = classify_failure(result.output)
+            if failure == PERMANENT or attempt == policy.max_attempts:
+                break
+
+            delay = policy.delay(attempt)
+            if failure == THROTTLED and adaptive_parallelism:
+                parallelism = policy.next_parallelism(parallelism)
+                command = with_parallelism(command, parallelism)
 
-        if result.returncode != 0:
-            console.print(
-                f"[bold red]✗ Command failed:[/bold red] {' '.join(command)}"
+            emit(
+                "terraform.retry",
+                f"↻ {failure.capitalize()} failure, retrying in {delay:.1f}s "
+                f"(attempt {attempt + 1}/{policy.max_attempts})",
+                WARNING,
+                command=command[1],
+                failure=failure,
+                delay=round(delay, 1),
+                attempt=attempt + 1
             )
+            policy.sleep(delay)
+            retry_seconds += result.duration + delay
+            self.retries += 1
+            if before_retry is not None and not before_retry(command):
+                break
+
+        self.retry_seconds += retry_seconds
+        self.timings[command[1]] = self.timings.get(command[1], 0.0) + time.monotonic() - started
+        self.last_result = result
+        if retry_seconds:
+            emit("terraform.retry_time", f"  {title}: {retry_seconds:.1f}s spent on retries", WARNING,
+                 command=command[1], seconds=round(retry_seconds, 1))
+
+        if result.returncode not in success_codes:
+            emit("terraform.failed", f"✗ Command failed: {' '.join(command)}", ERROR,
+                 command=command[1], returncode=result.returncode, output=result.output[-4000:])
             return False
 
-        console.print(f"[bold green]✓ {title} completed successfully[/bold green]")
+        emit("terraform.completed", f"✓ {title} completed successfully", SUCCESS,
+             command=command[1], duration=round(result.duration, 2))
         return True
 
     def init(self) -> bool:
@@ -43,14 +209,107 @@ class TerraformExecutor:
             "⚙️ Terraform Initialization"
         )
 
-    def plan(self) -> bool:
+    @staticmethod
+    def _target_args(targets: list[str] | None) -> list[str]:
+        return [f"-target={address}" for address in targets or []]
+
+    def plan(self, targets: list[str] | None = None, plan_file: str | None = None) -> bool:
+        out_args = [f"-out={plan_file}"] if plan_file else []
         return self._run(
-            ["terraform", "plan"],
-            "📐 Terraform Plan"
+            ["terraform", "plan"] + out_args + self._target_args(targets),
+            "📐 Terraform Plan",
+            adaptive_parallelism=True
         )
 
-    def apply(self) -> bool:
+    def plan_refresh_only(self, json_log: str | Path, parallelism: int | None = None) -> int | None:
+        """
+        Compare the state with the real infrastructure, without changing either.
+
+        Runs `terraform plan -refresh-only -detailed-exitcode -json`; the drift
+        events go to json_log. Returns 0 (no drift), 2 (drift) or None on failure.
+        """
+        parallelism_args = [f"-parallelism={parallelism}"] if parallelism else []
+        ok = self._run(
+            ["terraform", "plan", "-refresh-only", "-detailed-exitcode", "-input=false", "-json"]
+            + parallelism_args,
+            "🔎 Terraform Drift Check",
+            adaptive_parallelism=True,
+            json_log=Path(json_log),
+            success_codes=(0, 2)
+        )
+        return self.last_result.returncode if ok else None
+
+    def show_plan_json(self, plan_file: str, output_path: str | Path) -> bool:
+        """
+        Write `terraform show -json` for a saved plan to output_path.
+        The JSON goes straight to disk; it is never held in memory.
+        """
+        result = self.runner.run(["terraform", "show", "-json", plan_file], self.terraform_dir, stdout_path=output_path)
+        self.timings["show"] = self.timings.get("show", 0.0) + result.duration
+        if not result.ok:
+            emit("terraform.show_failed", f"⚠ Could not export the plan as JSON: {result.output.strip()}", WARNING)
+            return False
+        return True
+
+    def output_json(self, output_path: str | Path) -> bool:
+        """Write `terraform output -json` (every root output) to output_path."""
+        result = self.runner.run(["terraform", "output", "-json"], self.terraform_dir, stdout_path=output_path)
+        self.timings["output"] = self.timings.get("output", 0.0) + result.duration
+        if not result.ok:
+            emit("terraform.output_failed", f"⚠ Could not read the Terraform outputs: {result.output.strip()}", WARNING)
+            return False
+        return True
+
+    def apply(
+        self,
+        targets: list[str] | None = None,
+        json_log: str | Path | None = None,
+        plan_file: str | None = None
+    ) -> bool:
+        """
+        Apply the configuration. With json_log, Terraform runs with -json and its
+        machine-readable events (per-resource timings, ...) are kept in that file.
+
+        With plan_file, the saved plan is applied as is (no second refresh, and
+        exactly the changes that were summarized); its targets were fixed when it
+        was planned. A failed attempt may have changed the state, which makes the
+        saved plan stale, so the plan is saved again before each retry.
+        """
+        json_args = ["-json"] if json_log else []
+        if plan_file is None:
+            return self._run(
+                ["terraform", "apply", "-auto-approve"] + json_args + self._target_args(targets),
+                "🚀 Terraform Apply",
+                adaptive_parallelism=True,
+                json_log=Path(json_log) if json_log else None
+            )
         return self._run(
-            ["terraform", "apply", "-auto-approve"],
-            "🚀 Terraform Apply"
+            ["terraform", "apply", "-auto-approve", "-input=false"] + json_args + [plan_file],
+            "🚀 Terraform Apply",
+            adaptive_parallelism=True,
+            json_log=Path(json_log) if json_log else None,
+            before_retry=lambda command: self._replan(targets, plan_file, parallelism_of(command))
+        )
+
+    def _replan(self, targets: list[str] | None, plan_file: str, parallelism: int | None) -> bool:
+        """Save a fresh plan to plan_file before retrying its apply."""
+        parallelism_args = [f"-parallelism={parallelism}"] if parallelism else []
+        result = self.runner.run(
+            ["terraform", "plan", "-input=false", f"-out={plan_file}"] + parallelism_args + self._target_args(targets),
+            self.terraform_dir
+        )
+        self.timings["plan"] = self.timings.get("plan", 0.0) + result.duration
+        if not result.ok:
+            emit("terraform.replan_failed", f"✗ Could not plan again before retrying: {result.output.strip()[-2000:]}", ERROR)
+            return False
+        emit(
+            "terraform.replanned",
+            "↻ Planned again after the failed attempt: the changes applied may differ from the summary above",
+            WARNING
         )
+        return True
+
+    @staticmethod
+    def is_stale_plan(result: CommandResult | None) -> bool:
+        """True if an apply failed because its saved plan no longer matches the state."""
+        return result is not None and not result.ok and "Saved plan is stale" in result.output
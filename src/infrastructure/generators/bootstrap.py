@@ -0,0 +1,174 @@
+"""
+Script de démarrage (user data) des instances EC2 d'un service.
+
+Le script est écrit pour démarrer vite et mesurer où passe le temps de boot :
+- Docker n'est installé que s'il est absent (golden image, AMI personnalisée),
+  sans aucune question interactive (DEBIAN_FRONTEND, options dpkg)
+- Le `docker pull` démarre dès que Docker répond, en arrière-plan, pendant
+  le reste de la préparation (métadonnées de l'instance, AWS CLI)
+- Chaque phase est horodatée en secondes depuis le démarrage du noyau :
+  user_data, docker_ready, image_pulled, container_healthy
+
+Les horodatages sont écrits dans /var/log/ctrl-alt-deploy-boot.json et sur la
+console série (lisible sans connexion avec `aws ec2 get-console-output`).
+Avec `infrastructure.boot_metrics: true`, ils sont aussi publiés comme
+métriques CloudWatch (namespace CtrlAltDeploy/Boot, dimension Service).
+"""
+
+from typing import List
+
+from models.models import DeploymentSpec, Service
+
+
+BOOT_METRICS_NAMESPACE = "CtrlAltDeploy/Boot"
+BOOT_PHASES = ("user_data", "docker_ready", "image_pulled", "container_healthy")
+TIMINGS_FILE = "/var/log/ctrl-alt-deploy-boot.json"
+
+# Attente maximale du conteneur sain (secondes) : au-delà, la phase n'est pas publiée
+HEALTH_TIMEOUT_SECONDS = 300
+
+_PHASES_FILE = "/run/ctrl-alt-deploy-phases"
+_APT_INSTALL = (
+    "apt-get -q -o Dpkg::Options::=--force-confdef -o Dpkg::Options::=--force-confold "
+    "install -y --no-install-recommends"
+)
+_IMDS = "http://169.254.169.254/latest"
+
+
+def shell_escape(value: str) -> str:
+    """Return a POSIX-safe single-quoted string."""
+    return "'" + value.replace("'", "'\"'\"'") + "'"
+
+
+def heredoc_escape(script: str) -> str:
+    """Échappe les séquences d'interpolation Terraform (`${`, `%{`) d'un script placé dans un heredoc"""
+    return script.replace("${", "$${").replace("%{", "%%{")
+
+
+def docker_run_command(service: Service) -> str:
+    """`docker run` of the service container (ports, environment, restart policy)."""
+    env_parts = [f"-e {key}={shell_escape(value)}" for key, value in service.environment.items()]
+    port_parts = [f"-p {port}:{port}" for port in service.ports]
+    return " ".join(["docker run -d --restart=always"] + port_parts + env_parts + [service.image])
+
+
+def build_bootstrap_script(service: Service, spec: DeploymentSpec, golden: bool = False) -> str:
+    """
+    Construit le user data d'un service EC2.
+
+    Args:
+        service: Le service EC2
+        spec: Le DeploymentSpec (identifiants Docker Hub, région, boot_metrics)
+        golden: True si l'instance démarre sur la golden image du service
+                (Docker installé et image déjà tirée : ni apt-get ni docker pull)
+    """
+    publish = spec.infrastructure.boot_metrics
+    lines = [
+        "#!/bin/bash",
+        "set -euo pipefail",
+        "exec > /var/log/user-data.log 2>&1",
+        "",
+        "# Horodatage des phases, en secondes depuis le démarrage du noyau",
+        f'mark() {{ echo "$1 $(cut -d" " -f1 /proc/uptime)" >> {_PHASES_FILE}; }}',
+        "mark user_data",
+        "export DEBIAN_FRONTEND=noninteractive",
+        "",
+    ]
+
+    if golden:
+        lines.append("systemctl start docker")
+    else:
+        lines += [
+            "if ! command -v docker >/dev/null 2>&1; then",
+            "  apt-get update -y -q",
+            f"  {_APT_INSTALL} docker.io",
+            "fi",
+            "systemctl enable --now docker",
+        ]
+    lines += [
+        "until docker info >/dev/null 2>&1; do sleep 0.2; done",
+        "mark docker_ready",
+        "",
+    ]
+
+    if not service.image:
+        lines.append(f'echo "No image defined for {service.name}; skipping docker run"')
+        return "\n".join(lines)
+
+    if not golden:
+        creds = spec.docker.hub_credentials if spec.docker and spec.docker.hub_credentials else None
+        if creds and creds.username and creds.password:
+            user = shell_escape(creds.username)
+            pwd = shell_escape(creds.password)
+            lines.append(f"echo {pwd} | docker login -u {user} --password-stdin || true")
+        lines += [
+            "# Le pull tourne pendant le reste de la préparation",
+            f"docker pull {service.image} &",
+            "PULL_PID=$!",
+        ]
+
+    lines += [
+        f"TOKEN=$(curl -s -X PUT {_IMDS}/api/token -H 'X-aws-ec2-metadata-token-ttl-seconds: 300' || true)",
+        f'INSTANCE_ID=$(curl -s -H "X-aws-ec2-metadata-token: $TOKEN" {_IMDS}/meta-data/instance-id || true)',
+    ]
+    if publish and not golden:
+        lines.append(f"command -v aws >/dev/null 2>&1 || {_APT_INSTALL} awscli || true")
+    if not golden:
+        lines.append('wait "$PULL_PID"')
+    lines += [
+        "mark image_pulled",
+        "",
+        f"CONTAINER=$({docker_run_command(service)})",
+    ]
+    lines += _health_wait(service)
+    lines += ["", *_report(service, spec, publish)]
+    return "\n".join(lines)
+
+
+def _health_wait(service: Service) -> List[str]:
+    """
+    Attente du conteneur sain.
+
+    Avec des ports, on se connecte à l'IP du conteneur sur le port du load
+    balancer (et non au port publié : docker-proxy accepte les connexions
+    avant que l'application n'écoute).
+    Sans port, le conteneur doit simplement tourner.
+    """
+    if service.ports:
+        # Même port que le target group quand le service en choisit un
+        port = service.load_balancer.port if service.load_balancer and service.load_balancer.port else service.ports[0]
+        probe = (
+            f"IP=$(docker inspect -f '{{{{range .NetworkSettings.Networks}}}}{{{{.IPAddress}}}}{{{{end}}}}' \"$CONTAINER\")"
+            f" && (exec 3<>/dev/tcp/$IP/{port}) 2>/dev/null"
+        )
+    else:
+        probe = "[ \"$(docker inspect -f '{{.State.Running}}' \"$CONTAINER\")\" = true ]"
+    return [
+        f"for _ in $(seq 1 {HEALTH_TIMEOUT_SECONDS}); do",
+        f"  if {probe}; then",
+        "    mark container_healthy",
+        "    break",
+        "  fi",
+        "  sleep 1",
+        "done",
+    ]
+
+
+def _report(service: Service, spec: DeploymentSpec, publish: bool) -> List[str]:
+    """Écriture des horodatages (fichier JSON, console série) et publication CloudWatch"""
+    lines = [
+        "awk -v service=" + shell_escape(service.name) + ' -v instance="$INSTANCE_ID" \''
+        'BEGIN { printf "{\\"service\\": \\"%s\\", \\"instance_id\\": \\"%s\\", \\"phases\\": {", service, instance }'
+        ' { printf "%s\\"%s\\": %s", (NR > 1 ? ", " : ""), $1, $2 }'
+        ' END { print "}}" }\''
+        f" {_PHASES_FILE} > {TIMINGS_FILE}",
+        f'echo "ctrl-alt-deploy-boot $(cat {TIMINGS_FILE})" > /dev/console || true',
+    ]
+    if publish:
+        lines += [
+            "while read -r phase seconds; do",
+            f"  aws cloudwatch put-metric-data --region {spec.aws.region} --namespace {BOOT_METRICS_NAMESPACE} \\",
+            f'    --metric-name "$phase" --unit Seconds --value "$seconds" --dimensions Service={service.name} || true',
+            f"done < {_PHASES_FILE}",
+        ]
+    return lines
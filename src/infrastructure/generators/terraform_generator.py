@@ -11,7 +11,11 @@ Workflow :
 DeploymentSpec → Mappers → Templates Jinja2 → Fichiers .tf → Terraform peut les utiliser
 """
 
+import hashlib
+import json
+import math
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, List
 from jinja2 import Environment, FileSystemLoader, Template
@@ -32,14 +36,89 @@ from models.models import DeploymentSpec, Service, ServiceType, Scalability
 from infrastructure.mappers.instance_mapper import (
     get_instance_type_for_service,
     map_scalability_to_max_instances,
-    get_scaling_config_for_service
+    get_scaling_config_for_service,
+    get_scaling_policy_for_service,
+    get_warm_pool_for_service,
+    DEFAULT_HEALTH_CHECK_GRACE_PERIOD
 )
+from infrastructure.mappers.instance_catalog import instance_architecture, get_instance_spec, ARM64
+from infrastructure.mappers.load_balancer_mapper import get_load_balancer_settings, get_shared_load_balancers, needs_load_balancer
+from infrastructure.mappers.ecs_mapper import get_task_size_for_service, get_ecs_scaling_policy
+from infrastructure.generators.bootstrap import build_bootstrap_script, heredoc_escape, BOOT_METRICS_NAMESPACE
 from infrastructure.mappers.rds_mapper import (
     get_rds_instance_type_for_service,
     map_docker_image_to_rds_engine,
-    get_rds_engine_version
+    get_rds_engine_version,
+    get_rds_storage_settings,
+    get_rds_parameter_group,
+    is_burstable_rds_class,
+    PERFORMANCE_INSIGHTS_RETENTION
 )
 
+# Événements de progression (terminal, silencieux ou NDJSON selon le sink actif)
+from utils.events import emit, SUCCESS, DETAIL, WARNING
+
+
+@lru_cache(maxsize=1)
+def get_jinja_environment() -> Environment:
+    """
+    Retourne l'environnement Jinja2 partagé par tous les générateurs.
+    
+    Jinja2 garde en cache les templates compilés dans l'environnement : en le
+    partageant, un processus longue durée (`deploy serve`) ne compile chaque
+    template qu'une seule fois.
+    """
+    # Chemin vers le dossier des templates Jinja2
+    # __file__ est le chemin de ce fichier Python
+    # Ce fichier est dans: src/infrastructure/generators/terraform_generator.py
+    # .parent = src/infrastructure/generators
+    # .parent.parent = src/infrastructure
+    # Donc templates_dir = src/infrastructure/templates
+    templates_dir = Path(__file__).parent.parent / "templates"
+    
+    # Créer l'environnement Jinja2 pour charger les templates
+    # FileSystemLoader charge les templates depuis le système de fichiers
+    environment = Environment(
+        loader=FileSystemLoader(str(templates_dir)),
+        trim_blocks=True,      # Supprime les espaces en début/fin de bloc
+        lstrip_blocks=True,   # Supprime les espaces à gauche des blocs
+        keep_trailing_newline=True  # Garde les sauts de ligne finaux
+    )
+    # `{{ valeur | hcl_string }}` : chaîne saisie par l'utilisateur, guillemets compris
+    environment.filters["hcl_string"] = hcl_string
+    return environment
+
+
+def hcl_string(value: str) -> str:
+    """Chaîne HCL entre guillemets (échappement JSON + séquences d'interpolation Terraform)"""
+    return heredoc_escape(json.dumps(value))
+
+
+def templates_hash() -> str:
+    """
+    Empreinte du contenu de tous les templates.
+    
+    Un changement de template doit régénérer les fichiers même si le spec
+    n'a pas changé (utilisé par les checkpoints de `deploy resume`).
+    """
+    templates_dir = Path(__file__).parent.parent / "templates"
+    digest = hashlib.sha256()
+    # Seuls les .j2 sont des templates (pas de __pycache__ ni de fichiers parasites), lus en octets bruts
+    for path in sorted(templates_dir.rglob("*.j2")):
+        digest.update(path.relative_to(templates_dir).as_posix().encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def preload_templates() -> int:
+    """Compile tous les templates à l'avance. Retourne le nombre de templates chargés."""
+    env = get_jinja_environment()
+    names = [name for name in env.list_templates() if name.endswith(".j2")]
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
 
 class TerraformGenerator:
     """
@@ -52,12 +131,13 @@ class TerraformGenerator:
     - Organise les fichiers dans un répertoire
     """
     
-    def __init__(self, output_dir: str = "terraform_output"):
+    def __init__(self, output_dir: str = "terraform_output", image_lock=None):
         """
         Initialise le générateur Terraform.
         
         Args:
             output_dir: Répertoire où écrire les fichiers Terraform générés
+            image_lock: Optionnel, ImageLock des golden images (mode infrastructure.golden_image)
         """
         # Chemin du répertoire où on va écrire les fichiers Terraform
         self.output_dir = Path(output_dir)
@@ -67,22 +147,18 @@ class TerraformGenerator:
         # exist_ok=True : ne lève pas d'erreur si le répertoire existe déjà
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Chemin vers le dossier des templates Jinja2
-        # __file__ est le chemin de ce fichier Python
-        # Ce fichier est dans: src/infrastructure/generators/terraform_generator.py
-        # .parent = src/infrastructure/generators
-        # .parent.parent = src/infrastructure
-        # Donc templates_dir = src/infrastructure/templates
-        templates_dir = Path(__file__).parent.parent / "templates"
-        
-        # Créer l'environnement Jinja2 pour charger les templates
-        # FileSystemLoader charge les templates depuis le système de fichiers
-        self.jinja_env = Environment(
-            loader=FileSystemLoader(str(templates_dir)),
-            trim_blocks=True,      # Supprime les espaces en début/fin de bloc
-            lstrip_blocks=True,   # Supprime les espaces à gauche des blocs
-            keep_trailing_newline=True  # Garde les sauts de ligne finaux
-        )
+        # Environnement Jinja2 partagé (templates compilés une seule fois par processus)
+        self.jinja_env = get_jinja_environment()
+        
+        # Adresses Terraform produites pour chaque service (ex: "aws_instance.backend")
+        # Rempli pendant generate(), utilisé pour les déploiements ciblés (-target)
+        self.resource_addresses: Dict[str, List[str]] = {}
+        
+        # AMIs construites par `deploy bake` (images.lock.json à côté du spec)
+        self.image_lock = image_lock
+        
+        # ALB partagés (mode load_balancer_mode: shared), calculés par generate_services()
+        self.shared_load_balancers: Dict[str, Dict[str, Any]] = {}
     
     def generate(self, spec: DeploymentSpec) -> Path:
         """
@@ -100,28 +176,70 @@ class TerraformGenerator:
         3. Génère un fichier .tf pour chaque service EC2
         4. Retourne le chemin du répertoire
         """
-        print(f"🔧 Génération de la configuration Terraform dans {self.output_dir}")
+        self.generate_provider(spec)
+        return self.generate_services(spec)
+    
+    def generate_provider(self, spec: DeploymentSpec) -> Path:
+        """
+        Génère uniquement la configuration nécessaire à `terraform init` (provider, variables).
+        
+        Permet à l'orchestrateur de lancer `terraform init` pendant que
+        generate_services() écrit le reste des fichiers.
+        """
+        emit("generate.start", f"🔧 Génération de la configuration Terraform dans {self.output_dir}", DETAIL, output_dir=str(self.output_dir))
+        self.resource_addresses = {}
         
         # Étape 1 : Générer le fichier main.tf (configuration du provider AWS)
         self._generate_main_tf(spec)
-        print("✓ main.tf généré")
+        emit("generate.file", "✓ main.tf généré", SUCCESS, file="main.tf")
         
         # Étape 2 : Générer le fichier variables.tf (définition des variables)
         self._generate_variables_tf(spec)
-        print("✓ variables.tf généré")
-        
+        emit("generate.file", "✓ variables.tf généré", SUCCESS, file="variables.tf")
+        return self.output_dir
+    
+    def generate_services(self, spec: DeploymentSpec) -> Path:
+        """
+        Génère le VPC et les fichiers de chaque service (à appeler après generate_provider).
+        """
         # Étape 2.5 : Générer le VPC si nécessaire (si vpc_id n'est pas spécifié)
         if not spec.infrastructure.vpc_id:
             self._generate_vpc_tf(spec)
-            print("✓ vpc.tf généré (VPC automatique)")
+            emit("generate.file", "✓ vpc.tf généré (VPC automatique)", SUCCESS, file="vpc.tf")
         
         # Étape 3 : Générer un fichier .tf pour chaque service EC2
         ec2_services = [s for s in spec.application.services if s.type == ServiceType.EC2]
         
+        ecs_services = [s for s in spec.application.services if s.type == ServiceType.ECS]
+        
+        # Mode partagé : un ALB par groupe, chaque service y ajoute son target group et sa règle
+        self.shared_load_balancers = {}
+        if spec.infrastructure.load_balancer_mode == "shared":
+            self.shared_load_balancers = get_shared_load_balancers(ec2_services + ecs_services, spec.infrastructure.scalability)
+            for group in self.shared_load_balancers:
+                self._generate_shared_alb_tf(group, spec)
+                emit("generate.file", f"✓ shared_{group}_alb.tf généré", SUCCESS, file=f"shared_{group}_alb.tf")
+        
         for service in ec2_services:
             # Génère un fichier spécifique pour chaque service EC2
             self._generate_ec2_instance_tf(service, spec)
-            print(f"✓ {service.name}_instance.tf généré")
+            emit("generate.file", f"✓ {service.name}_instance.tf généré", SUCCESS, file=f"{service.name}_instance.tf", service=service.name)
+        
+        # Étape 3.5 : Instance profile partagé pour publier les temps de boot dans CloudWatch
+        if ec2_services and spec.infrastructure.boot_metrics:
+            self._generate_boot_metrics_tf(spec)
+            emit("generate.file", "✓ boot_metrics.tf généré", SUCCESS, file="boot_metrics.tf")
+        
+        # Étape 3.75 : Cluster ECS partagé, puis un service ECS (tâches + autoscaling) par service
+        if ecs_services:
+            self._generate_ecs_cluster_tf(ecs_services, spec)
+            emit("generate.file", "✓ ecs_cluster.tf généré", SUCCESS, file="ecs_cluster.tf")
+        
+        for service in ecs_services:
+            self._generate_ecs_service_tf(service, spec)
+            if needs_load_balancer(service, spec.infrastructure.scalability):
+                self._generate_alb_tf(service, spec)
+            emit("generate.file", f"✓ {service.name}_ecs.tf généré", SUCCESS, file=f"{service.name}_ecs.tf", service=service.name)
         
         # Étape 4 : Générer un fichier .tf pour chaque service RDS
         rds_services = [s for s in spec.application.services if s.type == ServiceType.RDS]
@@ -129,11 +247,69 @@ class TerraformGenerator:
         for service in rds_services:
             # Génère un fichier spécifique pour chaque service RDS
             self._generate_rds_instance_tf(service, spec)
-            print(f"✓ {service.name}_instance.tf généré")
+            emit("generate.file", f"✓ {service.name}_instance.tf généré", SUCCESS, file=f"{service.name}_instance.tf", service=service.name)
         
-        print(f"\n✅ Configuration Terraform générée avec succès dans {self.output_dir}")
+        emit("generate.done", f"✅ Configuration Terraform générée avec succès dans {self.output_dir}", SUCCESS, output_dir=str(self.output_dir))
         return self.output_dir
     
+    def _write_file(self, output_file: Path, rendered: str) -> None:
+        """
+        Écrit un fichier généré de façon atomique (fichier temporaire puis renommage).
+        
+        `terraform init` peut tourner en parallèle de la génération : il ne doit
+        jamais lire un fichier .tf à moitié écrit. Le fichier temporaire ne se
+        termine pas par .tf, Terraform l'ignore donc.
+        """
+        tmp_file = output_file.with_name(f".{output_file.name}.tmp")
+        tmp_file.write_text(rendered, encoding="utf-8")
+        tmp_file.replace(output_file)
+    
+    def _register_resources(self, service_name: str, *addresses: str) -> None:
+        """Enregistre les adresses Terraform générées pour un service."""
+        self.resource_addresses.setdefault(service_name, []).extend(addresses)
+    
+    def get_target_addresses(self, spec: DeploymentSpec, service_names: List[str]) -> List[str]:
+        """
+        Calcule les adresses à passer en -target pour ne déployer que certains services.
+        
+        Les services listés dans depends_on sont inclus (récursivement). Les ressources
+        partagées (VPC, subnets, AMI...) n'ont pas besoin d'être listées : Terraform
+        inclut automatiquement les dépendances des ressources ciblées.
+        
+        Args:
+            spec: Le DeploymentSpec complet
+            service_names: Les services demandés (ex: ["backend"])
+            
+        Returns:
+            La liste des adresses Terraform, dans l'ordre des services du spec
+            
+        Raises:
+            ValueError: Si un service est inconnu
+        """
+        services = {s.name: s for s in spec.application.services}
+        unknown = [name for name in service_names if name not in services]
+        if unknown:
+            raise ValueError(
+                f"Service(s) inconnu(s): {', '.join(unknown)}. "
+                f"Services disponibles: {', '.join(services)}"
+            )
+        
+        # Parcours des dépendances (depends_on) à partir des services demandés
+        selected = set()
+        pending = list(service_names)
+        while pending:
+            name = pending.pop()
+            if name in selected:
+                continue
+            selected.add(name)
+            pending.extend(services[name].depends_on)
+        
+        addresses = []
+        for service in spec.application.services:
+            if service.name in selected:
+                addresses.extend(self.resource_addresses.get(service.name, []))
+        return addresses
+    
     def _generate_main_tf(self, spec: DeploymentSpec) -> None:
         """
         Génère le fichier main.tf qui configure le provider AWS.
@@ -150,15 +326,15 @@ class TerraformGenerator:
             "region": spec.aws.region,              # Région AWS
             "access_key": spec.aws.access_key,      # Clé d'accès AWS
             "secret_key": spec.aws.secret_key,      # Clé secrète AWS
-            "environment": "production"             # Environnement (pourrait venir du spec)
+            "environment": "production",            # Environnement (pourrait venir du spec)
+            "arm64_ami": self._needs_arm64_ami(spec)  # AMI Graviton si un service tourne sur arm64
         }
         
         # Rend le template avec les données (remplace {{ variable }} par les valeurs)
         rendered = template.render(**context)
         
         # Écrit le résultat dans le fichier main.tf
-        output_file = self.output_dir / "main.tf"
-        output_file.write_text(rendered, encoding="utf-8")
+        self._write_file(self.output_dir / "main.tf", rendered)
     
     def _generate_variables_tf(self, spec: DeploymentSpec) -> None:
         """
@@ -182,8 +358,7 @@ class TerraformGenerator:
         rendered = template.render(**context)
         
         # Écrit le fichier variables.tf
-        output_file = self.output_dir / "variables.tf"
-        output_file.write_text(rendered, encoding="utf-8")
+        self._write_file(self.output_dir / "variables.tf", rendered)
     
     def _generate_ec2_instance_tf(self, service: Service, spec: DeploymentSpec) -> None:
         """
@@ -201,7 +376,7 @@ class TerraformGenerator:
         
         # Si max_instances > 1, on utilise Auto Scaling + Load Balancer
         if max_size > 1:
-            print(f"  ℹ️  Service {service.name} uses Auto Scaling (max={max_size})")
+            emit("generate.autoscaling", f"  ℹ️  Service {service.name} uses Auto Scaling (max={max_size})", DETAIL, service=service.name, max_size=max_size)
             # 1. Générer ASG (Launch Template + Auto Scaling Group)
             self._generate_asg_tf(service, spec, min_size, max_size, desired_capacity)
             
@@ -212,63 +387,101 @@ class TerraformGenerator:
             # Sinon, instance unique (EC2 simple)
             self._generate_single_ec2_tf(service, spec)
 
-    def _shell_escape(self, value: str) -> str:
-        """Return a POSIX-safe single-quoted string."""
-        return "'" + value.replace("'", "'\"'\"'") + "'"
-
-    def _build_docker_user_data(self, service: Service, spec: DeploymentSpec) -> str:
-        """Build user data script to install Docker and run the service container."""
-        lines = [
-            "#!/bin/bash",
-            "set -euo pipefail",
-            "exec > /var/log/user-data.log 2>&1",
-            "apt-get update -y",
-            "apt-get install -y docker.io",
-            "systemctl enable --now docker",
-        ]
+    def _instance_type_for(self, service: Service, spec: DeploymentSpec) -> str:
+        """Type d'instance EC2 d'un service (taille du service ou globale, profil, type exact)"""
+        return get_instance_type_for_service(
+            machine_size=service.machine_size or spec.infrastructure.machine_size,
+            scalability=spec.infrastructure.scalability,
+            profile=service.profile,
+            instance_type=service.instance_type
+        )
 
-        creds = None
-        if spec.docker and spec.docker.hub_credentials:
-            creds = spec.docker.hub_credentials
+    @staticmethod
+    def _ami_data_source(instance_type: str) -> str:
+        """Nom de la data source AMI (main.tf) qui correspond à l'architecture du type"""
+        return "ubuntu_arm64" if instance_architecture(instance_type) == ARM64 else "ubuntu"
 
-        if creds and creds.username and creds.password:
-            user = self._shell_escape(creds.username)
-            pwd = self._shell_escape(creds.password)
-            lines.append(f"echo {pwd} | docker login -u {user} --password-stdin || true")
+    def _needs_arm64_ami(self, spec: DeploymentSpec) -> bool:
+        """True si au moins un service EC2 tourne sur un type Graviton"""
+        return any(
+            self._ami_data_source(self._instance_type_for(service, spec)) == "ubuntu_arm64"
+            for service in spec.application.services
+            if service.type == ServiceType.EC2
+        )
 
-        if service.image:
-            lines.append(f"docker pull {service.image}")
-            env_parts = []
-            for key, value in service.environment.items():
-                env_parts.append(f"-e {key}={self._shell_escape(value)}")
-            port_parts = [f"-p {port}:{port}" for port in service.ports]
-            run_parts = ["docker run -d --restart=always"] + port_parts + env_parts + [service.image]
-            lines.append(" ".join(run_parts))
-        else:
-            lines.append(f'echo "No image defined for {service.name}; skipping docker run"')
+    def render_image_template(self, service: Service, spec: DeploymentSpec) -> str:
+        """
+        Rend la définition Packer de la golden image d'un service EC2 :
+        Ubuntu + Docker installé + image du service déjà tirée.
+        """
+        template = self.jinja_env.get_template("golden_image.pkr.hcl.j2")
+        instance_type = self._instance_type_for(service, spec)
+        arm64 = instance_architecture(instance_type) == ARM64
+        creds = spec.docker.hub_credentials if spec.docker and spec.docker.hub_credentials else None
+        return template.render(
+            service_name=service.name,
+            region=spec.aws.region,
+            instance_type=instance_type,
+            architecture="arm64" if arm64 else "x86_64",
+            ubuntu_arch="arm64" if arm64 else "amd64",
+            docker_image=service.image,
+            # AWS CLI pré-installée pour publier les temps de boot
+            boot_metrics=spec.infrastructure.boot_metrics,
+            # Les identifiants restent hors du fichier (variables Packer) : seul leur usage est rendu
+            docker_login=bool(creds and creds.username and creds.password)
+        )
+    
+    @staticmethod
+    def image_build_id(definition: str) -> str:
+        """Identifiant d'une définition Packer (une golden image n'est réutilisée que pour la même définition)"""
+        return hashlib.sha256(definition.encode("utf-8")).hexdigest()[:16]
+    
+    def _golden_ami_for(self, service: Service, spec: DeploymentSpec) -> str | None:
+        """
+        AMI golden d'un service si le mode est actif et que images.lock.json
+        contient une image construite depuis la définition actuelle.
+        """
+        if not spec.infrastructure.golden_image or self.image_lock is None or not service.image:
+            return None
+        build_id = self.image_build_id(self.render_image_template(service, spec))
+        ami = self.image_lock.ami_for(service.name, build_id, spec.aws.region)
+        if ami is None:
+            emit(
+                "generate.golden_image_missing",
+                f"  ⚠ No golden image for {service.name} matches its definition: using stock Ubuntu "
+                f"(run `deploy bake` to build one)",
+                WARNING,
+                service=service.name
+            )
+        return ami
 
-        return "\n".join(lines)
+    def _user_data_for(self, service: Service, spec: DeploymentSpec, golden: bool) -> str:
+        """Script de démarrage du service, prêt à être placé dans un heredoc Terraform"""
+        return heredoc_escape(build_bootstrap_script(service, spec, golden=golden))
 
     def _generate_single_ec2_tf(self, service: Service, spec: DeploymentSpec) -> None:
         """Méthode existante pour EC2 simple"""
         # Charge le template ec2_instance.tf.j2
         template = self.jinja_env.get_template("ec2_instance.tf.j2")
         
-        # Utilise le mapper pour convertir machine_size en type d'instance AWS
-        instance_type = get_instance_type_for_service(
-            machine_size=spec.infrastructure.machine_size,
-            scalability=spec.infrastructure.scalability
-        )
+        # Utilise le mapper pour convertir machine_size (et le profil) en type d'instance AWS
+        instance_type = self._instance_type_for(service, spec)
+        golden_ami = self._golden_ami_for(service, spec)
         
         # Prépare les données pour le template
         context = {
             "service_name": service.name,           # Nom du service (ex: "backend")
             "instance_type": instance_type,          # Type d'instance (ex: "t3.medium")
+            # AMI golden du service, sinon Ubuntu x86_64 ou arm64
+            "ami_data_source": f"{service.name}_golden" if golden_ami else self._ami_data_source(instance_type),
+            "golden_ami_id": golden_ami,
             "region": spec.aws.region,
             "ports": service.ports,                 # Liste des ports (ex: [8080, 3000])
             "max_instances": 1,                     # Force à 1 ici
             "vpc_id": spec.infrastructure.vpc_id,    # Peut être None
             "docker_image": service.image,          # Image Docker si spécifiée (peut être None)
+            "user_data": self._user_data_for(service, spec, golden=golden_ami is not None),
+            "boot_metrics": spec.infrastructure.boot_metrics,  # Instance profile pour publier les temps de boot
             "tags": {}                              # Tags personnalisés (vide pour l'instant)
         }
         
@@ -276,20 +489,44 @@ class TerraformGenerator:
         rendered = template.render(**context)
         
         # Écrit le fichier avec le nom du service
-        output_file = self.output_dir / f"{service.name}_instance.tf"
-        output_file.write_text(rendered, encoding="utf-8")
+        self._write_file(self.output_dir / f"{service.name}_instance.tf", rendered)
+        
+        self._register_resources(
+            service.name,
+            f"aws_instance.{service.name}",
+            f"aws_security_group.{service.name}_sg"
+        )
 
     def _generate_asg_tf(self, service: Service, spec: DeploymentSpec, min_size: int, max_size: int, desired: int) -> None:
         """Génère la configuration ASG (Auto Scaling Group)"""
         template = self.jinja_env.get_template("asg.tf.j2")
         
-        instance_type = get_instance_type_for_service(spec.infrastructure.machine_size)
+        instance_type = self._instance_type_for(service, spec)
+        
+        # Golden image : Docker et l'image sont déjà sur l'AMI, le user data ne fait que lancer le conteneur
+        golden_ami = self._golden_ami_for(service, spec)
+        user_data = self._user_data_for(service, spec, golden=golden_ami is not None)
+        
+        # Politique de scaling (métrique suivie, cible, cooldown, warmup, paliers)
+        scaling_policy = get_scaling_policy_for_service(service, spec.infrastructure.scalability)
+        
+        # Warm pool : instances pré-initialisées (Docker installé, image tirée) prêtes pour le scale-out
+        warm_pool = get_warm_pool_for_service(service, spec.infrastructure.scalability)
+        grace_period = DEFAULT_HEALTH_CHECK_GRACE_PERIOD
+        if service.scaling and service.scaling.health_check_grace_period is not None:
+            grace_period = service.scaling.health_check_grace_period
         
-        user_data = self._build_docker_user_data(service, spec)
+        # En hibernation, la RAM est écrite sur le volume racine : il doit la contenir en plus du système
+        hibernation_volume_gib = None
+        if warm_pool and warm_pool["state"] == "Hibernated":
+            instance_spec = get_instance_spec(instance_type)
+            hibernation_volume_gib = 8 + math.ceil(instance_spec.memory_gib if instance_spec else 16)
         
         context = {
             "service_name": service.name,
             "instance_type": instance_type,
+            "ami_data_source": f"{service.name}_golden" if golden_ami else self._ami_data_source(instance_type),
+            "golden_ami_id": golden_ami,
             "key_name": spec.infrastructure.key_pair or "default-key",
             "min_size": min_size,
             "max_size": max_size,
@@ -297,27 +534,243 @@ class TerraformGenerator:
             "desired_capacity": desired,
             "subnet_ids": "aws_subnet.public[*].id" if not spec.infrastructure.vpc_id else '["subnet-12345"]', # Stub logic for existing VPC
             "user_data": user_data,
-            "vpc_id": "aws_vpc.main.id" if not spec.infrastructure.vpc_id else f'"{spec.infrastructure.vpc_id}"'
+            "vpc_id": "aws_vpc.main.id" if not spec.infrastructure.vpc_id else f'"{spec.infrastructure.vpc_id}"',
+            "scaling_policy": scaling_policy,
+            "warm_pool": warm_pool,
+            "health_check_grace_period": grace_period,
+            "hibernation_volume_gib": hibernation_volume_gib,
+            "boot_metrics": spec.infrastructure.boot_metrics,
+            # ALB du service, ou ALB partagé de son groupe
+            "lb_resource": self._load_balancer_resource(service)
         }
         
         rendered = template.render(**context)
-        output_file = self.output_dir / f"{service.name}_asg.tf"
-        output_file.write_text(rendered, encoding="utf-8")
+        self._write_file(self.output_dir / f"{service.name}_asg.tf", rendered)
+        
+        self._register_resources(
+            service.name,
+            f"aws_launch_template.{service.name}_lt",
+            f"aws_autoscaling_group.{service.name}_asg",
+            f"aws_security_group.{service.name}_sg"
+        )
+        if scaling_policy:
+            self._register_resources(service.name, f"aws_autoscaling_policy.{service.name}_target_tracking")
+            if scaling_policy["steps"]:
+                self._register_resources(
+                    service.name,
+                    f"aws_autoscaling_policy.{service.name}_step_scale_out",
+                    f"aws_cloudwatch_metric_alarm.{service.name}_scale_out"
+                )
 
+    def _load_balancer_group(self, service: Service) -> str | None:
+        """Groupe de l'ALB partagé qui sert le service (None en mode un ALB par service)"""
+        for group, shared in self.shared_load_balancers.items():
+            if service.name in shared["services"]:
+                return group
+        return None
+    
+    def _load_balancer_resource(self, service: Service) -> str:
+        """Nom de la ressource aws_lb (et préfixe de son security group) devant le service"""
+        group = self._load_balancer_group(service)
+        return f"shared_{group}_lb" if group else f"{service.name}_lb"
+    
     def _generate_alb_tf(self, service: Service, spec: DeploymentSpec) -> None:
-        """Génère la configuration ALB (Application Load Balancer)"""
+        """
+        Génère la configuration ALB (Application Load Balancer) d'un service.
+        En mode partagé, seuls le target group et la règle de listener du service sont générés.
+        """
         template = self.jinja_env.get_template("alb.tf.j2")
+        group = self._load_balancer_group(service)
+        rule = None
+        if group:
+            rule = next((r for r in self.shared_load_balancers[group]["rules"] if r["service"] == service.name), None)
         
         context = {
             "service_name": service.name,
             "vpc_id": "aws_vpc.main.id" if not spec.infrastructure.vpc_id else f'"{spec.infrastructure.vpc_id}"',
             "subnet_ids": "aws_subnet.public[*].id" if not spec.infrastructure.vpc_id else '["subnet-12345"]',
-            "container_port": service.ports[0] if service.ports else 80
+            # Health checks, drainage, slow start et algorithme (défauts selon la scalabilité)
+            "lb": get_load_balancer_settings(service, spec.infrastructure.scalability),
+            "shared": group is not None,
+            "group": group,
+            "rule": rule,
+            "lb_resource": self._load_balancer_resource(service),
+            # Tâches Fargate (awsvpc) : le target group vise l'IP de chaque tâche
+            "target_type": "ip" if service.type == ServiceType.ECS and self._ecs_launch_type(service) == "FARGATE" else None
         }
         
         rendered = template.render(**context)
-        output_file = self.output_dir / f"{service.name}_alb.tf"
-        output_file.write_text(rendered, encoding="utf-8")
+        self._write_file(self.output_dir / f"{service.name}_alb.tf", rendered)
+        
+        if group:
+            # L'ALB partagé n'appartient à aucun service : Terraform l'inclut via les références
+            self._register_resources(service.name, f"aws_lb_target_group.{service.name}_tg")
+            if rule:
+                self._register_resources(service.name, f"aws_lb_listener_rule.{service.name}_rule")
+            return
+        self._register_resources(
+            service.name,
+            f"aws_lb.{service.name}_lb",
+            f"aws_security_group.{service.name}_lb_sg",
+            f"aws_lb_target_group.{service.name}_tg",
+            f"aws_lb_listener.{service.name}_listener"
+        )
+    
+    def _generate_shared_alb_tf(self, group: str, spec: DeploymentSpec) -> None:
+        """Génère un ALB partagé : load balancer, security group et listener (action par défaut)"""
+        template = self.jinja_env.get_template("shared_alb.tf.j2")
+        shared = self.shared_load_balancers[group]
+        rendered = template.render(
+            group=group,
+            services=shared["services"],
+            default_service=shared["default_service"],
+            idle_timeout=shared["idle_timeout"],
+            http2=shared["http2"],
+            vpc_id="aws_vpc.main.id" if not spec.infrastructure.vpc_id else f'"{spec.infrastructure.vpc_id}"',
+            subnet_ids="aws_subnet.public[*].id" if not spec.infrastructure.vpc_id else '["subnet-12345"]'
+        )
+        self._write_file(self.output_dir / f"shared_{group}_alb.tf", rendered)
+    
+    def _ecs_launch_type(self, service: Service) -> str:
+        """Launch type d'un service ECS (FARGATE par défaut)"""
+        return service.ecs.launch_type if service.ecs else "FARGATE"
+    
+    def _generate_ecs_cluster_tf(self, ecs_services: List[Service], spec: DeploymentSpec) -> None:
+        """
+        Génère le cluster ECS partagé : capacity providers, rôle d'exécution des
+        tâches et, pour le launch type EC2, le rôle des instances et l'AMI ECS.
+        
+        Comme le VPC, ces ressources n'appartiennent à aucun service : Terraform
+        les inclut via les références lors d'un déploiement ciblé.
+        """
+        template = self.jinja_env.get_template("ecs_cluster.tf.j2")
+        ec2_hosted = [s for s in ecs_services if self._ecs_launch_type(s) == "EC2"]
+        
+        # AMI ECS optimisée (SSM) pour chaque architecture des instances
+        ami_parameters = {}
+        for service in ec2_hosted:
+            arch = "arm64" if instance_architecture(self._instance_type_for(service, spec)) == ARM64 else "x86_64"
+            ami_parameters[arch] = f"/aws/service/ecs/optimized-ami/amazon-linux-2023/{arch}/recommended/image_id"
+        
+        # Identifiants Docker Hub : chaînes HCL échappées, stockées dans Secrets Manager
+        docker_credentials = None
+        creds = spec.docker.hub_credentials if spec.docker and spec.docker.hub_credentials else None
+        if creds and creds.username and creds.password:
+            docker_credentials = {
+                "username": hcl_string(creds.username),
+                "password": hcl_string(creds.password),
+            }
+        
+        rendered = template.render(
+            services=[s.name for s in ecs_services],
+            cluster_name=self._ecs_cluster_name(),
+            ec2_services=[s.name for s in ec2_hosted],
+            docker_credentials=docker_credentials,
+            ami_parameters=ami_parameters
+        )
+        self._write_file(self.output_dir / "ecs_cluster.tf", rendered)
+    
+    def _ecs_cluster_name(self) -> str:
+        """
+        Nom du cluster ECS, propre au workspace : deux specs du même compte et de
+        la même région (mode flotte) ne gèrent pas le même cluster. Comme pour
+        workspace_dir_for, le nom dépend du chemin résolu du répertoire.
+        """
+        resolved = self.output_dir.resolve()
+        digest = hashlib.sha256(str(resolved).encode("utf-8")).hexdigest()[:12]
+        # Caractères autorisés par ECS : lettres, chiffres, '-' et '_' (255 au plus)
+        slug = "".join(c if c.isascii() and (c.isalnum() or c in "-_") else "-" for c in resolved.name)[:64]
+        return f"ctrl-alt-deploy-{slug}-{digest}"
+    
+    def _generate_ecs_service_tf(self, service: Service, spec: DeploymentSpec) -> None:
+        """
+        Génère un service ECS : task definition dimensionnée depuis machine_size,
+        service rattaché à l'ALB et Application Auto Scaling du nombre de tâches.
+        Avec le launch type EC2, génère aussi l'Auto Scaling Group des instances
+        et son capacity provider (managed scaling) ; les tâches y sont en mode
+        bridge (ports dynamiques), le nombre de tâches par instance n'étant pas
+        limité par les interfaces réseau.
+        """
+        template = self.jinja_env.get_template("ecs_service.tf.j2")
+        scalability = spec.infrastructure.scalability
+        launch_type = self._ecs_launch_type(service)
+        cpu, memory = get_task_size_for_service(service, spec.infrastructure.machine_size)
+        min_size, max_size, desired = get_scaling_config_for_service(service, scalability)
+        scaling_policy = get_ecs_scaling_policy(service, scalability)
+        
+        # Le type d'instance ne sert qu'au launch type EC2 (Fargate choisit seul son matériel)
+        instance_type = self._instance_type_for(service, spec) if launch_type == "EC2" else None
+        arm64 = instance_type is not None and instance_architecture(instance_type) == ARM64
+        
+        lb_resource = None
+        depends_on = []
+        if needs_load_balancer(service, scalability):
+            lb_resource = self._load_balancer_resource(service)
+            # Le target group doit être attaché à un listener avant la création du service
+            group = self._load_balancer_group(service)
+            if not group:
+                depends_on.append(f"aws_lb_listener.{service.name}_listener")
+            elif any(r["service"] == service.name for r in self.shared_load_balancers[group]["rules"]):
+                depends_on.append(f"aws_lb_listener_rule.{service.name}_rule")
+            else:
+                depends_on.append(f"aws_lb_listener.shared_{group}_listener")
+        if launch_type == "EC2":
+            depends_on.append("aws_ecs_cluster_capacity_providers.main")
+        
+        grace_period = DEFAULT_HEALTH_CHECK_GRACE_PERIOD
+        if service.scaling and service.scaling.health_check_grace_period is not None:
+            grace_period = service.scaling.health_check_grace_period
+        
+        creds = spec.docker.hub_credentials if spec.docker and spec.docker.hub_credentials else None
+        context = {
+            "service_name": service.name,
+            "launch_type": launch_type,
+            "cpu": cpu,
+            "memory": memory,
+            "arm64": arm64,
+            "instance_type": instance_type,
+            "docker_image": service.image,
+            "ports": service.ports,
+            "environment": [(name, hcl_string(value)) for name, value in service.environment.items()],
+            "docker_credentials": bool(creds and creds.username and creds.password),
+            "region": spec.aws.region,
+            "vpc_id": "aws_vpc.main.id" if not spec.infrastructure.vpc_id else f'"{spec.infrastructure.vpc_id}"',
+            "subnet_ids": "aws_subnet.public[*].id" if not spec.infrastructure.vpc_id else '["subnet-12345"]',
+            "desired_count": desired,
+            "min_size": min_size,
+            "max_size": max_size,
+            "scaling_policy": scaling_policy,
+            "health_check_grace_period": grace_period,
+            "lb_resource": lb_resource,
+            "lb_port": get_load_balancer_settings(service, scalability)["port"] if lb_resource else None,
+            "depends_on": depends_on
+        }
+        
+        rendered = template.render(**context)
+        self._write_file(self.output_dir / f"{service.name}_ecs.tf", rendered)
+        
+        self._register_resources(
+            service.name,
+            f"aws_cloudwatch_log_group.{service.name}_logs",
+            f"aws_ecs_task_definition.{service.name}_task",
+            f"aws_ecs_service.{service.name}"
+        )
+        if launch_type == "FARGATE":
+            self._register_resources(service.name, f"aws_security_group.{service.name}_sg")
+        if scaling_policy:
+            self._register_resources(
+                service.name,
+                f"aws_appautoscaling_target.{service.name}_scaling",
+                f"aws_appautoscaling_policy.{service.name}_target_tracking"
+            )
+        if launch_type == "EC2":
+            self._register_resources(
+                service.name,
+                f"aws_security_group.{service.name}_host_sg",
+                f"aws_launch_template.{service.name}_host_lt",
+                f"aws_autoscaling_group.{service.name}_host_asg",
+                f"aws_ecs_capacity_provider.{service.name}_cp"
+            )
     
     def _generate_rds_instance_tf(self, service: Service, spec: DeploymentSpec) -> None:
         """
@@ -333,7 +786,10 @@ class TerraformGenerator:
         # Utilise le mapper pour convertir machine_size + scalability en type d'instance RDS
         rds_instance_type = get_rds_instance_type_for_service(
             machine_size=spec.infrastructure.machine_size,
-            scalability=spec.infrastructure.scalability
+            scalability=spec.infrastructure.scalability,
+            service_machine_size=service.machine_size,
+            instance_type=service.instance_type,
+            profile=service.profile
         )
         
         # Convertit l'image Docker en moteur RDS
@@ -349,6 +805,16 @@ class TerraformGenerator:
         db_name = service.environment.get("MYSQL_DATABASE", service.environment.get("POSTGRES_DB", service.name))
         db_username = service.environment.get("MYSQL_USER", service.environment.get("POSTGRES_USER", "admin"))
         
+        # Stockage (taille, gp3/io2, IOPS, débit) et Performance Insights selon le tier de la classe
+        storage = get_rds_storage_settings(service, rds_engine, rds_instance_type)
+        
+        # Tier performance : parameter group dimensionné depuis la mémoire de la classe
+        parameter_group = None
+        if not is_burstable_rds_class(rds_instance_type):
+            parameter_group = get_rds_parameter_group(
+                rds_engine, rds_engine_version, rds_instance_type, storage["effective_iops"]
+            )
+        
         # Prépare les données pour le template
         context = {
             "service_name": service.name,
@@ -359,8 +825,14 @@ class TerraformGenerator:
             "db_name": db_name,
             "db_username": db_username,
             "db_password": db_password,
-            "allocated_storage": 20,  # 20 GB par défaut
-            "max_allocated_storage": 100,  # 100 GB max
+            "allocated_storage": storage["allocated_storage"],
+            "max_allocated_storage": storage["max_allocated_storage"],
+            "storage_type": storage["storage_type"],
+            "iops": storage["iops"],
+            "storage_throughput": storage["throughput"],
+            "performance_insights": storage["performance_insights"],
+            "performance_insights_retention": PERFORMANCE_INSIGHTS_RETENTION,
+            "parameter_group": parameter_group,
             "multi_az": spec.infrastructure.scalability == Scalability.HIGH,  # Multi-AZ pour haute disponibilité
             "vpc_id": spec.infrastructure.vpc_id,  # Peut être None
         }
@@ -370,8 +842,16 @@ class TerraformGenerator:
         
         # Écrit le fichier avec le nom du service
         # Ex: database_instance.tf
-        output_file = self.output_dir / f"{service.name}_instance.tf"
-        output_file.write_text(rendered, encoding="utf-8")
+        self._write_file(self.output_dir / f"{service.name}_instance.tf", rendered)
+        
+        self._register_resources(
+            service.name,
+            f"aws_db_instance.{service.name}",
+            f"aws_db_subnet_group.{service.name}_subnet_group",
+            f"aws_security_group.{service.name}_sg"
+        )
+        if parameter_group:
+            self._register_resources(service.name, f"aws_db_parameter_group.{service.name}_params")
     
     def _generate_vpc_tf(self, spec: DeploymentSpec) -> None:
         """
@@ -394,8 +874,20 @@ class TerraformGenerator:
         rendered = template.render(**context)
         
         # Écrit le fichier vpc.tf
-        output_file = self.output_dir / "vpc.tf"
-        output_file.write_text(rendered, encoding="utf-8")
+        self._write_file(self.output_dir / "vpc.tf", rendered)
+
+    
+    def _generate_boot_metrics_tf(self, spec: DeploymentSpec) -> None:
+        """
+        Génère le rôle IAM et l'instance profile qui autorisent les instances EC2
+        à publier leurs temps de boot (cloudwatch:PutMetricData, namespace dédié).
+        
+        Les ressources sont partagées : Terraform les inclut automatiquement
+        lors d'un déploiement ciblé d'un service qui les référence.
+        """
+        template = self.jinja_env.get_template("boot_metrics.tf.j2")
+        rendered = template.render(namespace=BOOT_METRICS_NAMESPACE)
+        self._write_file(self.output_dir / "boot_metrics.tf", rendered)
 
 
 def generate_terraform_config(spec: DeploymentSpec, output_dir: str = "terraform_output") -> Path:
@@ -0,0 +1,164 @@
+"""
+Golden images: AMIs with Docker installed and the service image pre-pulled.
+
+With `infrastructure.golden_image: true`, an EC2 service boots from its own
+AMI instead of stock Ubuntu. User data then only starts the container, so a
+scale-out no longer waits for `apt-get` and `docker pull`.
+
+- `deploy bake` renders one Packer definition per EC2 service
+  (`<workspace>/images/<service>/image.pkr.hcl`), builds it and records the
+  AMI in `images.lock.json` next to the spec
+- each lock entry remembers the hash of the definition it was built from
+  (build id); the generator only uses an AMI whose build id matches the
+  current definition, so changing the image, the region or the instance
+  architecture falls back to the stock AMI until the next `deploy bake`
+"""
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from infrastructure.executors.runners import CommandRunner, SubprocessRunner
+from utils.events import emit, BANNER, DETAIL, SUCCESS, ERROR
+
+LOCK_FILE = "images.lock.json"
+IMAGES_DIR = "images"
+TEMPLATE_FILE = "image.pkr.hcl"
+CREDENTIALS_FILE = "credentials.auto.pkrvars.json"
+
+# `packer build -machine-readable`: timestamp,target,artifact,index,id,region:ami,...
+_ARTIFACT_RE = re.compile(r"^\d*,[^,]*,artifact,\d+,id,(.+)$")
+
+
+def parse_packer_artifacts(output: str) -> Dict[str, str]:
+    """AMI per region from the machine-readable output of `packer build`."""
+    amis = {}
+    for line in output.splitlines():
+        match = _ARTIFACT_RE.match(line.strip())
+        if not match:
+            continue
+        for artifact in match.group(1).split("%!(PACKER_COMMA)"):
+            region, _, ami = artifact.partition(":")
+            if ami.startswith("ami-"):
+                amis[region] = ami
+    return amis
+
+
+class ImageLock:
+    """
+    Golden AMIs built for the services of one spec (`images.lock.json`).
+
+    Args:
+        path: Lock file
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._images: Dict[str, Dict[str, Any]] | None = None
+
+    @classmethod
+    def for_spec(cls, spec_path: str | Path) -> "ImageLock":
+        """Lock file next to a spec file."""
+        return cls(Path(spec_path).resolve().parent / LOCK_FILE)
+
+    @property
+    def images(self) -> Dict[str, Dict[str, Any]]:
+        if self._images is None:
+            try:
+                self._images = json.loads(self.path.read_text(encoding="utf-8")).get("images", {})
+            except FileNotFoundError:
+                self._images = {}
+        return self._images
+
+    def entry(self, service: str) -> Optional[Dict[str, Any]]:
+        return self.images.get(service)
+
+    def ami_for(self, service: str, build_id: str, region: str) -> Optional[str]:
+        """AMI of a service, if it was built from this exact definition in this region."""
+        entry = self.entry(service)
+        if not entry or entry.get("build_id") != build_id or entry.get("region") != region:
+            return None
+        return entry.get("ami_id")
+
+    def record(self, service: str, **entry: Any) -> None:
+        """Store the AMI built for a service and write the lock file."""
+        self.images[service] = {**entry, "built_at": time.time()}
+        document = {"version": 1, "images": dict(sorted(self.images.items()))}
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        tmp.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+        tmp.replace(self.path)
+
+
+class GoldenImageBuilder:
+    """
+    Build the golden images of a spec with Packer.
+
+    Args:
+        generator: TerraformGenerator whose output directory holds the Packer files
+        lock: Lock file receiving the built AMIs
+        runner: Command runner (defaults to SubprocessRunner)
+    """
+
+    def __init__(self, generator, lock: ImageLock, runner: CommandRunner | None = None):
+        self.generator = generator
+        self.lock = lock
+        self.runner = runner or SubprocessRunner()
+
+    def build(self, spec, services: List[str], force: bool = False) -> bool:
+        """Build the image of each service whose definition is not locked yet (all of them with force)."""
+        emit("bake.start", f"🍞 Baking golden images for: {', '.join(services)}", BANNER, services=services)
+        for name in services:
+            service = next(s for s in spec.application.services if s.name == name)
+            if not self._build_one(spec, service, force):
+                return False
+        return True
+
+    def _build_one(self, spec, service, force: bool) -> bool:
+        definition = self.generator.render_image_template(service, spec)
+        build_id = self.generator.image_build_id(definition)
+        region = spec.aws.region
+        locked = self.lock.ami_for(service.name, build_id, region)
+        if locked and not force:
+            emit("bake.skipped", f"↷ {service.name}: {locked} is up to date", DETAIL, service=service.name, ami_id=locked)
+            return True
+
+        image_dir = self.generator.output_dir / IMAGES_DIR / service.name
+        image_dir.mkdir(parents=True, exist_ok=True)
+        (image_dir / TEMPLATE_FILE).write_text(definition, encoding="utf-8")
+        creds = spec.docker.hub_credentials if spec.docker and spec.docker.hub_credentials else None
+        # Created 0600 from the start (O_CREAT applies the mode to new files only)
+        (image_dir / CREDENTIALS_FILE).unlink(missing_ok=True)
+        fd = os.open(image_dir / CREDENTIALS_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({
+                "access_key": spec.aws.access_key,
+                "secret_key": spec.aws.secret_key,
+                "docker_username": (creds.username if creds else None) or "",
+                "docker_password": (creds.password if creds else None) or "",
+            }, f)
+
+        emit("bake.service", f"🔨 {service.name}: building from {image_dir}", BANNER, service=service.name)
+        init = self.runner.run(["packer", "init", "."], image_dir)
+        if not init.ok:
+            emit("bake.failed", f"❌ {service.name}: packer init failed", ERROR,
+                 service=service.name, output=init.output[-4000:])
+            return False
+        result = self.runner.run(["packer", "build", "-machine-readable", "-color=false", "."], image_dir)
+        ami = parse_packer_artifacts(result.output).get(region)
+        if not result.ok or not ami:
+            emit("bake.failed", f"❌ {service.name}: packer build failed", ERROR,
+                 service=service.name, output=result.output[-4000:])
+            return False
+
+        self.lock.record(
+            service.name,
+            ami_id=ami,
+            region=region,
+            build_id=build_id,
+            docker_image=service.image,
+        )
+        emit("bake.built", f"✓ {service.name}: {ami} recorded in {self.lock.path.name}", SUCCESS,
+             service=service.name, ami_id=ami, seconds=round(init.duration + result.duration, 1))
+        return True
@@ -0,0 +1,234 @@
+"""
+Local inventory of a deployed workspace.
+
+After each successful apply, `terraform.tfstate` and `terraform output -json`
+are indexed into a SQLite database (`.deploy/inventory.db`): resources by
+service, type and ID, and outputs by service. `deploy status` and
+`deploy outputs` answer from this index instead of invoking Terraform.
+
+The state is read with iter_json_array, one resource at a time, so building
+the index of a state file of hundreds of MB keeps memory bounded.
+"""
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from infrastructure.json_stream import iter_json_array
+from infrastructure.executors.plan_analyzer import PlanAnalyzer
+
+# Attributes kept per resource instance (the full state is not duplicated)
+KEPT_ATTRIBUTES = (
+    "arn", "public_ip", "private_ip", "public_dns", "private_dns", "dns_name",
+    "endpoint", "address", "port", "status", "instance_state",
+)
+
+# Rows inserted per executemany() call while streaming the state
+_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE resources (
+    address TEXT PRIMARY KEY,
+    service TEXT NOT NULL,
+    resource_type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    resource_id TEXT,
+    attributes TEXT NOT NULL
+);
+CREATE TABLE outputs (
+    name TEXT PRIMARY KEY,
+    service TEXT NOT NULL,
+    value TEXT,
+    sensitive INTEGER NOT NULL
+);
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX idx_resources_service ON resources(service);
+CREATE INDEX idx_resources_type ON resources(resource_type);
+CREATE INDEX idx_resources_id ON resources(resource_id);
+CREATE INDEX idx_outputs_service ON outputs(service);
+"""
+
+
+def _instance_address(resource: Dict[str, Any], instance: Dict[str, Any]) -> str:
+    """Terraform address of one instance of a state resource (module.x.aws_instance.web[0])."""
+    address = f"{resource.get('type', '')}.{resource.get('name', '')}"
+    if resource.get("mode") == "data":
+        address = f"data.{address}"
+    if resource.get("module"):
+        address = f"{resource['module']}.{address}"
+    if "index_key" in instance:
+        key = instance["index_key"]
+        address += f"[{json.dumps(key)}]"
+    return address
+
+
+def iter_state_instances(state_path: str | Path) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one record per resource instance of a state file:
+    {"address", "resource_type", "name", "mode", "resource_id", "attributes"}.
+    """
+    with open(state_path, "r", encoding="utf-8") as f:
+        for resource in iter_json_array(f, "resources"):
+            for instance in resource.get("instances") or []:
+                attributes = instance.get("attributes") or {}
+                resource_id = attributes.get("id")
+                yield {
+                    "address": _instance_address(resource, instance),
+                    "resource_type": resource.get("type", ""),
+                    "name": resource.get("name", ""),
+                    "mode": resource.get("mode", "managed"),
+                    "resource_id": str(resource_id) if resource_id is not None else None,
+                    "attributes": {
+                        key: attributes[key] for key in KEPT_ATTRIBUTES
+                        if attributes.get(key) not in (None, "")
+                    },
+                }
+
+
+class Inventory:
+    """
+    SQLite index of the resources and outputs of one workspace.
+
+    Args:
+        path: Database file (usually `.deploy/inventory.db`)
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    @contextmanager
+    def _connect(self, path: Path | None = None) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(path or self.path)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def rebuild(
+        self,
+        state_path: str | Path | None,
+        outputs_path: str | Path | None,
+        resource_addresses: Optional[Dict[str, List[str]]] = None,
+        state_identity: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, int]:
+        """
+        Replace the index with the content of a state file and of a
+        `terraform output -json` document (either may be None or missing).
+
+        The new index is built next to the old one and swapped in atomically,
+        so readers never see a half-built inventory. Returns the number of
+        indexed resources and outputs.
+        """
+        analyzer = PlanAnalyzer(resource_addresses)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.unlink(missing_ok=True)
+
+        counts = {"resources": 0, "outputs": 0}
+        with self._connect(tmp) as conn:
+            conn.executescript(_SCHEMA)
+
+            if state_path and Path(state_path).exists():
+                batch = []
+                for record in iter_state_instances(state_path):
+                    batch.append((
+                        record["address"], analyzer.service_for(record["address"]), record["resource_type"],
+                        record["name"], record["mode"], record["resource_id"], json.dumps(record["attributes"])
+                    ))
+                    if len(batch) >= _BATCH_SIZE:
+                        counts["resources"] += self._insert_resources(conn, batch)
+                        batch = []
+                counts["resources"] += self._insert_resources(conn, batch)
+
+            if outputs_path and Path(outputs_path).exists():
+                # `terraform output -json` is small: one entry per output block
+                outputs = json.loads(Path(outputs_path).read_text(encoding="utf-8") or "{}")
+                if not isinstance(outputs, dict):
+                    raise ValueError(f"{outputs_path} is not a `terraform output -json` document")
+                outputs = {name: output for name, output in outputs.items() if isinstance(output, dict)}
+                conn.executemany(
+                    "INSERT OR REPLACE INTO outputs (name, service, value, sensitive) VALUES (?, ?, ?, ?)",
+                    [
+                        (
+                            name,
+                            analyzer.service_for(name),
+                            # Secrets stay in the state, the index only knows they exist
+                            None if output.get("sensitive") else json.dumps(output.get("value")),
+                            int(bool(output.get("sensitive")))
+                        )
+                        for name, output in outputs.items()
+                    ]
+                )
+                counts["outputs"] = len(outputs)
+
+            meta = {"updated_at": time.time(), **(state_identity or {}), **counts}
+            conn.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in meta.items()]
+            )
+
+        os.replace(tmp, self.path)
+        return counts
+
+    @staticmethod
+    def _insert_resources(conn: sqlite3.Connection, rows: List[tuple]) -> int:
+        conn.executemany(
+            "INSERT OR REPLACE INTO resources "
+            "(address, service, resource_type, name, mode, resource_id, attributes) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        return len(rows)
+
+    def info(self) -> Dict[str, Any]:
+        """When the index was built, from which state serial, and its counts."""
+        with self._connect() as conn:
+            return {row["key"]: json.loads(row["value"]) for row in conn.execute("SELECT key, value FROM meta")}
+
+    def resources(
+        self,
+        service: Optional[str] = None,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Indexed resources, optionally filtered, sorted by service then address."""
+        filters = {"service": service, "resource_type": resource_type, "resource_id": resource_id}
+        clauses = [f"{column} = ?" for column, value in filters.items() if value is not None]
+        params = tuple(value for value in filters.values() if value is not None)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT * FROM resources{where} ORDER BY service, address", params).fetchall()
+        return [{**dict(row), "attributes": json.loads(row["attributes"])} for row in rows]
+
+    def outputs(self, service: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Indexed outputs (value None for sensitive ones), sorted by service then name."""
+        where, params = (" WHERE service = ?", (service,)) if service else ("", ())
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT * FROM outputs{where} ORDER BY service, name", params).fetchall()
+        return [self._output(row) for row in rows]
+
+    def output(self, name: str) -> Optional[Dict[str, Any]]:
+        """One output by name, or None if it is not indexed."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM outputs WHERE name = ?", (name,)).fetchone()
+        return self._output(row) if row else None
+
+    @staticmethod
+    def _output(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "name": row["name"],
+            "service": row["service"],
+            "value": json.loads(row["value"]) if row["value"] is not None else None,
+            "sensitive": bool(row["sensitive"]),
+        }
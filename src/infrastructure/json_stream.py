@@ -0,0 +1,136 @@
+"""
+Streaming reader for large JSON documents (Terraform plans and states).
+
+`terraform show -json` and `terraform.tfstate` can reach hundreds of MB. We
+only ever need one top-level array from them (`resource_changes`,
+`resources`), so instead of json.load() we scan the document in fixed-size
+chunks and decode that array one element at a time. Memory use is bounded by
+the chunk size plus the largest single element.
+"""
+import json
+import re
+from typing import IO, Any, Iterator
+
+
+CHUNK_SIZE = 1 << 16
+
+_STRUCTURAL_RE = re.compile(r'["{}\[\]]')
+_STRING_RE = re.compile(r'"([^"\\]*(?:\\.[^"\\]*)*)"', re.DOTALL)
+_WHITESPACE_RE = re.compile(r'\s*')
+_DECODER = json.JSONDecoder()
+
+
+class _Buffer:
+    """Sliding text window over a file object."""
+
+    def __init__(self, f: IO[str], chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Drop consumed text and read more. Returns False at end of file."""
+        if self.eof:
+            return False
+        # Read at least as much as we already hold so large elements do not
+        # trigger a quadratic number of re-decodes
+        size = max(self.chunk_size, len(self.text) - self.pos)
+        data = self.f.read(size)
+        self.text = self.text[self.pos:] + data
+        self.pos = 0
+        if not data:
+            self.eof = True
+        return bool(data)
+
+    def skip_whitespace(self) -> str:
+        """Skip whitespace and return the next character ('' at end of file)."""
+        while True:
+            self.pos = _WHITESPACE_RE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def read_string(self) -> str:
+        """Read the JSON string starting at the current position (on the opening quote)."""
+        while True:
+            match = _STRING_RE.match(self.text, self.pos)
+            if match:
+                self.pos = match.end()
+                return match.group(1)
+            if not self.fill():
+                raise ValueError("Unterminated string in JSON document")
+
+    def decode_value(self) -> Any:
+        """Decode one complete JSON value at the current position."""
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number may be cut at the end of the window: "12." decodes as 12,
+            # so also refill when the next character could continue a number
+            cut = end == len(self.text) or self.text[end] in ".eE+-"
+            if cut and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(f: IO[str], key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Yield the elements of the array stored under a top-level `key`.
+
+    Nothing is yielded when the key is missing or its value is not an array.
+
+    Args:
+        f: Text file object positioned at the start of a JSON object
+        key: Top-level key whose array should be streamed
+        chunk_size: Number of characters read at a time
+    """
+    buf = _Buffer(f, chunk_size)
+    depth = 0
+
+    while True:
+        match = _STRUCTURAL_RE.search(buf.text, buf.pos)
+        if not match:
+            # Keep nothing: outside strings, the skipped text has no meaning for us
+            buf.pos = len(buf.text)
+            if not buf.fill():
+                return
+            continue
+
+        char = match.group(0)
+        buf.pos = match.start()
+
+        if char == '"':
+            name = buf.read_string()
+            if depth != 1 or buf.skip_whitespace() != ":":
+                continue
+            buf.pos += 1
+            if name != key:
+                continue
+            if buf.skip_whitespace() != "[":
+                return
+            buf.pos += 1
+            yield from _iter_array_elements(buf)
+            return
+
+        buf.pos += 1
+        depth += 1 if char in "{[" else -1
+
+
+def _iter_array_elements(buf: _Buffer) -> Iterator[Any]:
+    """Yield elements until the closing bracket of the current array."""
+    while True:
+        char = buf.skip_whitespace()
+        if char == "]" or char == "":
+            return
+        if char == ",":
+            buf.pos += 1
+            continue
+        yield buf.decode_value()
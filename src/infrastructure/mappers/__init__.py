@@ -6,8 +6,24 @@ from .instance_mapper import (
     map_machine_size_to_instance_type,
     map_scalability_to_max_instances,
     get_instance_type_for_service,
+    select_instance_type_for_profile,
+    validate_instance_type,
+    get_scaling_config_for_service,
+    get_scaling_policy_for_service,
+    get_warm_pool_for_service,
     MACHINE_SIZE_TO_INSTANCE_TYPE,
-    SCALABILITY_TO_MAX_INSTANCES
+    SCALABILITY_TO_MAX_INSTANCES,
+    SCALABILITY_TO_SCALING_POLICY,
+    DEFAULT_HEALTH_CHECK_GRACE_PERIOD,
+    PROFILE_REQUIREMENTS
+)
+
+from .instance_catalog import (
+    INSTANCE_CATALOG,
+    InstanceType,
+    get_instance_spec,
+    instance_architecture,
+    find_instance_types
 )
 
 from .rds_mapper import (
@@ -16,9 +32,32 @@ from .rds_mapper import (
     map_docker_image_to_rds_engine,
     get_rds_engine_version,
     get_rds_instance_type_for_service,
+    validate_rds_instance_type,
+    is_burstable_rds_class,
+    get_gp3_baseline,
+    get_gp3_provisioning_threshold,
+    get_rds_storage_settings,
+    get_rds_parameter_group,
     MACHINE_SIZE_TO_RDS_INSTANCE_TYPE,
     SCALABILITY_TO_RDS_INSTANCE_TYPE,
-    DOCKER_IMAGE_TO_RDS_ENGINE
+    DOCKER_IMAGE_TO_RDS_ENGINE,
+    RDS_INSTANCE_TYPES
+)
+
+from .load_balancer_mapper import (
+    get_load_balancer_settings,
+    get_shared_load_balancers,
+    needs_load_balancer,
+    SCALABILITY_TO_LOAD_BALANCER,
+    DEFAULT_LOAD_BALANCER_GROUP
+)
+
+from .ecs_mapper import (
+    get_task_size_for_service,
+    get_ecs_scaling_policy,
+    is_valid_fargate_task_size,
+    MACHINE_SIZE_TO_TASK_SIZE,
+    FARGATE_TASK_MEMORY
 )
 
 __all__ = [
@@ -26,16 +65,49 @@ __all__ = [
     'map_machine_size_to_instance_type',
     'map_scalability_to_max_instances',
     'get_instance_type_for_service',
+    'select_instance_type_for_profile',
+    'validate_instance_type',
+    'get_scaling_config_for_service',
+    'get_scaling_policy_for_service',
+    'get_warm_pool_for_service',
     'MACHINE_SIZE_TO_INSTANCE_TYPE',
     'SCALABILITY_TO_MAX_INSTANCES',
+    'SCALABILITY_TO_SCALING_POLICY',
+    'DEFAULT_HEALTH_CHECK_GRACE_PERIOD',
+    'PROFILE_REQUIREMENTS',
+    # Catalogue d'instances
+    'INSTANCE_CATALOG',
+    'InstanceType',
+    'get_instance_spec',
+    'instance_architecture',
+    'find_instance_types',
     # RDS mappers
     'map_machine_size_to_rds_instance_type',
     'map_scalability_to_rds_instance_type',
     'map_docker_image_to_rds_engine',
     'get_rds_engine_version',
     'get_rds_instance_type_for_service',
+    'validate_rds_instance_type',
+    'is_burstable_rds_class',
+    'get_gp3_baseline',
+    'get_gp3_provisioning_threshold',
+    'get_rds_storage_settings',
+    'get_rds_parameter_group',
     'MACHINE_SIZE_TO_RDS_INSTANCE_TYPE',
     'SCALABILITY_TO_RDS_INSTANCE_TYPE',
-    'DOCKER_IMAGE_TO_RDS_ENGINE'
+    'DOCKER_IMAGE_TO_RDS_ENGINE',
+    'RDS_INSTANCE_TYPES',
+    # Load balancer
+    'get_load_balancer_settings',
+    'get_shared_load_balancers',
+    'needs_load_balancer',
+    'SCALABILITY_TO_LOAD_BALANCER',
+    'DEFAULT_LOAD_BALANCER_GROUP',
+    # ECS
+    'get_task_size_for_service',
+    'get_ecs_scaling_policy',
+    'is_valid_fargate_task_size',
+    'MACHINE_SIZE_TO_TASK_SIZE',
+    'FARGATE_TASK_MEMORY'
 ]
 
@@ -0,0 +1,89 @@
+"""
+Mapper pour les services ECS (tâches Fargate ou EC2).
+
+Ce module fait le mapping entre :
+- Les tailles de machines abstraites (S, M, L, XL) → CPU et mémoire d'une tâche
+- La politique de scaling du service → Application Auto Scaling du nombre de tâches
+
+Pourquoi ECS ?
+- Ajouter une tâche prend quelques secondes (l'image est déjà sur l'hôte ou tirée
+  par Fargate), alors qu'un scale-out d'ASG démarre une VM entière en minutes
+- Le scale-out peut donc suivre la charge de près : cooldown court à la hausse,
+  cooldown de la politique à la baisse
+"""
+
+from typing import Any, Dict, Optional, Tuple
+from models.models import MachineSize, Scalability
+from infrastructure.mappers.instance_mapper import get_scaling_policy_for_service
+
+
+# Taille d'une tâche par taille de machine
+# Format : {MachineSize: (unités CPU, mémoire MiB)} - 1024 unités = 1 vCPU
+MACHINE_SIZE_TO_TASK_SIZE: Dict[MachineSize, Tuple[int, int]] = {
+    MachineSize.S: (256, 512),
+    MachineSize.M: (512, 1024),
+    MachineSize.L: (1024, 2048),
+    MachineSize.XL: (2048, 4096),
+}
+
+# Combinaisons CPU / mémoire acceptées par Fargate
+# Format : {unités CPU: (mémoire min, mémoire max, pas)} en MiB
+FARGATE_TASK_MEMORY: Dict[int, Tuple[int, int, int]] = {
+    256: (512, 2048, 0),  # pas 0 : 512, 1024 ou 2048 uniquement
+    512: (1024, 4096, 1024),
+    1024: (2048, 8192, 1024),
+    2048: (4096, 16384, 1024),
+    4096: (8192, 30720, 1024),
+    8192: (16384, 61440, 4096),
+    16384: (32768, 122880, 8192),
+}
+
+# Cooldown maximal (secondes) entre deux scale-out de tâches
+ECS_SCALE_OUT_COOLDOWN = 60
+
+
+def is_valid_fargate_task_size(cpu: int, memory: int) -> bool:
+    """True si Fargate accepte cette combinaison CPU / mémoire"""
+    if cpu not in FARGATE_TASK_MEMORY:
+        return False
+    # 256 unités : 512, 1024 ou 2048 MiB seulement
+    if cpu == 256:
+        return memory in (512, 1024, 2048)
+    low, high, step = FARGATE_TASK_MEMORY[cpu]
+    return low <= memory <= high and (memory - low) % step == 0
+
+
+def get_task_size_for_service(service: 'Service', global_machine_size: MachineSize) -> Tuple[int, int]:
+    """
+    Détermine le CPU et la mémoire d'une tâche ECS.
+    Priorité : service.ecs.cpu/memory > service.machine_size > taille globale.
+
+    Returns:
+        Un tuple (unités CPU, mémoire MiB)
+    """
+    if service.ecs and service.ecs.cpu is not None:
+        return (service.ecs.cpu, service.ecs.memory)
+    return MACHINE_SIZE_TO_TASK_SIZE[service.machine_size or global_machine_size]
+
+
+def get_ecs_scaling_policy(service: 'Service', global_scalability: Scalability) -> Optional[Dict[str, Any]]:
+    """
+    Détermine la politique Application Auto Scaling (target tracking) d'un service ECS.
+
+    Même métrique, même cible que pour un ASG ; les paliers (step scaling)
+    ne sont pas utilisés, le target tracking de tâches réagissant assez vite.
+
+    Returns:
+        None si le nombre de tâches est fixe (min == max), sinon un dict
+        {"metric", "target", "custom_metric", "scale_in_cooldown", "scale_out_cooldown"}
+    """
+    policy = get_scaling_policy_for_service(service, global_scalability)
+    if policy is None:
+        return None
+    return {
+        "metric": policy["metric"],
+        "target": policy["target"],
+        "custom_metric": policy["custom_metric"],
+        "scale_in_cooldown": policy["cooldown"],
+        "scale_out_cooldown": min(policy["cooldown"], ECS_SCALE_OUT_COOLDOWN),
+    }
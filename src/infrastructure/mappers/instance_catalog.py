@@ -0,0 +1,166 @@
+"""
+Catalogue hors-ligne des types d'instances EC2.
+
+Ce module contient, pour chaque type d'instance connu :
+- Le nombre de vCPU et la mémoire (GiB)
+- La bande passante réseau maximale (Gbps, valeur "jusqu'à")
+- L'architecture (x86_64 ou arm64 pour Graviton)
+- Si le type est "burstable" (t3, t4g : crédits CPU limités)
+- Si le type est de génération actuelle
+- Le prix horaire à la demande (USD, us-east-1, Linux)
+
+Pourquoi un catalogue local ?
+- Le choix du type d'instance se fait à la génération, sans appel à l'API AWS
+- La génération reste déterministe (même spec → mêmes fichiers .tf)
+- Les prix servent uniquement à départager les types qui conviennent ;
+  ils sont indicatifs et mis à jour à la main
+"""
+
+import re
+from typing import Dict, List, Optional
+
+
+X86_64 = "x86_64"
+ARM64 = "arm64"
+
+
+class InstanceType:
+    """Caractéristiques d'un type d'instance EC2"""
+
+    def __init__(
+        self,
+        name: str,
+        vcpu: int,
+        memory_gib: float,
+        network_gbps: float,
+        architecture: str,
+        burstable: bool,
+        current_generation: bool,
+        hourly_price: float
+    ):
+        self.name = name
+        self.vcpu = vcpu
+        self.memory_gib = memory_gib
+        self.network_gbps = network_gbps
+        self.architecture = architecture
+        self.burstable = burstable
+        self.current_generation = current_generation
+        self.hourly_price = hourly_price
+
+    @property
+    def family(self) -> str:
+        """Famille du type (ex: "m7i" pour "m7i.large")"""
+        return self.name.split(".", 1)[0]
+
+
+# Format : (nom, vCPU, mémoire GiB, réseau Gbps, architecture, burstable, génération actuelle, prix horaire USD)
+_CATALOG_ROWS = [
+    # Burstable x86 (crédits CPU) - utilisés par le mapping S/M/L/XL par défaut
+    ("t3.micro", 2, 1, 5, X86_64, True, True, 0.0104),
+    ("t3.small", 2, 2, 5, X86_64, True, True, 0.0208),
+    ("t3.medium", 2, 4, 5, X86_64, True, True, 0.0416),
+    ("t3.large", 2, 8, 5, X86_64, True, True, 0.0832),
+    ("t3.xlarge", 4, 16, 5, X86_64, True, True, 0.1664),
+    ("t3.2xlarge", 8, 32, 5, X86_64, True, True, 0.3328),
+    # Burstable Graviton
+    ("t4g.micro", 2, 1, 5, ARM64, True, True, 0.0084),
+    ("t4g.small", 2, 2, 5, ARM64, True, True, 0.0168),
+    ("t4g.medium", 2, 4, 5, ARM64, True, True, 0.0336),
+    ("t4g.large", 2, 8, 5, ARM64, True, True, 0.0672),
+    ("t4g.xlarge", 4, 16, 5, ARM64, True, True, 0.1344),
+    # Calcul (2 GiB par vCPU)
+    ("c7i.large", 2, 4, 12.5, X86_64, False, True, 0.08925),
+    ("c7i.xlarge", 4, 8, 12.5, X86_64, False, True, 0.1785),
+    ("c7i.2xlarge", 8, 16, 12.5, X86_64, False, True, 0.357),
+    ("c7i.4xlarge", 16, 32, 12.5, X86_64, False, True, 0.714),
+    ("c7i.8xlarge", 32, 64, 12.5, X86_64, False, True, 1.428),
+    ("c7g.large", 2, 4, 12.5, ARM64, False, True, 0.0725),
+    ("c7g.xlarge", 4, 8, 12.5, ARM64, False, True, 0.145),
+    ("c7g.2xlarge", 8, 16, 15, ARM64, False, True, 0.29),
+    ("c7g.4xlarge", 16, 32, 15, ARM64, False, True, 0.58),
+    # Usage général (4 GiB par vCPU)
+    ("m7i.large", 2, 8, 12.5, X86_64, False, True, 0.1008),
+    ("m7i.xlarge", 4, 16, 12.5, X86_64, False, True, 0.2016),
+    ("m7i.2xlarge", 8, 32, 12.5, X86_64, False, True, 0.4032),
+    ("m7i.4xlarge", 16, 64, 12.5, X86_64, False, True, 0.8064),
+    ("m7i.8xlarge", 32, 128, 12.5, X86_64, False, True, 1.6128),
+    ("m7g.large", 2, 8, 12.5, ARM64, False, True, 0.0816),
+    ("m7g.xlarge", 4, 16, 12.5, ARM64, False, True, 0.1632),
+    ("m7g.2xlarge", 8, 32, 15, ARM64, False, True, 0.3264),
+    ("m7g.4xlarge", 16, 64, 15, ARM64, False, True, 0.6528),
+    # Mémoire (8 GiB par vCPU)
+    ("r7i.large", 2, 16, 12.5, X86_64, False, True, 0.1323),
+    ("r7i.xlarge", 4, 32, 12.5, X86_64, False, True, 0.2646),
+    ("r7i.2xlarge", 8, 64, 12.5, X86_64, False, True, 0.5292),
+    ("r7i.4xlarge", 16, 128, 12.5, X86_64, False, True, 1.0584),
+    ("r7i.8xlarge", 32, 256, 12.5, X86_64, False, True, 2.1168),
+    ("r7g.large", 2, 16, 12.5, ARM64, False, True, 0.1071),
+    ("r7g.xlarge", 4, 32, 12.5, ARM64, False, True, 0.2142),
+    ("r7g.2xlarge", 8, 64, 15, ARM64, False, True, 0.4284),
+    ("r7g.4xlarge", 16, 128, 15, ARM64, False, True, 0.8568),
+    # Réseau renforcé
+    ("c6in.large", 2, 4, 25, X86_64, False, True, 0.1134),
+    ("c6in.xlarge", 4, 8, 30, X86_64, False, True, 0.2268),
+    ("c6in.2xlarge", 8, 16, 40, X86_64, False, True, 0.4536),
+    ("c6in.4xlarge", 16, 32, 50, X86_64, False, True, 0.9072),
+    ("c7gn.large", 2, 4, 30, ARM64, False, True, 0.1248),
+    ("c7gn.xlarge", 4, 8, 40, ARM64, False, True, 0.2496),
+    ("c7gn.2xlarge", 8, 16, 50, ARM64, False, True, 0.4992),
+    ("c7gn.4xlarge", 16, 32, 50, ARM64, False, True, 0.9984),
+    # Génération précédente (acceptée en override, jamais choisie automatiquement)
+    ("c5.large", 2, 4, 10, X86_64, False, False, 0.085),
+    ("c5.xlarge", 4, 8, 10, X86_64, False, False, 0.17),
+    ("m5.large", 2, 8, 10, X86_64, False, False, 0.096),
+    ("m5.xlarge", 4, 16, 10, X86_64, False, False, 0.192),
+    ("r5.large", 2, 16, 10, X86_64, False, False, 0.126),
+    ("r5.xlarge", 4, 32, 10, X86_64, False, False, 0.252),
+]
+
+INSTANCE_CATALOG: Dict[str, InstanceType] = {
+    row[0]: InstanceType(*row) for row in _CATALOG_ROWS
+}
+
+# Familles Graviton : un "g" juste après le numéro de génération (m7g, c7gn, t4g, ...)
+_GRAVITON_FAMILY_RE = re.compile(r"^[a-z]+\d+g")
+
+
+def get_instance_spec(instance_type: str) -> Optional[InstanceType]:
+    """Retourne les caractéristiques d'un type, ou None s'il n'est pas au catalogue"""
+    return INSTANCE_CATALOG.get(instance_type)
+
+
+def instance_architecture(instance_type: str) -> str:
+    """
+    Architecture d'un type d'instance (x86_64 ou arm64).
+
+    Les types absents du catalogue sont reconnus par leur nom de famille.
+    """
+    spec = get_instance_spec(instance_type)
+    if spec:
+        return spec.architecture
+    return ARM64 if _GRAVITON_FAMILY_RE.match(instance_type) else X86_64
+
+
+def find_instance_types(
+    min_vcpu: int,
+    min_memory_gib: float,
+    min_network_gbps: float = 0,
+    architecture: str = X86_64,
+    allow_burstable: bool = False,
+    current_generation_only: bool = True
+) -> List[InstanceType]:
+    """
+    Retourne les types qui satisfont les besoins, du moins cher au plus cher.
+
+    À prix égal, le type avec le plus de bande passante réseau passe en premier.
+    """
+    candidates = [
+        spec for spec in INSTANCE_CATALOG.values()
+        if spec.vcpu >= min_vcpu
+        and spec.memory_gib >= min_memory_gib
+        and spec.network_gbps >= min_network_gbps
+        and spec.architecture == architecture
+        and (allow_burstable or not spec.burstable)
+        and (spec.current_generation or not current_generation_only)
+    ]
+    return sorted(candidates, key=lambda spec: (spec.hourly_price, -spec.network_gbps, spec.name))
@@ -4,6 +4,8 @@ Mapper pour convertir les abstractions (S, M, L, XL) en types d'instances AWS r
 Ce module fait le mapping entre :
 - Les tailles de machines abstraites (S, M, L, XL) → Types d'instances EC2 AWS
 - Les niveaux de scalabilité (LOW, MED, HIGH) → Types d'instances EC2 AWS
+- Un profil de charge (compute, memory, ...) + une taille → le type le moins
+  cher du catalogue (instance_catalog.py) qui couvre les besoins
 
 Pourquoi ce mapping est nécessaire ?
 - L'utilisateur spécifie des abstractions simples (S, M, L, XL)
@@ -11,8 +13,9 @@ Pourquoi ce mapping est nécessaire ?
 - Ce mapper fait la traduction automatique
 """
 
-from typing import Dict
-from models.models import MachineSize, Scalability
+from typing import Any, Dict, List, Optional, Tuple
+from models.models import MachineSize, Scalability, WorkloadProfile, ScalingMetric
+from infrastructure.mappers.instance_catalog import find_instance_types, INSTANCE_CATALOG, X86_64, ARM64
 
 
 # Mapping des tailles de machines vers les types d'instances EC2
@@ -25,6 +28,38 @@ MACHINE_SIZE_TO_INSTANCE_TYPE: Dict[MachineSize, str] = {
     MachineSize.XL: "t3.xlarge",     # Très grand : 4 vCPU, 16 GB RAM - Idéal pour apps intensives
 }
 
+# Besoins minimaux par profil de charge et par taille
+# Format : {WorkloadProfile: {MachineSize: (vCPU, mémoire GiB, réseau Gbps)}}
+# Contrairement au mapping par défaut (t3), ces profils excluent les types
+# burstable : pas de crédits CPU épuisés sous charge soutenue. XL donne 16 vCPU.
+PROFILE_REQUIREMENTS: Dict[WorkloadProfile, Dict[MachineSize, Tuple[int, float, float]]] = {
+    # Calcul : 2 GiB par vCPU (famille c)
+    WorkloadProfile.COMPUTE: {
+        MachineSize.S: (2, 4, 0), MachineSize.M: (4, 8, 0),
+        MachineSize.L: (8, 16, 0), MachineSize.XL: (16, 32, 0),
+    },
+    # Usage général : 4 GiB par vCPU (famille m)
+    WorkloadProfile.BALANCED: {
+        MachineSize.S: (2, 8, 0), MachineSize.M: (4, 16, 0),
+        MachineSize.L: (8, 32, 0), MachineSize.XL: (16, 64, 0),
+    },
+    # Mémoire : 8 GiB par vCPU (famille r)
+    WorkloadProfile.MEMORY: {
+        MachineSize.S: (2, 16, 0), MachineSize.M: (4, 32, 0),
+        MachineSize.L: (8, 64, 0), MachineSize.XL: (16, 128, 0),
+    },
+    # Réseau : au moins 25 Gbps (50 en XL)
+    WorkloadProfile.NETWORK: {
+        MachineSize.S: (2, 4, 25), MachineSize.M: (4, 8, 25),
+        MachineSize.L: (8, 16, 25), MachineSize.XL: (16, 32, 50),
+    },
+    # ARM : besoins "balanced", sur Graviton (arm64)
+    WorkloadProfile.ARM: {
+        MachineSize.S: (2, 8, 0), MachineSize.M: (4, 16, 0),
+        MachineSize.L: (8, 32, 0), MachineSize.XL: (16, 64, 0),
+    },
+}
+
 # Mapping des niveaux de scalabilité vers le nombre maximum d'instances
 # Format : {Scalability: int}
 # LOW: 1 (une seule machine), MED: 3 (petit groupe), HIGH: 10 (groupe plus large)
@@ -34,6 +69,22 @@ SCALABILITY_TO_MAX_INSTANCES: Dict[Scalability, int] = {
     Scalability.HIGH: 10,
 }
 
+# Politique de scaling par défaut selon le niveau de scalabilité
+# Format : {Scalability: (cible CPU %, cooldown s, warmup s, paliers [(au-dessus de la cible, instances ajoutées)])}
+# Plus la scalabilité est haute, plus on scale tôt et vite ; HIGH ajoute des
+# paliers pour absorber les pics que le suivi de cible seul rattrape trop lentement.
+SCALABILITY_TO_SCALING_POLICY: Dict[Scalability, Tuple[float, int, int, List[Tuple[float, int]]]] = {
+    Scalability.LOW: (70.0, 300, 300, []),
+    Scalability.MED: (60.0, 300, 300, []),
+    Scalability.HIGH: (50.0, 120, 180, [(20.0, 2), (35.0, 4)]),
+}
+
+# Cible par défaut quand la métrique est le nombre de requêtes ALB par instance
+DEFAULT_REQUEST_COUNT_TARGET = 1000.0
+
+# Délai (secondes) avant les premiers health checks d'une nouvelle instance
+DEFAULT_HEALTH_CHECK_GRACE_PERIOD = 300
+
 
 def map_machine_size_to_instance_type(machine_size: MachineSize) -> str:
     """
@@ -58,6 +109,33 @@ def map_machine_size_to_instance_type(machine_size: MachineSize) -> str:
     return MACHINE_SIZE_TO_INSTANCE_TYPE[machine_size]
 
 
+def select_instance_type_for_profile(profile: WorkloadProfile, machine_size: MachineSize) -> str:
+    """
+    Choisit le type d'instance de génération actuelle le moins cher qui
+    couvre les besoins du profil pour cette taille.
+
+    Args:
+        profile: Le profil de charge (compute, memory, balanced, network, arm)
+        machine_size: La taille de machine (S, M, L, XL)
+
+    Returns:
+        Le type d'instance EC2 (ex: "c7i.xlarge")
+
+    Example:
+        >>> select_instance_type_for_profile(WorkloadProfile.MEMORY, MachineSize.S)
+        'r7i.large'
+    """
+    profile = WorkloadProfile(profile)
+    machine_size = MachineSize(machine_size)
+    vcpu, memory_gib, network_gbps = PROFILE_REQUIREMENTS[profile][machine_size]
+    architecture = ARM64 if profile == WorkloadProfile.ARM else X86_64
+
+    candidates = find_instance_types(vcpu, memory_gib, network_gbps, architecture)
+    if not candidates:
+        raise ValueError(f"Aucun type d'instance du catalogue pour le profil {profile.value} en taille {machine_size.value}")
+    return candidates[0].name
+
+
 def map_scalability_to_max_instances(scalability: Scalability) -> int:
     """
     Convertit un niveau de scalabilité (LOW, MED, HIGH) en nombre maximum d'instances.
@@ -74,9 +152,29 @@ def map_scalability_to_max_instances(scalability: Scalability) -> int:
     return SCALABILITY_TO_MAX_INSTANCES[scalability]
 
 
+def validate_instance_type(instance_type: str) -> str:
+    """
+    Vérifie qu'un type d'instance EC2 explicite est connu du catalogue.
+    
+    Args:
+        instance_type: Le type demandé par le service (ex: "m7i.large")
+        
+    Returns:
+        Le type d'instance, inchangé
+    """
+    if instance_type not in INSTANCE_CATALOG:
+        raise ValueError(
+            f"Type d'instance EC2 inconnu: {instance_type}. "
+            f"Types supportés: {', '.join(sorted(INSTANCE_CATALOG))}"
+        )
+    return instance_type
+
+
 def get_instance_type_for_service(
     machine_size: MachineSize,
-    scalability: Scalability = None
+    scalability: Scalability = None,
+    profile: Optional[WorkloadProfile] = None,
+    instance_type: Optional[str] = None
 ) -> str:
     """
     Détermine le type d'instance EC2 pour un service en fonction de machine_size.
@@ -87,11 +185,20 @@ def get_instance_type_for_service(
     Args:
         machine_size: La taille de machine spécifiée (S, M, L, XL)
         scalability: Optionnel, conservé pour compatibilité de signature.
+        profile: Optionnel, profil de charge du service. Sans profil, on garde
+            le mapping burstable (t3) historique.
+        instance_type: Optionnel, type exact demandé par le service ; prioritaire
+            sur la taille et le profil.
         
     Returns:
-        Le type d'instance EC2 final (ex: "t3.medium")
+        Le type d'instance EC2 final (ex: "t3.medium", "m7g.large")
     """
-    # On utilise maintenant uniquement la taille de machine pour le type d'instance
+    # Priorité : type exact > profil > taille de machine
+    if instance_type:
+        return validate_instance_type(instance_type)
+    if profile:
+        return select_instance_type_for_profile(profile, machine_size)
+    # Sans profil, seule la taille de machine détermine le type d'instance
     return map_machine_size_to_instance_type(machine_size)
 
 
@@ -130,3 +237,99 @@ def get_scaling_config_for_service(service: 'Service', global_scalability: Scala
     return (1, 1, 1)
 
 
+def get_scaling_policy_for_service(service: 'Service', global_scalability: Scalability) -> Optional[Dict[str, Any]]:
+    """
+    Détermine la politique d'Auto Scaling d'un service.
+    Les valeurs absentes de service.scaling sont déduites de la scalabilité globale.
+    
+    Args:
+        service: Le service à configurer
+        global_scalability: Le niveau de scalabilité global (LOW, MED, HIGH)
+        
+    Returns:
+        None si le groupe ne peut pas changer de taille (min == max), sinon un dict
+        {"metric", "target", "custom_metric", "cooldown", "warmup", "steps", "alarm_threshold"}
+        où chaque palier est {"lower", "upper", "add"}, bornes relatives à alarm_threshold
+        (la cible + le premier palier)
+    """
+    min_size, max_size, _ = get_scaling_config_for_service(service, global_scalability)
+    if max_size <= min_size:
+        return None
+    
+    cpu_target, cooldown, warmup, steps = SCALABILITY_TO_SCALING_POLICY[global_scalability]
+    sc = service.scaling
+    metric = (sc.metric if sc and sc.metric else None) or ScalingMetric.CPU
+    
+    # Cible : valeur du service, sinon valeur par défaut de la métrique
+    if sc and sc.target is not None:
+        target = sc.target
+    elif metric == ScalingMetric.CPU:
+        target = cpu_target
+    elif metric == ScalingMetric.REQUEST_COUNT:
+        target = DEFAULT_REQUEST_COUNT_TARGET
+    else:
+        raise ValueError(f"Le service {service.name} suit une métrique personnalisée sans 'target'")
+    
+    # Les paliers par défaut sont exprimés en points de CPU : inutilisables pour une autre métrique
+    if sc and sc.steps:
+        steps = [(step.above, step.add) for step in sc.steps]
+    elif metric != ScalingMetric.CPU:
+        steps = []
+    
+    # L'alarme se déclenche au premier palier : les bornes sont relatives à ce seuil
+    first = steps[0][0] if steps else 0.0
+    step_adjustments = [
+        {
+            "lower": above - first,
+            "upper": steps[i + 1][0] - first if i + 1 < len(steps) else None,
+            "add": add,
+        }
+        for i, (above, add) in enumerate(steps)
+    ]
+    
+    return {
+        "metric": ScalingMetric(metric).value,
+        "target": target,
+        "custom_metric": sc.custom_metric.model_dump() if sc and sc.custom_metric else None,
+        "cooldown": sc.cooldown if sc and sc.cooldown is not None else cooldown,
+        "warmup": sc.warmup if sc and sc.warmup is not None else warmup,
+        "steps": step_adjustments,
+        "alarm_threshold": target + first,
+    }
+
+
+def get_warm_pool_for_service(service: 'Service', global_scalability: Scalability) -> Optional[Dict[str, Any]]:
+    """
+    Détermine le warm pool d'un service (instances pré-initialisées, prêtes à entrer dans le groupe).
+    
+    Sans min_size explicite, le pool garde assez d'instances pour le plus grand
+    palier de scale-out (ou une seule instance sans paliers), sans dépasser la
+    marge entre min et max du groupe.
+    
+    Args:
+        service: Le service à configurer
+        global_scalability: Le niveau de scalabilité global (LOW, MED, HIGH)
+        
+    Returns:
+        None sans warm pool (ou si le groupe ne peut pas grandir), sinon un dict
+        {"state", "min_size", "max_prepared", "reuse_on_scale_in"}
+    """
+    if not service.scaling or not service.scaling.warm_pool:
+        return None
+    min_size, max_size, _ = get_scaling_config_for_service(service, global_scalability)
+    if max_size <= min_size:
+        return None
+    
+    pool = service.scaling.warm_pool
+    pool_size = pool.min_size
+    if pool_size is None:
+        policy = get_scaling_policy_for_service(service, global_scalability)
+        largest_step = max((step["add"] for step in policy["steps"]), default=1) if policy else 1
+        pool_size = min(largest_step, max_size - min_size)
+    
+    return {
+        "state": pool.state,
+        "min_size": pool_size,
+        "max_prepared": pool.max_prepared,
+        "reuse_on_scale_in": pool.reuse_on_scale_in,
+    }
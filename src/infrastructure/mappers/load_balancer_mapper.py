@@ -0,0 +1,171 @@
+"""
+Mapper pour les réglages de l'Application Load Balancer et du target group d'un service.
+
+Ce module fait le mapping entre :
+- Le niveau de scalabilité (LOW, MED, HIGH) → health checks, drainage,
+  slow start et algorithme de répartition par défaut
+- Les réglages explicites du service (service.load_balancer) → valeurs finales
+- En mode partagé (infrastructure.load_balancer_mode: shared), les services
+  d'un même groupe → un seul ALB, une règle de listener (host/path) par service
+
+Pourquoi ces valeurs par défaut ?
+- Les valeurs AWS (check toutes les 30s, 5 succès, 300s de drainage) retardent
+  l'arrivée du trafic sur une nouvelle instance et ralentissent chaque déploiement
+- Plus la scalabilité est élevée, plus les checks sont fréquents et le drainage court
+- En HIGH, "least_outstanding_requests" évite de surcharger une instance lente ;
+  AWS n'accepte pas de slow start avec cet algorithme
+- Un ALB est une des ressources les plus lentes à créer : le partager entre
+  services réduit le temps de provisionnement, le coût et le nombre de noms DNS
+"""
+
+from typing import Any, Dict, List, Tuple
+from models.models import Scalability, ServiceType
+from infrastructure.mappers.instance_mapper import get_scaling_config_for_service
+
+
+# Format : {Scalability: (intervalle, seuil sain, seuil non sain, drainage, slow start, algorithme)}
+SCALABILITY_TO_LOAD_BALANCER: Dict[Scalability, Tuple[int, int, int, int, int, str]] = {
+    Scalability.LOW: (30, 3, 3, 60, 0, "round_robin"),
+    Scalability.MED: (15, 2, 3, 30, 30, "round_robin"),
+    Scalability.HIGH: (10, 2, 2, 15, 0, "least_outstanding_requests"),
+}
+
+DEFAULT_HEALTH_PATH = "/"
+DEFAULT_HEALTH_MATCHER = "200-399"
+DEFAULT_HEALTH_TIMEOUT = 5
+DEFAULT_IDLE_TIMEOUT = 60
+
+# Mode partagé : ALB des services sans groupe, et écart entre deux priorités attribuées automatiquement
+DEFAULT_LOAD_BALANCER_GROUP = "main"
+RULE_PRIORITY_STEP = 10
+
+
+def needs_load_balancer(service: 'Service', global_scalability: Scalability) -> bool:
+    """
+    Un ALB est généré pour un service ECS avec des ports (l'IP des tâches change
+    à chaque déploiement), ou un service EC2 avec des ports et de l'Auto Scaling.
+    """
+    if service.type not in (ServiceType.EC2, ServiceType.ECS) or not service.ports:
+        return False
+    if service.type == ServiceType.ECS:
+        return True
+    _, max_size, _ = get_scaling_config_for_service(service, global_scalability)
+    return max_size > 1
+
+
+def get_load_balancer_settings(service: 'Service', global_scalability: Scalability) -> Dict[str, Any]:
+    """
+    Détermine les réglages ALB / target group d'un service.
+    Les valeurs absentes de service.load_balancer sont déduites de la scalabilité globale.
+
+    Un slow start explicite impose "round_robin" quand l'algorithme n'est pas
+    choisi par le service, et l'algorithme par défaut désactive le slow start
+    par défaut s'il n'est pas compatible.
+
+    Args:
+        service: Le service exposé derrière l'ALB
+        global_scalability: Le niveau de scalabilité global (LOW, MED, HIGH)
+
+    Returns:
+        Un dict {"port", "health_path", "health_matcher", "health_interval", "health_timeout",
+        "healthy_threshold", "unhealthy_threshold", "deregistration_delay", "slow_start",
+        "idle_timeout", "http2", "algorithm"}
+    """
+    interval, healthy, unhealthy, deregistration, slow_start, algorithm = SCALABILITY_TO_LOAD_BALANCER[global_scalability]
+    lb = service.load_balancer
+
+    def pick(field: str, default: Any) -> Any:
+        value = getattr(lb, field) if lb else None
+        return default if value is None else value
+
+    if lb and lb.algorithm:
+        algorithm = lb.algorithm
+    elif lb and lb.slow_start:
+        algorithm = "round_robin"
+    if algorithm != "round_robin":
+        slow_start = 0
+
+    health_interval = pick("health_interval", interval)
+    return {
+        "port": pick("port", service.ports[0] if service.ports else 80),
+        "health_path": pick("health_path", DEFAULT_HEALTH_PATH),
+        "health_matcher": pick("health_matcher", DEFAULT_HEALTH_MATCHER),
+        "health_interval": health_interval,
+        # Le timeout doit rester inférieur à l'intervalle
+        "health_timeout": pick("health_timeout", min(DEFAULT_HEALTH_TIMEOUT, health_interval - 1)),
+        "healthy_threshold": pick("healthy_threshold", healthy),
+        "unhealthy_threshold": pick("unhealthy_threshold", unhealthy),
+        "deregistration_delay": pick("deregistration_delay", deregistration),
+        "slow_start": pick("slow_start", slow_start),
+        "idle_timeout": pick("idle_timeout", DEFAULT_IDLE_TIMEOUT),
+        "http2": lb.http2 if lb else True,
+        "algorithm": algorithm,
+    }
+
+
+def get_shared_load_balancers(services: List['Service'], global_scalability: Scalability) -> Dict[str, Dict[str, Any]]:
+    """
+    Regroupe les services derrière des ALB partagés (mode shared).
+
+    Dans un groupe, le service sans host ni path reçoit le trafic qui ne
+    correspond à aucune règle (action par défaut du listener) ; sans lui, le
+    listener répond 404. Les autres services ont une règle dont la priorité
+    est explicite ou attribuée dans l'ordre du spec (10, 20, ...), en sautant
+    les priorités déjà prises.
+
+    Args:
+        services: Les services du spec
+        global_scalability: Le niveau de scalabilité global (LOW, MED, HIGH)
+
+    Returns:
+        {groupe: {"services", "default_service", "rules", "idle_timeout", "http2"}}
+        où rules est la liste des {"service", "priority", "hosts", "paths"}, par priorité
+
+    Raises:
+        ValueError: Si un groupe a plusieurs services sans host ni path, ou deux fois la même priorité
+    """
+    groups: Dict[str, List['Service']] = {}
+    for service in services:
+        if needs_load_balancer(service, global_scalability):
+            lb = service.load_balancer
+            group = (lb.group if lb else None) or DEFAULT_LOAD_BALANCER_GROUP
+            groups.setdefault(group, []).append(service)
+
+    shared = {}
+    for group, members in groups.items():
+        routed = [s for s in members if s.load_balancer and (s.load_balancer.hosts or s.load_balancer.paths)]
+        defaults = [s.name for s in members if s not in routed]
+        if len(defaults) > 1:
+            raise ValueError(
+                f"Le groupe '{group}' a plusieurs services sans host ni path : {', '.join(defaults)}"
+            )
+
+        taken = [s.load_balancer.priority for s in routed if s.load_balancer.priority is not None]
+        if len(set(taken)) != len(taken):
+            raise ValueError(f"Le groupe '{group}' a plusieurs règles avec la même priorité")
+        rules = []
+        next_priority = 0
+        for service in routed:
+            priority = service.load_balancer.priority
+            if priority is None:
+                next_priority += RULE_PRIORITY_STEP
+                while next_priority in taken:
+                    next_priority += RULE_PRIORITY_STEP
+                priority = next_priority
+            rules.append({
+                "service": service.name,
+                "priority": priority,
+                "hosts": service.load_balancer.hosts,
+                "paths": service.load_balancer.paths,
+            })
+
+        # Réglages de l'ALB lui-même : le plus long idle timeout, HTTP/2 si tous l'acceptent
+        settings = [get_load_balancer_settings(s, global_scalability) for s in members]
+        shared[group] = {
+            "services": [s.name for s in members],
+            "default_service": defaults[0] if defaults else None,
+            "rules": sorted(rules, key=lambda rule: rule["priority"]),
+            "idle_timeout": max(lb["idle_timeout"] for lb in settings),
+            "http2": all(lb["http2"] for lb in settings),
+        }
+    return shared
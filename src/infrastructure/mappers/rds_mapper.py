@@ -9,10 +9,18 @@ Pourquoi ce mapping est nécessaire ?
 - L'utilisateur spécifie des abstractions simples (S, M, L, XL) et une image Docker
 - AWS RDS nécessite des types d'instances précis (db.t3.micro, db.t3.medium, etc.)
 - Ce mapper fait la traduction automatique
+
+Tier performance (service.profile sur un service RDS) :
+- Les classes db.t3 sont burstables : une fois les crédits CPU épuisés, la base
+  tombe à quelques % d'un vCPU et toute l'application ralentit avec elle
+- Le profil choisit une classe Graviton non burstable (db.m7g, ou db.r7g pour "memory"),
+  avec un stockage plus grand, Performance Insights et un parameter group
+  dimensionné depuis la mémoire de la classe
 """
 
-from typing import Dict, Optional
-from models.models import MachineSize, Scalability
+import re
+from typing import Any, Dict, Optional, Tuple
+from models.models import MachineSize, Scalability, WorkloadProfile
 
 
 # Mapping des tailles de machines vers les types d'instances RDS
@@ -32,6 +40,51 @@ SCALABILITY_TO_RDS_INSTANCE_TYPE: Dict[Scalability, str] = {
     Scalability.HIGH: "db.t3.large",
 }
 
+# Classes d'instances RDS acceptées pour un instance_type explicite
+# Format : {"rds_instance_type": (vCPU, mémoire GiB)}
+RDS_INSTANCE_TYPES: Dict[str, tuple] = {
+    # Burstable
+    "db.t3.micro": (2, 1), "db.t3.small": (2, 2), "db.t3.medium": (2, 4),
+    "db.t3.large": (2, 8), "db.t3.xlarge": (4, 16), "db.t3.2xlarge": (8, 32),
+    "db.t4g.micro": (2, 1), "db.t4g.small": (2, 2), "db.t4g.medium": (2, 4),
+    "db.t4g.large": (2, 8), "db.t4g.xlarge": (4, 16), "db.t4g.2xlarge": (8, 32),
+    # Usage général
+    "db.m7g.large": (2, 8), "db.m7g.xlarge": (4, 16), "db.m7g.2xlarge": (8, 32), "db.m7g.4xlarge": (16, 64),
+    "db.m6i.large": (2, 8), "db.m6i.xlarge": (4, 16), "db.m6i.2xlarge": (8, 32), "db.m6i.4xlarge": (16, 64),
+    # Mémoire
+    "db.r7g.large": (2, 16), "db.r7g.xlarge": (4, 32), "db.r7g.2xlarge": (8, 64), "db.r7g.4xlarge": (16, 128),
+    "db.r6i.large": (2, 16), "db.r6i.xlarge": (4, 32), "db.r6i.2xlarge": (8, 64), "db.r6i.4xlarge": (16, 128),
+}
+
+# Tier performance : famille non burstable par profil, suffixe de taille par taille de machine
+# (RDS n'a pas de classes "compute" ou "network" : ces profils utilisent db.m7g)
+RDS_PROFILE_TO_FAMILY: Dict[WorkloadProfile, str] = {
+    WorkloadProfile.BALANCED: "db.m7g",
+    WorkloadProfile.ARM: "db.m7g",
+    WorkloadProfile.COMPUTE: "db.m7g",
+    WorkloadProfile.NETWORK: "db.m7g",
+    WorkloadProfile.MEMORY: "db.r7g",
+}
+MACHINE_SIZE_TO_RDS_SIZE: Dict[MachineSize, str] = {
+    MachineSize.S: "large",
+    MachineSize.M: "xlarge",
+    MachineSize.L: "2xlarge",
+    MachineSize.XL: "4xlarge",
+}
+
+# Stockage par défaut (GiB) : (alloué, plafond de l'autoscaling du stockage)
+DEFAULT_STORAGE_GB: Tuple[int, int] = (20, 100)
+PERFORMANCE_STORAGE_GB: Tuple[int, int] = (100, 1000)
+
+# gp3 : IOPS et débit de base (IOPS, MiB/s), provisionnables à partir d'une taille de volume
+# (MySQL, MariaDB, PostgreSQL : 400 GiB ; SQL Server : 20 GiB, base fixe)
+GP3_PROVISIONING_THRESHOLD_GB = 400
+GP3_BASELINE_SMALL: Tuple[int, int] = (3000, 125)
+GP3_BASELINE_LARGE: Tuple[int, int] = (12000, 500)
+
+# Rétention Performance Insights (jours) : 7 jours sont inclus sans surcoût
+PERFORMANCE_INSIGHTS_RETENTION = 7
+
 # Mapping des images Docker vers les moteurs RDS AWS
 # Format : {"image_name": "rds_engine"}
 # Exemple : "mysql:8" → "mysql", "postgres:14" → "postgres"
@@ -169,20 +222,55 @@ def get_rds_engine_version(image: str) -> str:
     return 'latest'
 
 
+def validate_rds_instance_type(instance_type: str) -> str:
+    """
+    Vérifie qu'un type d'instance RDS explicite est connu.
+    
+    Args:
+        instance_type: Le type demandé par le service (ex: "db.r7g.large")
+        
+    Returns:
+        Le type d'instance, inchangé
+    """
+    if instance_type not in RDS_INSTANCE_TYPES:
+        raise ValueError(
+            f"Type d'instance RDS inconnu: {instance_type}. "
+            f"Types supportés: {', '.join(sorted(RDS_INSTANCE_TYPES))}"
+        )
+    return instance_type
+
+
 def get_rds_instance_type_for_service(
     machine_size: MachineSize,
-    scalability: Scalability
+    scalability: Scalability,
+    service_machine_size: Optional[MachineSize] = None,
+    instance_type: Optional[str] = None,
+    profile: Optional[WorkloadProfile] = None
 ) -> str:
     """
     Détermine le type d'instance RDS pour un service en combinant machine_size et scalability.
     
     Args:
-        machine_size: La taille de machine spécifiée (S, M, L, XL)
+        machine_size: La taille de machine globale (S, M, L, XL)
         scalability: Le niveau de scalabilité (LOW, MED, HIGH)
+        service_machine_size: Optionnel, taille propre au service ; prioritaire
+            sur la taille globale et sur la scalabilité
+        instance_type: Optionnel, type exact demandé par le service ; prioritaire sur tout
+        profile: Optionnel, profil du service : classe non burstable (tier performance)
+            de la taille du service ou de la taille globale
         
     Returns:
-        Le type d'instance RDS final (ex: "db.t3.medium")
+        Le type d'instance RDS final (ex: "db.t3.medium", "db.r7g.xlarge")
     """
+    # Priorité : type exact > profil > taille du service > scalabilité HIGH > taille globale
+    if instance_type:
+        return validate_rds_instance_type(instance_type)
+    if profile:
+        size = MACHINE_SIZE_TO_RDS_SIZE[service_machine_size or machine_size]
+        return f"{RDS_PROFILE_TO_FAMILY[profile]}.{size}"
+    if service_machine_size:
+        return map_machine_size_to_rds_instance_type(service_machine_size)
+    
     # Si la scalabilité est HIGH, on utilise le mapping de scalabilité
     if scalability == Scalability.HIGH:
         return map_scalability_to_rds_instance_type(scalability)
@@ -190,3 +278,129 @@ def get_rds_instance_type_for_service(
     # Sinon, on utilise la taille de machine comme référence principale
     return map_machine_size_to_rds_instance_type(machine_size)
 
+
+def is_burstable_rds_class(instance_type: str) -> bool:
+    """True pour les classes à crédits CPU (db.t3, db.t4g...)"""
+    return instance_type.startswith("db.t")
+
+
+def get_gp3_baseline(engine: str, storage_gb: int) -> Tuple[int, int]:
+    """IOPS et débit (MiB/s) inclus avec un volume gp3 de cette taille"""
+    if engine != "sqlserver" and storage_gb >= GP3_PROVISIONING_THRESHOLD_GB:
+        return GP3_BASELINE_LARGE
+    return GP3_BASELINE_SMALL
+
+
+def get_gp3_provisioning_threshold(engine: str) -> int:
+    """Taille minimale (GiB) d'un volume gp3 dont on peut provisionner les IOPS et le débit"""
+    return 20 if engine == "sqlserver" else GP3_PROVISIONING_THRESHOLD_GB
+
+
+def get_rds_storage_settings(service: 'Service', engine: str, instance_type: str) -> Dict[str, Any]:
+    """
+    Détermine le stockage d'une instance RDS.
+    Les valeurs absentes de service.database dépendent du tier : 20 GiB (jusqu'à 100)
+    sur une classe burstable, 100 GiB (jusqu'à 1000) sur une classe non burstable.
+    
+    Returns:
+        Un dict {"allocated_storage", "max_allocated_storage", "storage_type", "iops",
+        "throughput", "effective_iops", "performance_insights"} ; max_allocated_storage
+        vaut 0 (autoscaling du stockage désactivé) s'il est égal à la taille allouée,
+        effective_iops est l'IOPS provisionné ou la base gp3
+    """
+    db = service.database
+    performance = not is_burstable_rds_class(instance_type)
+    default_storage, default_max = PERFORMANCE_STORAGE_GB if performance else DEFAULT_STORAGE_GB
+    
+    allocated = db.storage_gb if db and db.storage_gb else default_storage
+    maximum = db.max_storage_gb if db and db.max_storage_gb else max(default_max, allocated * 2)
+    storage_type = db.storage_type if db else "gp3"
+    iops = db.iops if db else None
+    throughput = db.throughput if db else None
+    
+    performance_insights = performance
+    if db and db.performance_insights is not None:
+        performance_insights = db.performance_insights
+    
+    return {
+        "allocated_storage": allocated,
+        "max_allocated_storage": 0 if maximum == allocated else maximum,
+        "storage_type": storage_type,
+        "iops": iops,
+        "throughput": throughput,
+        "effective_iops": iops or get_gp3_baseline(engine, allocated)[0],
+        "performance_insights": performance_insights,
+    }
+
+
+def get_rds_parameter_group_family(engine: str, engine_version: str) -> Optional[str]:
+    """
+    Famille de parameter group d'un moteur et d'une version (ex: "mysql8.0", "postgres16").
+    None si le moteur n'est pas géré ou si la version ne permet pas de la déduire.
+    """
+    if engine == "mysql":
+        for version in ("5.7", "8.4"):
+            if engine_version.startswith(version):
+                return f"mysql{version}"
+        return "mysql8.0"
+    if engine == "mariadb":
+        match = re.match(r"^(\d+\.\d+)", engine_version)
+        return f"mariadb{match.group(1)}" if match else "mariadb10.11"
+    if engine == "postgres":
+        major = engine_version.split(".")[0]
+        return f"postgres{major}" if major.isdigit() else None
+    return None
+
+
+def get_rds_parameter_group(engine: str, engine_version: str, instance_type: str, iops: int) -> Optional[Dict[str, Any]]:
+    """
+    Construit le parameter group d'une instance, dimensionné depuis la mémoire de sa classe.
+    
+    - MySQL / MariaDB : buffer pool InnoDB à 75 % de la mémoire, 64 connexions par GiB
+      (le reste de la mémoire couvre les buffers par connexion), capacité d'I/O
+      d'InnoDB alignée sur les IOPS du volume
+    - PostgreSQL : shared_buffers à 25 % de la mémoire, effective_cache_size à 75 %,
+      50 connexions par GiB et work_mem tel que les tris de toutes les connexions
+      tiennent dans un autre quart de la mémoire
+    
+    Args:
+        engine: Le moteur RDS (mysql, mariadb, postgres)
+        engine_version: La version du moteur (ex: "8.0", "16")
+        instance_type: La classe d'instance (doit être dans RDS_INSTANCE_TYPES)
+        iops: Les IOPS du volume (provisionnées ou base gp3)
+    
+    Returns:
+        None pour un moteur non géré, sinon {"family", "memory_gib", "parameters"}
+        où parameters est la liste des {"name", "value", "apply_method"}
+    """
+    family = get_rds_parameter_group_family(engine, engine_version)
+    if family is None or instance_type not in RDS_INSTANCE_TYPES:
+        return None
+    memory_gib = RDS_INSTANCE_TYPES[instance_type][1]
+    memory = memory_gib * 1024 ** 3
+    
+    def param(name: str, value: Any, apply_method: str = "immediate") -> Dict[str, str]:
+        return {"name": name, "value": str(value), "apply_method": apply_method}
+    
+    if engine in ("mysql", "mariadb"):
+        # Multiple de 128 MiB (taille d'un chunk du buffer pool)
+        chunk = 128 * 1024 ** 2
+        parameters = [
+            param("innodb_buffer_pool_size", memory * 3 // 4 // chunk * chunk, "pending-reboot"),
+            param("max_connections", min(memory_gib * 64, 16000)),
+            param("innodb_io_capacity", max(200, iops // 2)),
+            param("innodb_io_capacity_max", max(2000, iops)),
+        ]
+    else:
+        max_connections = min(max(memory_gib * 50, 100), 5000)
+        parameters = [
+            param("max_connections", max_connections, "pending-reboot"),
+            # Unités PostgreSQL : pages de 8 KiB pour shared_buffers et effective_cache_size, KiB pour *_mem
+            param("shared_buffers", memory // 4 // 8192, "pending-reboot"),
+            param("effective_cache_size", memory * 3 // 4 // 8192),
+            param("work_mem", min(max(memory // 4 // max_connections // 1024, 4096), 262144)),
+            param("maintenance_work_mem", min(memory // 16 // 1024, 2097152)),
+            # Stockage SSD : un accès aléatoire coûte presque autant qu'un accès séquentiel
+            param("random_page_cost", "1.1"),
+        ]
+    return {"family": family, "memory_gib": memory_gib, "parameters": parameters}
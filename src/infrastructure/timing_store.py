@@ -0,0 +1,246 @@
+"""
+Deployment timing history.
+
+Every `deploy run` that reaches Terraform records how long each stage took
+(validate, generate, init, plan, show, apply) and how long each resource took
+to apply. Resource durations come from the `apply_complete` events of
+`terraform apply -json`. The history lives in a SQLite database under the
+per-user home (`~/.ctrl-alt-deploy/timings.db`) and backs `deploy stats`:
+p50/p95 durations per stage and per resource type, and a prediction of the
+apply time of a pending plan.
+"""
+import json
+import math
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from infrastructure.workspace import deploy_home
+
+
+DB_FILE = "timings.db"
+
+# Terraform's default -parallelism, used to turn summed durations into wall time
+DEFAULT_PARALLELISM = 10
+
+# Resource types whose creation time is the boot time of a service's instances
+BOOT_RESOURCE_TYPES = ("aws_instance", "aws_autoscaling_group")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    spec TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    success INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stages (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    spec TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS resources (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    spec TEXT NOT NULL,
+    service TEXT NOT NULL,
+    resource_type TEXT NOT NULL,
+    address TEXT NOT NULL,
+    action TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_stages_spec ON stages(spec, stage);
+CREATE INDEX IF NOT EXISTS idx_resources_type ON resources(resource_type, action);
+CREATE INDEX IF NOT EXISTS idx_resources_spec ON resources(spec, service);
+"""
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..1) of a non-empty list."""
+    ordered = sorted(values)
+    index = max(0, math.ceil(q * len(ordered)) - 1)
+    return ordered[index]
+
+
+def parse_apply_log(path: str | Path) -> Iterator[Dict]:
+    """
+    Yield one record per `apply_complete` event of a `terraform apply -json` log:
+    {"address", "resource_type", "action", "seconds"}.
+    """
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if '"apply_complete"' not in line:
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            hook = event.get("hook") or {}
+            resource = hook.get("resource") or {}
+            if event.get("type") != "apply_complete" or "elapsed_seconds" not in hook:
+                continue
+            yield {
+                "address": resource.get("addr", ""),
+                "resource_type": resource.get("resource_type", ""),
+                "action": hook.get("action", ""),
+                "seconds": float(hook["elapsed_seconds"]),
+            }
+
+
+class DurationStats:
+    """Sample count and p50/p95 of a set of durations."""
+
+    def __init__(self, key: str, values: List[float]):
+        self.key = key
+        self.count = len(values)
+        self.p50 = percentile(values, 0.50)
+        self.p95 = percentile(values, 0.95)
+
+
+class Prediction:
+    """Predicted apply time of a plan, from the history of its resource types."""
+
+    def __init__(self, p50: float, p95: float, resources: int, unknown_types: List[str]):
+        self.p50 = p50
+        self.p95 = p95
+        self.resources = resources
+        self.unknown_types = unknown_types
+
+
+class TimingStore:
+    """
+    SQLite store of stage and resource durations.
+
+    Args:
+        path: Database file (defaults to timings.db in the per-user home)
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path else deploy_home() / DB_FILE
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection committed on success and always closed."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Fleet and server runs write from several threads or processes
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.executescript(_SCHEMA)
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record_run(self, spec: str, success: bool, stages: Dict[str, float], resources: List[Dict]) -> int:
+        """Store one run. `resources` items need service, resource_type, address, action and seconds."""
+        with self._connect() as conn:
+            run_id = conn.execute(
+                "INSERT INTO runs (spec, started_at, success) VALUES (?, ?, ?)",
+                (spec, time.time(), int(success))
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO stages (run_id, spec, stage, seconds) VALUES (?, ?, ?, ?)",
+                [(run_id, spec, stage, seconds) for stage, seconds in stages.items()]
+            )
+            conn.executemany(
+                "INSERT INTO resources (run_id, spec, service, resource_type, address, action, seconds) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (run_id, spec, r["service"], r["resource_type"], r["address"], r["action"], r["seconds"])
+                    for r in resources
+                ]
+            )
+        return run_id
+
+    def _grouped(self, query: str, params: tuple) -> Dict[str, List[float]]:
+        groups: Dict[str, List[float]] = {}
+        with self._connect() as conn:
+            for key, seconds in conn.execute(query, params):
+                groups.setdefault(key, []).append(seconds)
+        return groups
+
+    @staticmethod
+    def _spec_filter(spec: Optional[str]) -> tuple[str, tuple]:
+        return (" WHERE spec = ?", (spec,)) if spec else ("", ())
+
+    def stage_stats(self, spec: Optional[str] = None) -> List[DurationStats]:
+        where, params = self._spec_filter(spec)
+        groups = self._grouped(f"SELECT stage, seconds FROM stages{where}", params)
+        return [DurationStats(stage, values) for stage, values in sorted(groups.items())]
+
+    def resource_stats(self, spec: Optional[str] = None, by: str = "resource_type") -> List[DurationStats]:
+        """p50/p95 per resource type (by="resource_type") or per service (by="service"), for creations."""
+        if by not in ("resource_type", "service"):
+            raise ValueError(f"Cannot group resources by '{by}'")
+        where, params = self._spec_filter(spec)
+        where = f"{where} AND action = 'create'" if where else " WHERE action = 'create'"
+        groups = self._grouped(f"SELECT {by}, seconds FROM resources{where}", params)
+        return sorted(
+            (DurationStats(key, values) for key, values in groups.items()),
+            key=lambda stats: stats.p50,
+            reverse=True
+        )
+
+    def boot_times(self, spec: str) -> Dict[str, float]:
+        """
+        p95 creation time per service of its instance or Auto Scaling Group.
+
+        Terraform marks these created once the instances run (and, for a
+        group, are InService), so this is a lower bound of the time until the
+        container answers health checks.
+        """
+        if not self.path.exists():
+            return {}
+        placeholders = ", ".join("?" for _ in BOOT_RESOURCE_TYPES)
+        groups = self._grouped(
+            f"SELECT service, seconds FROM resources WHERE spec = ? AND action = 'create' "
+            f"AND resource_type IN ({placeholders})",
+            (spec, *BOOT_RESOURCE_TYPES)
+        )
+        return {service: percentile(values, 0.95) for service, values in groups.items()}
+
+    def predict(
+        self,
+        resource_types: Dict[str, Dict[str, int]],
+        parallelism: int = DEFAULT_PARALLELISM
+    ) -> Prediction:
+        """
+        Predict the apply time of a plan from its per-type action counts
+        (PlanSummary.resource_types).
+
+        Terraform applies up to `parallelism` resources at once, so the estimate
+        is the larger of the slowest single resource and the summed durations
+        spread over the parallel slots.
+        """
+        history: Dict[tuple, List[float]] = {}
+        with self._connect() as conn:
+            for resource_type, action, seconds in conn.execute(
+                "SELECT resource_type, action, seconds FROM resources"
+            ):
+                history.setdefault((resource_type, action), []).append(seconds)
+
+        estimates = {"p50": (0.0, 0.0), "p95": (0.0, 0.0)}  # (total, longest)
+        resources = 0
+        unknown = []
+        for resource_type, counts in resource_types.items():
+            for action, count in counts.items():
+                if not count:
+                    continue
+                resources += count
+                # A replacement is a deletion plus a creation
+                parts = ("delete", "create") if action == "replace" else (action,)
+                samples = [history.get((resource_type, part)) for part in parts]
+                if not all(samples):
+                    unknown.append(resource_type)
+                    continue
+                for name, q in (("p50", 0.50), ("p95", 0.95)):
+                    one = sum(percentile(values, q) for values in samples)
+                    total, longest = estimates[name]
+                    estimates[name] = (total + one * count, max(longest, one))
+
+        def wall_time(name: str) -> float:
+            total, longest = estimates[name]
+            return max(longest, total / max(1, parallelism))
+
+        return Prediction(wall_time("p50"), wall_time("p95"), resources, sorted(set(unknown)))
@@ -0,0 +1,291 @@
+"""
+Workspace metadata for a generated Terraform directory.
+
+Everything the orchestrator needs to remember between two runs on the same
+directory (fingerprint of the last successful apply, ...) is stored in a
+`.deploy/` folder next to the generated `.tf` files.
+"""
+import hashlib
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+METADATA_DIR = ".deploy"
+STATE_FILE = "terraform.tfstate"
+FINGERPRINT_FILE = "fingerprint.json"
+RESOURCES_FILE = "resources.json"
+PLAN_FILE = "tfplan"
+PLAN_JSON_FILE = "plan.json"
+PLAN_SUMMARY_FILE = "plan_summary.json"
+LOCK_FILE = "lock"
+INIT_FILE = "init.json"
+PROVIDER_FILE = "main.tf"
+LOG_FILE = "terraform.log"
+APPLY_LOG_FILE = "apply.jsonl"
+CHECKPOINTS_FILE = "checkpoints.json"
+INVENTORY_FILE = "inventory.db"
+OUTPUTS_FILE = "outputs.json"
+DRIFT_FILE = "drift.json"
+DRIFT_LOG_FILE = "drift.jsonl"
+GENERATIONS_FILE = "generations.json"
+
+# Pipeline stages with a checkpoint, in order (init is tracked by INIT_FILE)
+CHECKPOINT_STAGES = ("validate", "generate", "plan", "apply")
+
+# Per-user data shared by all workspaces (timing history, ...)
+HOME_ENV = "CTRL_ALT_DEPLOY_HOME"
+DEFAULT_HOME = "~/.ctrl-alt-deploy"
+
+# "serial" and "lineage" are written at the top of terraform.tfstate,
+# so reading the head of the file is enough even for very large states.
+_STATE_HEAD_BYTES = 4096
+_SERIAL_RE = re.compile(r'"serial"\s*:\s*(\d+)')
+_LINEAGE_RE = re.compile(r'"lineage"\s*:\s*"([^"]*)"')
+
+
+def deploy_home() -> Path:
+    """Per-user data directory (CTRL_ALT_DEPLOY_HOME overrides ~/.ctrl-alt-deploy)."""
+    return Path(os.environ.get(HOME_ENV) or DEFAULT_HOME).expanduser()
+
+
+def file_hash(path: str | Path) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+try:
+    import fcntl
+
+    def _try_lock(f) -> bool:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def _unlock(f) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+except ImportError:  # Windows
+    import msvcrt
+
+    def _try_lock(f) -> bool:
+        try:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(f) -> None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class WorkspaceLockedError(RuntimeError):
+    """Raised when another deployment already holds the workspace lock"""
+    pass
+
+
+class Workspace:
+    """
+    A Terraform working directory plus its `.deploy/` metadata folder.
+    """
+
+    def __init__(self, terraform_dir: str | Path):
+        self.terraform_dir = Path(terraform_dir)
+        self.metadata_dir = self.terraform_dir / METADATA_DIR
+
+    @property
+    def state_file(self) -> Path:
+        return self.terraform_dir / STATE_FILE
+
+    @property
+    def plan_file(self) -> str:
+        """Saved plan path, relative to the Terraform directory."""
+        return f"{METADATA_DIR}/{PLAN_FILE}"
+
+    def tf_files(self) -> List[Path]:
+        """Return the generated .tf files, sorted by name."""
+        return sorted(self.terraform_dir.glob("*.tf"))
+
+    def tree_hash(self) -> str:
+        """Hash the names and contents of every generated .tf file."""
+        digest = hashlib.sha256()
+        for path in self.tf_files():
+            digest.update(path.name.encode("utf-8"))
+            digest.update(b"\0")
+            digest.update(path.read_bytes())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def state_identity(self) -> Dict[str, Any]:
+        """Return the serial and lineage of the local state (None if there is no state yet)."""
+        if not self.state_file.exists():
+            return {"serial": None, "lineage": None}
+
+        with open(self.state_file, "r", encoding="utf-8", errors="replace") as f:
+            head = f.read(_STATE_HEAD_BYTES)
+
+        serial = _SERIAL_RE.search(head)
+        lineage = _LINEAGE_RE.search(head)
+        return {
+            "serial": int(serial.group(1)) if serial else None,
+            "lineage": lineage.group(1) if lineage else None,
+        }
+
+    def read_json(self, name: str) -> Optional[Dict[str, Any]]:
+        """Read a metadata file, returning None if it is missing or unreadable."""
+        path = self.metadata_dir / name
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def write_json(self, name: str, data: Dict[str, Any]) -> None:
+        """Atomically write a metadata file."""
+        self.metadata_dir.mkdir(parents=True, exist_ok=True)
+        path = self.metadata_dir / name
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+        tmp.replace(path)
+
+    @contextmanager
+    def lock(self):
+        """
+        Hold an exclusive lock on the workspace for the duration of the block.
+
+        The lock is an OS file lock, so it is released automatically if the
+        process dies. Raises WorkspaceLockedError if it is already held.
+        """
+        self.metadata_dir.mkdir(parents=True, exist_ok=True)
+        f = open(self.metadata_dir / LOCK_FILE, "a+")
+        try:
+            if not _try_lock(f):
+                f.seek(0)
+                holder = f.read().strip() or "unknown"
+                raise WorkspaceLockedError(
+                    f"Workspace {self.terraform_dir} is locked by another deployment (pid {holder})"
+                )
+            try:
+                f.seek(0)
+                f.truncate()
+                f.write(str(os.getpid()))
+                f.flush()
+                yield self
+            finally:
+                _unlock(f)
+        finally:
+            f.close()
+
+    def provider_hash(self) -> Optional[str]:
+        """
+        Hash of main.tf. `terraform init` reads every .tf file (required_providers,
+        module blocks), but the generator only declares providers in main.tf and
+        writes no module blocks, so main.tf stands for all of them. A template that
+        adds a provider or a module elsewhere must be covered here too.
+        """
+        path = self.terraform_dir / PROVIDER_FILE
+        if not path.exists():
+            return None
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+
+    def needs_init(self) -> bool:
+        """
+        True unless `terraform init` already succeeded with the current main.tf
+        and its `.terraform/` directory is still there.
+        """
+        if not (self.terraform_dir / ".terraform").is_dir():
+            return True
+        recorded = self.read_json(INIT_FILE) or {}
+        return recorded.get("provider") != self.provider_hash()
+
+    def record_init(self) -> None:
+        """Remember that init succeeded for the current main.tf."""
+        self.write_json(INIT_FILE, {"provider": self.provider_hash(), "recorded_at": time.time()})
+
+    def fingerprint(self) -> Dict[str, Any]:
+        """Current fingerprint: generated tree + state serial/lineage."""
+        return {"tree": self.tree_hash(), **self.state_identity()}
+
+    def record_fingerprint(self) -> None:
+        """Remember the current fingerprint as the last successful deployment."""
+        self.write_json(FINGERPRINT_FILE, {**self.fingerprint(), "recorded_at": time.time()})
+
+    def is_up_to_date(self) -> bool:
+        """
+        True when neither the generated files nor the state changed
+        since the last recorded successful deployment.
+        """
+        recorded = self.read_json(FINGERPRINT_FILE)
+        if not recorded:
+            return False
+
+        current = self.fingerprint()
+        return all(recorded.get(key) == value for key, value in current.items())
+
+    # Stage checkpoints (`deploy resume`)
+    #
+    # checkpoints.json holds the request of the last run ("run": spec path and
+    # --only services) and, for each completed stage, the inputs it ran with
+    # and what it produced. A stage can be skipped on resume when its recorded
+    # inputs equal the current ones and every earlier stage was skipped too.
+
+    def checkpoints(self) -> Dict[str, Any]:
+        return self.read_json(CHECKPOINTS_FILE) or {}
+
+    def record_run_request(self, spec_path: str, only: Optional[List[str]]) -> None:
+        """Remember what the current run was asked to do, so it can be resumed."""
+        data = self.checkpoints()
+        data["run"] = {"spec_path": str(Path(spec_path).resolve()), "only": only, "started_at": time.time()}
+        self.write_json(CHECKPOINTS_FILE, data)
+
+    def checkpoint(self, stage: str, inputs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Outputs of a completed stage if it ran with the same inputs, else None."""
+        entry = self.checkpoints().get(stage)
+        if entry and entry.get("inputs") == inputs:
+            return entry.get("outputs", {})
+        return None
+
+    def record_checkpoint(self, stage: str, inputs: Dict[str, Any], outputs: Optional[Dict[str, Any]] = None) -> None:
+        """Mark a stage as completed; checkpoints of the later stages are dropped."""
+        data = self.checkpoints()
+        for later in CHECKPOINT_STAGES[CHECKPOINT_STAGES.index(stage):]:
+            data.pop(later, None)
+        data[stage] = {"inputs": inputs, "outputs": outputs or {}, "completed_at": time.time()}
+        self.write_json(CHECKPOINTS_FILE, data)
+
+    def clear_checkpoints(self, from_stage: str) -> None:
+        """Forget a stage (about to run again) and every stage after it."""
+        data = self.checkpoints()
+        for stage in CHECKPOINT_STAGES[CHECKPOINT_STAGES.index(from_stage):]:
+            data.pop(stage, None)
+        self.write_json(CHECKPOINTS_FILE, data)
+
+    # Generations (`deploy rollback`)
+    #
+    # generations.json lists, oldest first, every tree that was applied
+    # successfully in this workspace. The trees themselves live in the
+    # ConfigStore; this file only points to them.
+
+    def generations(self) -> List[Dict[str, Any]]:
+        return (self.read_json(GENERATIONS_FILE) or {}).get("generations", [])
+
+    def generation(self, number: int) -> Optional[Dict[str, Any]]:
+        return next((g for g in self.generations() if g["number"] == number), None)
+
+    def record_generation(self, tree: str, **info: Any) -> int:
+        """Append an applied tree to the history. Returns its generation number."""
+        generations = self.generations()
+        number = generations[-1]["number"] + 1 if generations else 1
+        generations.append({"number": number, "tree": tree, "applied_at": time.time(), **info})
+        self.write_json(GENERATIONS_FILE, {"generations": generations})
+        return number
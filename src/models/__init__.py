@@ -6,7 +6,16 @@ from .models import (
     ApplicationConfig,
     MachineSize,
     Scalability,
-    ServiceType
+    ServiceType,
+    WorkloadProfile,
+    ScalingConfig,
+    ScalingMetric,
+    CustomMetric,
+    ScalingStep,
+    WarmPoolConfig,
+    LoadBalancerConfig,
+    EcsConfig,
+    DatabaseConfig
 )
 
 __all__ = [
@@ -17,5 +26,14 @@ __all__ = [
     'ApplicationConfig',
     'MachineSize',
     'Scalability',
-    'ServiceType'
+    'ServiceType',
+    'WorkloadProfile',
+    'ScalingConfig',
+    'ScalingMetric',
+    'CustomMetric',
+    'ScalingStep',
+    'WarmPoolConfig',
+    'LoadBalancerConfig',
+    'EcsConfig',
+    'DatabaseConfig'
 ]
\ No newline at end of file
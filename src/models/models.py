@@ -29,6 +29,39 @@ class ServiceType(str, Enum):
     ECS = "ECS"
 
 
+class WorkloadProfile(str, Enum):
+    """Workload profile used to pick a non-burstable instance family"""
+    COMPUTE = "compute"
+    MEMORY = "memory"
+    BALANCED = "balanced"
+    NETWORK = "network"
+    ARM = "arm"
+
+
+class ScalingMetric(str, Enum):
+    """Metric tracked by an Auto Scaling policy"""
+    CPU = "cpu"                          # Average CPU utilization of the group (%)
+    REQUEST_COUNT = "request_count"      # ALB requests per target
+    CUSTOM = "custom"                    # Any CloudWatch metric
+
+
+class CustomMetric(BaseModel):
+    """CloudWatch metric tracked by a 'custom' scaling policy"""
+    namespace: str = Field(..., min_length=1, description="CloudWatch namespace (e.g. MyApp)")
+    name: str = Field(..., min_length=1, description="Metric name (e.g. QueueDepthPerInstance)")
+    statistic: Literal["Average", "Sum", "Minimum", "Maximum", "SampleCount"] = Field(
+        default="Average", description="Statistic compared to the target"
+    )
+    dimensions: Dict[str, str] = Field(default_factory=dict, description="Metric dimensions")
+    unit: Optional[str] = Field(None, description="Metric unit (e.g. Count, Percent)")
+
+
+class ScalingStep(BaseModel):
+    """One step of a step scaling policy: add instances once the metric exceeds the target by 'above'"""
+    above: float = Field(..., ge=0, description="Distance above the target where the step starts")
+    add: int = Field(..., ge=1, le=100, description="Instances added by this step")
+
+
 class AWSConfig(BaseModel):
     """AWS credentials and configuration"""
     access_key: str = Field(..., min_length=16, max_length=128, description="AWS access key")
@@ -62,12 +95,164 @@ class InfrastructureConfig(BaseModel):
     vpc_id: Optional[str] = Field(None, description="Existing VPC ID (optional)")
     key_pair: Optional[str] = Field(None, description="SSH key pair name for EC2 instances (Optional)")
     dns_enabled: bool = Field(default=False, description="Enable DNS configuration")
+    golden_image: bool = Field(default=False, description="Boot EC2 services from AMIs built by `deploy bake` (Docker and image pre-installed)")
+    boot_metrics: bool = Field(default=False, description="Publish the boot phase timestamps of EC2 instances as CloudWatch metrics (creates an IAM instance profile)")
+    load_balancer_mode: Literal["per_service", "shared"] = Field(
+        default="per_service", description="One ALB per scaled service, or ALBs shared by services with host/path routing"
+    )
+
+
+class WarmPoolConfig(BaseModel):
+    """Pre-initialized instances kept next to an Auto Scaling Group"""
+    state: Literal["Stopped", "Running", "Hibernated"] = Field(
+        default="Stopped", description="State of pooled instances (Stopped costs only EBS, Running starts fastest)"
+    )
+    min_size: Optional[int] = Field(None, ge=0, le=100, description="Instances kept in the pool (default derived from scaling)")
+    max_prepared: Optional[int] = Field(None, ge=1, le=100, description="Cap on group + pool instances (default: scaling.max)")
+    reuse_on_scale_in: bool = Field(default=False, description="Return instances to the pool on scale-in instead of terminating them")
+
+
+class LoadBalancerConfig(BaseModel):
+    """Application Load Balancer and target group settings of a service (defaults derived from scalability)"""
+    port: Optional[int] = Field(None, ge=1, le=65535, description="Container port receiving the traffic (default: first port)")
+    health_path: Optional[str] = Field(None, description="Health check path (default '/')")
+    health_matcher: Optional[str] = Field(None, description="HTTP codes of a healthy target (default '200-399')")
+    health_interval: Optional[int] = Field(None, ge=5, le=300, description="Seconds between two health checks")
+    health_timeout: Optional[int] = Field(None, ge=2, le=120, description="Seconds before a health check fails")
+    healthy_threshold: Optional[int] = Field(None, ge=2, le=10, description="Successful checks before a target receives traffic")
+    unhealthy_threshold: Optional[int] = Field(None, ge=2, le=10, description="Failed checks before a target is taken out")
+    deregistration_delay: Optional[int] = Field(None, ge=0, le=3600, description="Seconds to drain a target before it is removed")
+    slow_start: Optional[int] = Field(None, ge=0, le=900, description="Seconds to ramp up traffic to a new target (0 disables it)")
+    idle_timeout: Optional[int] = Field(None, ge=1, le=4000, description="Seconds an idle connection stays open")
+    http2: bool = Field(default=True, description="Accept HTTP/2 from clients")
+    algorithm: Optional[Literal["round_robin", "least_outstanding_requests", "weighted_random"]] = Field(
+        None, description="Load balancing algorithm of the target group"
+    )
+    group: Optional[str] = Field(
+        None, min_length=1, max_length=20, description="Shared ALB (tier) serving this service, in shared mode (default 'main')"
+    )
+    hosts: List[str] = Field(default_factory=list, description="Host headers routed to this service, in shared mode")
+    paths: List[str] = Field(default_factory=list, description="Path patterns routed to this service, in shared mode")
+    priority: Optional[int] = Field(None, ge=1, le=50000, description="Listener rule priority, in shared mode (lower is evaluated first)")
+    
+    @field_validator('health_path')
+    @classmethod
+    def validate_health_path(cls, v: Optional[str]) -> Optional[str]:
+        """Health check path must be absolute"""
+        if v is not None and not v.startswith("/"):
+            raise ValueError(f"Health check path '{v}' must start with '/'")
+        return v
+    
+    @field_validator('health_matcher')
+    @classmethod
+    def validate_health_matcher(cls, v: Optional[str]) -> Optional[str]:
+        """AWS matcher grammar: HTTP codes, as a list (200,204) or a range (200-399)"""
+        import re
+        if v is not None and not re.match(r'^\d{3}([-,]\d{3})*$', v):
+            raise ValueError(f"Health check matcher '{v}' must be HTTP codes such as '200', '200,204' or '200-399'")
+        return v
+    
+    @field_validator('group')
+    @classmethod
+    def validate_group(cls, v: Optional[str]) -> Optional[str]:
+        """The group names AWS resources: lowercase letters, digits and hyphens"""
+        import re
+        if v is not None and not re.match(r'^[a-z0-9]([a-z0-9-]*[a-z0-9])?$', v):
+            raise ValueError(f"Load balancer group '{v}' must contain only lowercase letters, digits and hyphens")
+        return v
+    
+    @field_validator('hosts')
+    @classmethod
+    def validate_hosts(cls, v: List[str]) -> List[str]:
+        """Host patterns: DNS characters plus the * and ? wildcards"""
+        import re
+        for host in v:
+            if not re.match(r'^[A-Za-z0-9*?.-]+$', host):
+                raise ValueError(f"Host pattern '{host}' may only contain letters, digits, '.', '-', '*' and '?'")
+        return v
+    
+    @field_validator('paths')
+    @classmethod
+    def validate_paths(cls, v: List[str]) -> List[str]:
+        """Path patterns must be absolute, without quotes, backslashes or spaces"""
+        import re
+        for path in v:
+            if not re.match(r'^/[^"\\\s$]*$', path):
+                raise ValueError(f"Path pattern '{path}' must start with '/' and contain no quotes, backslashes, spaces or '$'")
+        return v
+    
+    @model_validator(mode='after')
+    def validate_timings(self):
+        """AWS limits: timeout below interval, slow start of 30s or more, slow start only with round robin"""
+        if self.health_timeout is not None and self.health_interval is not None and self.health_timeout >= self.health_interval:
+            raise ValueError(
+                f"health_timeout ({self.health_timeout}) must be lower than health_interval ({self.health_interval})"
+            )
+        if self.slow_start and self.slow_start < 30:
+            raise ValueError(f"slow_start ({self.slow_start}) must be 0 or between 30 and 900 seconds")
+        if self.slow_start and self.algorithm not in (None, "round_robin"):
+            raise ValueError(f"slow_start cannot be combined with the '{self.algorithm}' algorithm (round_robin only)")
+        return self
+    
+    @model_validator(mode='after')
+    def validate_routing(self):
+        """A listener rule accepts at most 5 condition values"""
+        if len(self.hosts) + len(self.paths) > 5:
+            raise ValueError(
+                f"A service can be routed by at most 5 hosts and paths in total ({len(self.hosts) + len(self.paths)} given)"
+            )
+        return self
+
+
+class EcsConfig(BaseModel):
+    """ECS task placement and size (ECS services)"""
+    launch_type: Literal["FARGATE", "EC2"] = Field(
+        default="FARGATE", description="FARGATE (serverless tasks) or EC2 (capacity provider backed by an Auto Scaling Group)"
+    )
+    cpu: Optional[int] = Field(None, ge=128, le=16384, description="Task CPU units, 1024 = 1 vCPU (default derived from machine_size)")
+    memory: Optional[int] = Field(None, ge=128, le=122880, description="Task memory in MiB (default derived from machine_size)")
+    
+    @model_validator(mode='after')
+    def validate_size(self):
+        """cpu and memory are set together"""
+        if (self.cpu is None) != (self.memory is None):
+            raise ValueError("ECS 'cpu' and 'memory' must be set together")
+        return self
+
+
+class DatabaseConfig(BaseModel):
+    """Storage and monitoring of an RDS instance (RDS services)"""
+    storage_gb: Optional[int] = Field(None, ge=20, le=65536, description="Allocated storage in GiB (default 20, 100 on the performance tier)")
+    max_storage_gb: Optional[int] = Field(None, ge=20, le=65536, description="Storage autoscaling ceiling in GiB")
+    storage_type: Literal["gp3", "io2"] = Field(default="gp3", description="gp3 (baseline IOPS, provisionable from 400 GiB) or io2 (provisioned IOPS)")
+    iops: Optional[int] = Field(None, ge=1000, le=256000, description="Provisioned IOPS (required with io2)")
+    throughput: Optional[int] = Field(None, ge=125, le=4000, description="Provisioned throughput in MiB/s (gp3 only)")
+    performance_insights: Optional[bool] = Field(None, description="Enable Performance Insights (default: on for non-burstable classes)")
+    
+    @model_validator(mode='after')
+    def validate_storage(self):
+        """io2 needs IOPS, throughput is a gp3 setting, the ceiling is above the allocation"""
+        if self.storage_type == "io2" and self.iops is None:
+            raise ValueError("Database storage_type 'io2' requires 'iops'")
+        if self.storage_type == "io2" and self.throughput is not None:
+            raise ValueError("Database 'throughput' can only be set with storage_type 'gp3'")
+        if self.storage_gb and self.max_storage_gb and self.max_storage_gb < self.storage_gb:
+            raise ValueError("Database 'max_storage_gb' must be greater than or equal to 'storage_gb'")
+        return self
 
 
 class ScalingConfig(BaseModel):
     """Scaling configuration for a service"""
     min: int = Field(..., ge=1, le=100, description="Minimum number of instances")
     max: int = Field(..., ge=1, le=100, description="Maximum number of instances")
+    metric: Optional[ScalingMetric] = Field(None, description="Metric tracked by the scaling policy (default derived from scalability)")
+    target: Optional[float] = Field(None, gt=0, description="Target value of the metric (CPU %, requests per target, custom value)")
+    custom_metric: Optional[CustomMetric] = Field(None, description="CloudWatch metric, required when metric is 'custom'")
+    steps: List[ScalingStep] = Field(default_factory=list, description="Step scaling on top of target tracking, for sudden spikes")
+    cooldown: Optional[int] = Field(None, ge=0, le=3600, description="Seconds between two scaling activities")
+    warmup: Optional[int] = Field(None, ge=0, le=3600, description="Seconds before a new instance counts in the metric")
+    warm_pool: Optional[WarmPoolConfig] = Field(None, description="Keep pre-initialized instances ready for scale-out")
+    health_check_grace_period: Optional[int] = Field(None, ge=0, le=7200, description="Seconds before health checks start on a new instance (default 300)")
     
     @model_validator(mode='after')
     def validate_min_max(self):
@@ -75,6 +260,29 @@ class ScalingConfig(BaseModel):
         if self.min > self.max:
             raise ValueError(f"Scaling min ({self.min}) cannot be greater than max ({self.max})")
         return self
+    
+    @model_validator(mode='after')
+    def validate_metric(self):
+        """custom_metric goes with metric 'custom'; CPU targets are percentages; steps are ordered"""
+        if self.metric == ScalingMetric.CUSTOM and not self.custom_metric:
+            raise ValueError("Scaling metric 'custom' requires 'custom_metric'")
+        if self.custom_metric and self.metric != ScalingMetric.CUSTOM:
+            raise ValueError("'custom_metric' is only used with scaling metric 'custom'")
+        if self.metric == ScalingMetric.CPU and self.target is not None and self.target > 100:
+            raise ValueError(f"CPU target ({self.target}) must be a percentage between 0 and 100")
+        thresholds = [step.above for step in self.steps]
+        if len(set(thresholds)) != len(thresholds) or thresholds != sorted(thresholds):
+            raise ValueError("Scaling steps must have distinct 'above' values in increasing order")
+        return self
+    
+    @model_validator(mode='after')
+    def validate_warm_pool(self):
+        """The warm pool cap counts the group itself, so it cannot be lower than max"""
+        if self.warm_pool and self.warm_pool.max_prepared is not None and self.warm_pool.max_prepared < self.max:
+            raise ValueError(
+                f"warm_pool.max_prepared ({self.warm_pool.max_prepared}) cannot be lower than scaling max ({self.max})"
+            )
+        return self
 
 
 class Service(BaseModel):
@@ -87,6 +295,12 @@ class Service(BaseModel):
     scaling: Optional[ScalingConfig] = None
     type: ServiceType = Field(default=ServiceType.EC2, description="Service deployment type")
     depends_on: List[str] = Field(default_factory=list, description="Service dependencies")
+    profile: Optional[WorkloadProfile] = Field(None, description="Workload profile (EC2, RDS): picks a current-generation, non-burstable instance type")
+    machine_size: Optional[MachineSize] = Field(None, description="Machine size for this service (overrides infrastructure.machine_size)")
+    instance_type: Optional[str] = Field(None, description="Exact instance type (e.g. m7i.large, db.r7g.large); overrides machine_size and profile")
+    load_balancer: Optional[LoadBalancerConfig] = Field(None, description="Load balancer and health check settings (EC2 with Auto Scaling, ECS)")
+    ecs: Optional[EcsConfig] = Field(None, description="Launch type and task size (ECS services)")
+    database: Optional[DatabaseConfig] = Field(None, description="Storage, IOPS and Performance Insights (RDS services)")
     
     @field_validator('ports')
     @classmethod
@@ -106,6 +320,24 @@ class Service(BaseModel):
             raise ValueError(f"Service name '{v}' must contain only alphanumeric characters, hyphens, and underscores")
         return v
     
+    @field_validator('instance_type')
+    @classmethod
+    def validate_instance_type_format(cls, v: Optional[str]) -> Optional[str]:
+        """Instance type must look like family.size (db.family.size for RDS)"""
+        import re
+        if v is not None and not re.match(r'^(db\.)?[a-z][a-z0-9-]*\.[a-z0-9]+$', v):
+            raise ValueError(f"Instance type '{v}' must look like 'm7i.large' (or 'db.r7g.large' for RDS)")
+        return v
+    
+    @model_validator(mode='after')
+    def validate_sizing(self):
+        """An exact instance_type cannot be combined with a profile"""
+        if self.instance_type and self.profile:
+            raise ValueError(
+                f"Service '{self.name}' cannot have both 'instance_type' and 'profile'. Choose one."
+            )
+        return self
+    
     @model_validator(mode='after')
     def validate_image_source(self):
         """Must have either dockerfile_path OR image, not both or neither"""
@@ -1,71 +1,507 @@
 
+import contextvars
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from rich.console import Console
-from rich.panel import Panel
 from validators.parser import parse_deployment_spec, ParseError
-from infrastructure.generators.terraform_generator import generate_terraform_config
+from infrastructure.generators.terraform_generator import TerraformGenerator, templates_hash
 from infrastructure.executors.terraform_executor import TerraformExecutor
+from infrastructure.executors.runners import CommandRunner
+from infrastructure.executors.retry import RetryPolicy
+from infrastructure.executors.plan_analyzer import PlanAnalyzer, PlanSummary, ACTIONS
+from infrastructure.timing_store import TimingStore, parse_apply_log
+from infrastructure.inventory import Inventory
+from infrastructure.config_store import ConfigStore, StoreError
+from infrastructure.golden_image import ImageLock, GoldenImageBuilder
+from models import ServiceType
+from infrastructure.workspace import (
+    Workspace, WorkspaceLockedError, RESOURCES_FILE, PLAN_JSON_FILE, PLAN_SUMMARY_FILE, APPLY_LOG_FILE,
+    INVENTORY_FILE, OUTPUTS_FILE, file_hash
+)
+from utils.events import emit, emit_table, STEP, BANNER, INFO, DETAIL, SUCCESS, WARNING, ERROR
 
 
-console = Console()
-
 class DeploymentOrchestrator:
-    def __init__(self):
+    def __init__(
+        self,
+        output_dir: str = "terraform_output",
+        runner: CommandRunner | None = None,
+        retry_policy: RetryPolicy | None = None,
+        timing_store: TimingStore | None = None,
+        config_store: ConfigStore | None = None
+    ):
         self.spec = None
+        self.output_dir = output_dir
+        self.runner = runner
+        self.retry_policy = retry_policy
+        self.timing_store = timing_store
+        self.config_store = config_store
+        self.stage_seconds: dict[str, float] = {}
+        self.resource_timings: list[dict] = []
 
-    def run(self, spec_path: str):
-        
-        console.print(Panel.fit(f"[bold blue]🚀 Starting Deployment for: {spec_path}[/bold blue]"))
+    def run(
+        self,
+        spec_path: str,
+        force: bool = False,
+        only: list[str] | None = None,
+        plan_only: bool = False,
+        resume: bool = False
+    ):
+        """
+        Run the pipeline. Every completed stage is checkpointed in the workspace;
+        with resume=True, stages whose inputs did not change since their
+        checkpoint are skipped, up to the first one that must run again.
+        """
+        emit("deploy.start", f"🚀 Starting Deployment for: {spec_path}", BANNER, spec=spec_path, resume=resume)
+        self.stage_seconds, self.resource_timings = {}, []
+        self.spec = None
+        workspace = Workspace(self.output_dir)
 
-        # Step 1: Validation
-        if not self.validate(spec_path):
-            console.print("[bold red]⛔ Deployment Aborted due to validation errors.[/bold red]")
+        # Step 1: Validation (skipped on resume if the spec file is unchanged)
+        spec_inputs = {"spec": file_hash(spec_path)} if Path(spec_path).is_file() else None
+        reuse = resume and spec_inputs is not None and workspace.checkpoint("validate", spec_inputs) is not None
+        if reuse:
+            emit("resume.skipped", "↷ Validation: spec unchanged since it was last validated", DETAIL, stage="validate")
+        else:
+            started = time.monotonic()
+            if not self.validate(spec_path):
+                emit("deploy.aborted", "⛔ Deployment Aborted due to validation errors.", ERROR)
+                return False
+            self.stage_seconds["validate"] = time.monotonic() - started
+
+        # Two deployments must never write the same directory at the same time
+        try:
+            with workspace.lock():
+                workspace.record_run_request(spec_path, only)
+                if not reuse:
+                    workspace.record_checkpoint("validate", spec_inputs)
+                success = self._deploy(workspace, spec_path, spec_inputs, force, only, plan_only, reuse)
+        except WorkspaceLockedError as e:
+            emit("deploy.locked", f"⛔ {e}", ERROR)
             return False
 
+        self._record_timings(spec_path, success)
+        return success
+
+    def _deploy(
+        self,
+        workspace: Workspace,
+        spec_path: str,
+        spec_inputs: dict,
+        force: bool,
+        only: list[str] | None,
+        plan_only: bool = False,
+        reuse: bool = False
+    ) -> bool:
+        generator = TerraformGenerator(self.output_dir, image_lock=ImageLock.for_spec(spec_path))
+        executor = TerraformExecutor(generator.output_dir, runner=self.runner, retry_policy=self.retry_policy)
+        try:
+            return self._generate_and_apply(
+                workspace, generator, executor, spec_path, spec_inputs, force, only, plan_only, reuse
+            )
+        finally:
+            # Wall time of each Terraform command (init overlaps with "generate")
+            self.stage_seconds.update(executor.timings)
+
+    def _generate_and_apply(
+        self,
+        workspace: Workspace,
+        generator: TerraformGenerator,
+        executor: TerraformExecutor,
+        spec_path: str,
+        spec_inputs: dict,
+        force: bool,
+        only: list[str] | None,
+        plan_only: bool,
+        reuse: bool
+    ) -> bool:
         # Step 2: Generate Terraform configuration
-        terraform_dir = generate_terraform_config(self.spec)
+        image_lock = generator.image_lock.path if generator.image_lock else None
+        generate_inputs = {
+            **spec_inputs, "templates": templates_hash(), "only": only,
+            # A new golden image changes the generated files without changing the spec
+            "images": file_hash(image_lock) if image_lock and image_lock.exists() else None
+        }
+        generated = workspace.checkpoint("generate", generate_inputs) if reuse else None
+        reuse = generated is not None and generated.get("tree") == workspace.tree_hash()
 
-        # Step 3: Execute Terraform
-        executor = TerraformExecutor(terraform_dir)
+        if reuse:
+            emit("resume.skipped", "↷ Generation: spec, templates and generated files unchanged", DETAIL, stage="generate")
+            generator.resource_addresses = workspace.read_json(RESOURCES_FILE) or {}
+            targets = generated.get("targets")
+            if workspace.needs_init():
+                if not executor.init():
+                    return False
+                workspace.record_init()
+        else:
+            # Validation was skipped on resume, but the files must be generated again
+            if self.spec is None and not self.validate(spec_path):
+                return False
+            workspace.clear_checkpoints("generate")
+            targets, ok = self._generate(workspace, generator, executor, only)
+            if not ok:
+                return False
+            workspace.record_checkpoint("generate", generate_inputs, {"tree": workspace.tree_hash(), "targets": targets})
 
-        if not executor.init():
+        # Nothing to do if neither the generated files nor the state changed
+        if not force and workspace.is_up_to_date():
+            emit("deploy.up_to_date", "✓ No changes since the last successful deployment, skipping Terraform", SUCCESS)
+            emit("deploy.completed", "✨ Deployment Sequence Completed!", BANNER, success=True, skipped=True)
+            return True
+
+        return self._plan_and_apply(
+            workspace, executor, generator.resource_addresses, targets, plan_only, reuse,
+            {"spec_path": str(Path(spec_path).resolve())}
+        )
+
+    def _plan_and_apply(
+        self,
+        workspace: Workspace,
+        executor: TerraformExecutor,
+        resource_addresses: dict,
+        targets: list[str] | None,
+        plan_only: bool,
+        reuse: bool,
+        generation_info: dict
+    ) -> bool:
+        """
+        Plan and apply the workspace's current files, then record the result.
+        The saved plan is what gets applied, so the summary shows exactly what changes.
+        """
+        # A resumed run reuses the last plan if neither the files nor the state moved since
+        plan_inputs = {"tree": workspace.tree_hash(), "state": workspace.state_identity(), "targets": targets}
+        saved_plan = workspace.terraform_dir / workspace.plan_file
+        if reuse and saved_plan.exists() and workspace.checkpoint("plan", plan_inputs) is not None:
+            emit("resume.skipped", "↷ Plan: configuration and state unchanged since the last plan", DETAIL, stage="plan")
+        elif not self._plan(executor, workspace, resource_addresses, targets, plan_inputs):
             return False
 
-        if not executor.plan():
+        if plan_only:
+            emit("deploy.planned", "✨ Plan Completed (nothing applied)", BANNER, success=True)
+            return True
+
+        apply_log = workspace.metadata_dir / APPLY_LOG_FILE
+        applied = executor.apply(targets, json_log=apply_log, plan_file=workspace.plan_file)
+        if not applied and executor.is_stale_plan(executor.last_result):
+            # The state changed since the plan was saved (another apply, a remote backend...)
+            emit("deploy.plan_stale", "↻ The saved plan is stale: planning again", WARNING)
+            applied = (
+                self._plan(executor, workspace, resource_addresses, targets, plan_inputs)
+                and executor.apply(targets, json_log=apply_log, plan_file=workspace.plan_file)
+            )
+        if applied:
+            # An applied plan cannot be applied again
+            saved_plan.unlink(missing_ok=True)
+        # Per-resource durations, also kept for a failed apply (what did complete)
+        if apply_log.exists():
+            analyzer = PlanAnalyzer(resource_addresses)
+            self.resource_timings = [
+                {**record, "service": analyzer.service_for(record["address"])}
+                for record in parse_apply_log(apply_log)
+            ]
+        if executor.retries:
+            emit(
+                "deploy.retries",
+                f"↻ {executor.retries} retry(ies), {executor.retry_seconds:.1f}s spent on retries in total",
+                WARNING,
+                retries=executor.retries,
+                seconds=round(executor.retry_seconds, 1)
+            )
+        if not applied:
             return False
 
-        if not executor.apply():
+        self.update_inventory(executor, workspace, resource_addresses)
+
+        # A targeted apply leaves the other services untouched,
+        # so it must not mark the whole workspace as up to date
+        if targets is None:
+            workspace.record_fingerprint()
+            self._record_generation(workspace, generation_info)
+        workspace.record_checkpoint("apply", plan_inputs, workspace.fingerprint())
+
+        emit("deploy.completed", "✨ Deployment Sequence Completed!", BANNER, success=True)
+        return True
+
+    def _plan(
+        self,
+        executor: TerraformExecutor,
+        workspace: Workspace,
+        resource_addresses: dict,
+        targets: list[str] | None,
+        plan_inputs: dict
+    ) -> bool:
+        """Save a plan to the workspace, summarize it and record the plan checkpoint."""
+        workspace.clear_checkpoints("plan")
+        if not executor.plan(targets, plan_file=workspace.plan_file):
+            return False
+        self.analyze_plan(executor, workspace, resource_addresses)
+        workspace.record_checkpoint("plan", plan_inputs)
+        return True
+
+    def _record_generation(self, workspace: Workspace, info: dict) -> None:
+        """Keep the applied tree in the config store, for `deploy rollback`."""
+        try:
+            tree = (self.config_store or ConfigStore()).put_tree(workspace)
+            generations = workspace.generations()
+            if generations and generations[-1]["tree"] == tree:
+                return  # Re-applied as-is (--force): same generation
+            number = workspace.record_generation(tree, **info)
+        except OSError as e:
+            emit("generation.not_recorded", f"⚠ Configuration not kept for rollback: {e}", WARNING)
+            return
+        emit("generation.recorded", f"🗃  Generation {number} recorded ({tree[:12]})", DETAIL, generation=number, tree=tree)
+
+    def bake(self, spec_path: str, only: list[str] | None = None, force: bool = False) -> bool:
+        """
+        Build the golden images of the spec's EC2 services with Packer and
+        record them in images.lock.json next to the spec (`deploy bake`).
+        """
+        if not self.validate(spec_path):
+            return False
+        bakeable = [s.name for s in self.spec.application.services if s.type == ServiceType.EC2 and s.image]
+        unknown = sorted(set(only or []) - set(bakeable))
+        if unknown:
+            emit("bake.unknown_services", f"⛔ Not EC2 services with an image: {', '.join(unknown)}", ERROR, services=unknown)
+            return False
+        if not bakeable:
+            emit("bake.nothing", "No EC2 service with an image to bake.", WARNING)
+            return True
+        if not self.spec.infrastructure.golden_image:
+            emit(
+                "bake.not_enabled",
+                "⚠ infrastructure.golden_image is off: deployments keep using stock Ubuntu until it is enabled",
+                WARNING
+            )
+
+        builder = GoldenImageBuilder(
+            TerraformGenerator(self.output_dir), ImageLock.for_spec(spec_path), runner=self.runner
+        )
+        return builder.build(self.spec, only or bakeable, force)
+
+    def rollback(self, number: int, plan_only: bool = False) -> bool:
+        """
+        Restore the tree applied in generation `number` of the output directory
+        and plan/apply it. The spec is neither parsed nor rendered.
+        """
+        emit("rollback.start", f"⏪ Rolling back {self.output_dir} to generation {number}", BANNER, generation=number)
+        self.stage_seconds, self.resource_timings = {}, []
+        workspace = Workspace(self.output_dir)
+
+        generation = workspace.generation(number)
+        if generation is None:
+            known = ", ".join(str(g["number"]) for g in workspace.generations()) or "none"
+            emit("rollback.unknown", f"⛔ No generation {number} in {self.output_dir} (known: {known})", ERROR)
             return False
 
-        console.print(Panel.fit("[bold green]✨ Deployment Sequence Completed![/bold green]"))
+        executor = TerraformExecutor(self.output_dir, runner=self.runner, retry_policy=self.retry_policy)
+        try:
+            with workspace.lock():
+                try:
+                    success = self._restore_and_apply(workspace, executor, generation, plan_only)
+                finally:
+                    self.stage_seconds.update(executor.timings)
+        except WorkspaceLockedError as e:
+            emit("deploy.locked", f"⛔ {e}", ERROR)
+            return False
+
+        if generation.get("spec_path"):
+            self._record_timings(generation["spec_path"], success)
+        return success
+
+    def _restore_and_apply(self, workspace: Workspace, executor: TerraformExecutor, generation: dict, plan_only: bool) -> bool:
+        started = time.monotonic()
+        try:
+            (self.config_store or ConfigStore()).restore_tree(generation["tree"], workspace)
+        except StoreError as e:
+            emit("rollback.failed", f"⛔ {e}", ERROR)
+            return False
+        self.stage_seconds["restore"] = time.monotonic() - started
+        emit("rollback.restored", f"✓ Restored {len(workspace.tf_files())} file(s) from generation {generation['number']}",
+             SUCCESS, tree=generation["tree"])
+
+        # The files no longer come from the spec: `deploy resume` must not reuse them
+        workspace.clear_checkpoints("generate")
+        if workspace.needs_init():
+            if not executor.init():
+                return False
+            workspace.record_init()
+
+        return self._plan_and_apply(
+            workspace, executor, workspace.read_json(RESOURCES_FILE) or {}, None, plan_only, False,
+            {"spec_path": generation.get("spec_path"), "rollback_of": generation["number"]}
+        )
+
+    def _generate(
+        self,
+        workspace: Workspace,
+        generator: TerraformGenerator,
+        executor: TerraformExecutor,
+        only: list[str] | None
+    ) -> tuple[list[str] | None, bool]:
+        """
+        Write the Terraform files (with init overlapping) and resolve --only.
+        Returns (targets, ok).
+        """
+        # main.tf is written first so that `terraform init` (provider download)
+        # runs in the background while the service files are rendered
+        started = time.monotonic()
+        generator.generate_provider(self.spec)
+
+        with ThreadPoolExecutor(max_workers=1) as background:
+            init_future = None
+            if workspace.needs_init():
+                # Run init in the caller's context (e.g. the job output routing of `deploy serve`)
+                init_future = background.submit(contextvars.copy_context().run, executor.init)
+
+            generator.generate_services(self.spec)
+            workspace.write_json(RESOURCES_FILE, generator.resource_addresses)
+            self.stage_seconds["generate"] = time.monotonic() - started
+
+            # Step 3: Execute Terraform (wait for init before planning)
+            if init_future is not None:
+                if not init_future.result():
+                    return None, False
+                workspace.record_init()
+
+        targets = None
+        if only:
+            try:
+                targets = generator.get_target_addresses(self.spec, only)
+            except ValueError as e:
+                emit("deploy.targets_invalid", f"   {e}", ERROR)
+                return None, False
+            if not targets:
+                emit("deploy.targets_invalid", f"   No Terraform resources were generated for: {', '.join(only)}", ERROR)
+                return None, False
+            emit("deploy.targets", f"🎯 Targeting {len(targets)} resource(s) for: {', '.join(only)}", INFO,
+                 services=only, targets=targets)
+        return targets, True
+
+    def _record_timings(self, spec_path: str, success: bool) -> None:
+        """Add this run to the timing history (only runs that reached Terraform)."""
+        if not any(stage in self.stage_seconds for stage in ("init", "plan", "apply")):
+            return
+        try:
+            store = self.timing_store or TimingStore()
+            store.record_run(str(Path(spec_path).resolve()), success, self.stage_seconds, self.resource_timings)
+        except (sqlite3.Error, OSError) as e:
+            emit("timings.not_recorded", f"⚠ Deployment timings not recorded: {e}", WARNING)
+
+    def _boot_times(self, spec_path: str) -> dict:
+        """Measured boot time per service from past runs of this spec (empty if unknown)."""
+        try:
+            store = self.timing_store or TimingStore()
+            return store.boot_times(str(Path(spec_path).resolve()))
+        except (sqlite3.Error, OSError):
+            return {}
+
+    def update_inventory(self, executor: TerraformExecutor, workspace: Workspace, resource_addresses: dict) -> bool:
+        """
+        Index the state and outputs for `deploy status` / `deploy outputs`.
+        A failure here is reported but never fails the deployment.
+        """
+        outputs_json = workspace.metadata_dir / OUTPUTS_FILE
+        started = time.monotonic()
+        try:
+            outputs_ok = executor.output_json(outputs_json)
+            counts = Inventory(workspace.metadata_dir / INVENTORY_FILE).rebuild(
+                workspace.state_file,
+                outputs_json if outputs_ok else None,
+                resource_addresses,
+                workspace.state_identity()
+            )
+        except (OSError, ValueError, LookupError, sqlite3.Error) as e:
+            emit("inventory.not_updated", f"⚠ Inventory not updated: {e}", WARNING)
+            return False
+        finally:
+            outputs_json.unlink(missing_ok=True)
+
+        self.stage_seconds["inventory"] = time.monotonic() - started
+        emit("inventory.updated", f"🗂  Inventory updated: {counts['resources']} resource(s), {counts['outputs']} output(s)",
+             DETAIL, **counts)
         return True
 
+    def refresh_inventory(self) -> bool:
+        """Rebuild the inventory of the output directory from its current state."""
+        workspace = Workspace(self.output_dir)
+        executor = TerraformExecutor(self.output_dir, runner=self.runner, retry_policy=self.retry_policy)
+        try:
+            with workspace.lock():
+                return self.update_inventory(executor, workspace, workspace.read_json(RESOURCES_FILE) or {})
+        except WorkspaceLockedError as e:
+            emit("deploy.locked", f"⛔ {e}", ERROR)
+            return False
+
+    def analyze_plan(self, executor: TerraformExecutor, workspace: Workspace, resource_addresses: dict) -> PlanSummary | None:
+        """
+        Summarise the saved plan per service before applying it.
+        A failure here is reported but never blocks the deployment.
+        """
+        plan_json = workspace.metadata_dir / PLAN_JSON_FILE
+        try:
+            if not executor.show_plan_json(workspace.plan_file, plan_json):
+                return None
+            summary = PlanAnalyzer(resource_addresses).analyze(plan_json)
+        except (OSError, ValueError) as e:
+            emit("plan.analysis_skipped", f"⚠ Plan analysis skipped: {e}", WARNING)
+            return None
+        finally:
+            # The JSON can be hundreds of MB, only the summary is kept
+            plan_json.unlink(missing_ok=True)
+
+        workspace.write_json(PLAN_SUMMARY_FILE, summary.to_dict())
+        self._print_plan_summary(summary)
+        return summary
+
+    def _print_plan_summary(self, summary: PlanSummary) -> None:
+        if not summary.has_changes:
+            emit("plan.summary", "✓ Plan analysis: no resource changes", SUCCESS, totals=summary.totals())
+            return
+
+        emit_table(
+            "plan.summary",
+            "📊 Plan Summary",
+            ["Service"] + [action.capitalize() for action in ACTIONS],
+            [[service] + [counts[action] for action in ACTIONS] for service, counts in sorted(summary.services.items())],
+            totals=summary.totals()
+        )
+
+        for replacement in summary.replacements:
+            detail = f" ({replacement['attributes']})" if replacement["attributes"] else ""
+            emit(
+                "plan.replacement",
+                f"  ↻ {replacement['address']}: {replacement['reason']}{detail}",
+                WARNING,
+                **replacement
+            )
+
     def validate(self, spec_path: str) -> bool:
        
-        console.print("\n[bold cyan]🔍 Step 1: Validating Specification...[/bold cyan]")
+        emit("validate.start", "🔍 Step 1: Validating Specification...", STEP, spec=spec_path)
         try:
-            self.spec = parse_deployment_spec(spec_path)
-            console.print("[green]  Syntax & Semantic Validation Passed[/green]")
+            self.spec = parse_deployment_spec(spec_path, self._boot_times(spec_path))
+            emit("validate.passed", "  Syntax & Semantic Validation Passed", SUCCESS)
             return True
         except ParseError as e:
-            console.print(f"[red]   Validation Failed: {e}[/red]")
+            emit("validate.failed", f"   Validation Failed: {e}", ERROR)
             return False
         except Exception as e:
-            console.print(f"[red]  Unexpected Error: {e}[/red]")
+            emit("validate.failed", f"  Unexpected Error: {e}", ERROR)
             return False
 
     def plan(self):
         """
         Generate Terraform plan (Stub).
         """
-        console.print("\n[bold cyan]Step 2: Generating Execution Plan...[/bold cyan]")
-        console.print("[yellow]    Terraform generation is not yet implemented.[/yellow]")
-        console.print("[dim]  (This step would convert the parsed spec into .tf files)[/dim]")
+        emit("plan.stub", "Step 2: Generating Execution Plan...", STEP)
+        emit("plan.stub", "    Terraform generation is not yet implemented.", WARNING)
+        emit("plan.stub", "  (This step would convert the parsed spec into .tf files)", DETAIL)
 
     def apply(self):
         """
         Apply infrastructure changes (Stub).
         """
-        console.print("\n[bold cyan]  Step 3: Provisioning Infrastructure...[/bold cyan]")
-        console.print("[yellow]    Infrastructure provisioning is not yet implemented.[/yellow]")
-        console.print("[dim]  (This step would run 'terraform apply')[/dim]")
+        emit("apply.stub", "  Step 3: Provisioning Infrastructure...", STEP)
+        emit("apply.stub", "    Infrastructure provisioning is not yet implemented.", WARNING)
+        emit("apply.stub", "  (This step would run 'terraform apply')", DETAIL)
@@ -0,0 +1,442 @@
+"""
+Long-running deploy server (`deploy serve`).
+
+Keeps one warm Python process (Pydantic models, compiled Jinja templates,
+mapper tables) and exposes DeploymentOrchestrator over a small HTTP API,
+on TCP or on a Unix socket:
+
+    POST /jobs                 {"action": "validate" | "plan" | "run",
+                                "spec_path": "specs/a.yaml"        (or)
+                                "name": "tenant-a", "spec": {...},
+                                "force": false, "only": ["backend"],
+                                "output": "rich" | "quiet" | "json"}
+    GET  /jobs                 list of jobs
+    GET  /jobs/<id>            job status and output so far
+    GET  /jobs/<id>/stream     job output as newline-delimited JSON, until it ends
+    GET  /health
+
+Jobs go through a queue served by a fixed number of worker threads.
+
+Over TCP, every request but /health needs `Authorization: Bearer <token>`,
+the per-user token kept in .deploy-server/token (0600) or given by
+DEPLOY_SERVER_TOKEN. The Unix socket is only reachable by its owner (0600)
+and needs no token. POST bodies must be sent as application/json.
+"""
+import contextvars
+import hmac
+import io
+import json
+import os
+import queue
+import re
+import secrets
+import socketserver
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from orchestrator import DeploymentOrchestrator
+from fleet import workspace_dir_for, DEFAULT_WORKSPACES_ROOT
+from infrastructure.executors.runners import CommandRunner
+from infrastructure.generators.terraform_generator import preload_templates
+from utils.events import emit, use_sink, SINKS, BANNER, DETAIL, WARNING
+
+
+ACTIONS = ("validate", "plan", "run")
+MAX_JOBS_KEPT = 200
+DEFAULT_SPECS_DIR = ".deploy-server/specs"
+DEFAULT_TOKEN_FILE = ".deploy-server/token"
+
+_SPEC_NAME_RE = re.compile(r'^[a-zA-Z0-9_-]{1,64}$')
+
+# Job whose output the current thread (or task) is producing
+_current_job: contextvars.ContextVar = contextvars.ContextVar("current_job", default=None)
+
+
+class _RoutingStream(io.TextIOBase):
+    """
+    Replacement for sys.stdout: text written while a job runs goes to that
+    job, everything else to the real stdout.
+    """
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+
+    def write(self, text: str) -> int:
+        job = _current_job.get()
+        if job is None:
+            return self.fallback.write(text)
+        job.append_output(text)
+        return len(text)
+
+    def flush(self) -> None:
+        self.fallback.flush()
+
+    def isatty(self) -> bool:
+        return _current_job.get() is None and self.fallback.isatty()
+
+
+class Job:
+    """One queued request and its captured output."""
+
+    def __init__(
+        self,
+        action: str,
+        spec_path: str,
+        force: bool = False,
+        only: list[str] | None = None,
+        output: str = "rich"
+    ):
+        self.id = uuid.uuid4().hex[:12]
+        self.action = action
+        self.spec_path = spec_path
+        self.force = force
+        self.only = only
+        self.output = output
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.error: str | None = None
+        self._output: list[str] = []
+        self._cond = threading.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def append_output(self, text: str) -> None:
+        with self._cond:
+            self._output.append(text)
+            self._cond.notify_all()
+
+    def set_status(self, status: str, error: str | None = None) -> None:
+        with self._cond:
+            self.status = status
+            self.error = error
+            if status == "running":
+                self.started_at = time.time()
+            elif self.done:
+                self.finished_at = time.time()
+            self._cond.notify_all()
+
+    def wait_output(self, offset: int, timeout: float = 15.0) -> tuple[list[str], bool]:
+        """Block until output past `offset` exists or the job ends."""
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._output) > offset or self.done, timeout=timeout)
+            return self._output[offset:], self.done
+
+    def to_dict(self, include_output: bool = False) -> dict:
+        data = {
+            "id": self.id,
+            "action": self.action,
+            "spec_path": self.spec_path,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if include_output:
+            with self._cond:
+                data["output"] = "".join(self._output)
+        return data
+
+
+class JobQueue:
+    """
+    FIFO job queue executed by a fixed pool of worker threads.
+
+    Args:
+        workers: Number of jobs running at the same time
+        workspaces_root: Parent directory of the per-spec workspaces
+        runner: Command runner for Terraform (defaults to the real binary)
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        workspaces_root: str | Path = DEFAULT_WORKSPACES_ROOT,
+        runner: CommandRunner | None = None
+    ):
+        self.workspaces_root = Path(workspaces_root)
+        self.runner = runner
+        self._queue: queue.Queue = queue.Queue()
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._lock = threading.Lock()
+
+        for index in range(max(1, workers)):
+            threading.Thread(target=self._work, name=f"deploy-worker-{index}", daemon=True).start()
+
+    def submit(
+        self,
+        action: str,
+        spec_path: str,
+        force: bool = False,
+        only: list[str] | None = None,
+        output: str = "rich"
+    ) -> Job:
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action '{action}'. Must be one of: {', '.join(ACTIONS)}")
+        if output not in SINKS:
+            raise ValueError(f"Unknown output '{output}'. Must be one of: {', '.join(SINKS)}")
+
+        job = Job(action, spec_path, force=force, only=only, output=output)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._forget_old_jobs()
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> list[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _forget_old_jobs(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        while len(self._jobs) > MAX_JOBS_KEPT and finished:
+            del self._jobs[finished.pop(0)]
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            # Checked per job: test harnesses and embedding code may swap sys.stdout
+            install_output_routing()
+            token = _current_job.set(job)
+            job.set_status("running")
+            try:
+                with use_sink(job.output):
+                    success = self._execute(job)
+                job.set_status("succeeded" if success else "failed")
+            except Exception as e:
+                job.set_status("failed", error=str(e))
+            finally:
+                _current_job.reset(token)
+                self._queue.task_done()
+
+    def _execute(self, job: Job) -> bool:
+        if job.action == "validate":
+            return DeploymentOrchestrator().validate(job.spec_path)
+
+        orchestrator = DeploymentOrchestrator(
+            output_dir=str(workspace_dir_for(job.spec_path, self.workspaces_root)),
+            runner=self.runner
+        )
+        return orchestrator.run(job.spec_path, force=job.force, only=job.only, plan_only=job.action == "plan")
+
+
+class DeployRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler; `self.server` carries `jobs` (JobQueue) and `specs_dir`."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "ctrl-alt-deploy"
+
+    def address_string(self) -> str:
+        # Unix sockets have no client address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args) -> None:
+        sys.stderr.write(f"[serve] {self.address_string()} {format % args}\n")
+
+    def _send_json(self, status: int, data) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        """Whether the request carries the server token (always true on the Unix socket)."""
+        token = self.server.token
+        if token is None:
+            return True
+        header = self.headers.get("Authorization") or ""
+        scheme, _, value = header.partition(" ")
+        return scheme.lower() == "bearer" and hmac.compare_digest(value.strip().encode(), token.encode())
+
+    def _read_json(self) -> dict:
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if content_type != "application/json":
+            # Browsers cannot send application/json cross-origin without a preflight
+            raise ValueError("Request body must be sent as Content-Type: application/json")
+        length = int(self.headers.get("Content-Length") or 0)
+        data = json.loads(self.rfile.read(length) or b"{}")
+        if not isinstance(data, dict):
+            raise ValueError("Request body must be a JSON object")
+        return data
+
+    def do_GET(self) -> None:
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        jobs: JobQueue = self.server.jobs
+
+        if parts == ["health"]:
+            return self._send_json(200, {"status": "ok"})
+        if not self._authorized():
+            return self._send_json(401, {"error": "Missing or invalid token"})
+        if parts == ["jobs"]:
+            return self._send_json(200, [job.to_dict() for job in jobs.list()])
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            job = jobs.get(parts[1])
+            if job is None:
+                return self._send_json(404, {"error": f"Unknown job {parts[1]}"})
+            if len(parts) == 2:
+                return self._send_json(200, job.to_dict(include_output=True))
+            if parts[2] == "stream":
+                return self._stream(job)
+        self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") != "/jobs":
+            return self._send_json(404, {"error": "Not found"})
+        if not self._authorized():
+            return self._send_json(401, {"error": "Missing or invalid token"})
+        try:
+            request = self._read_json()
+            only = request.get("only")
+            if only is not None and not (isinstance(only, list) and all(isinstance(name, str) for name in only)):
+                raise ValueError("'only' must be a list of service names")
+            spec_path = self._spec_path_from(request)
+            job = self.server.jobs.submit(
+                request.get("action", "validate"),
+                spec_path,
+                force=bool(request.get("force", False)),
+                only=only or None,
+                output=request.get("output", "rich")
+            )
+        except ValueError as e:
+            return self._send_json(400, {"error": str(e)})
+        self._send_json(202, job.to_dict())
+
+    def _spec_path_from(self, request: dict) -> str:
+        """Spec file for the job: an existing path, or an inline spec saved under its name."""
+        if "spec" not in request:
+            spec_path = request.get("spec_path")
+            if not spec_path:
+                raise ValueError("Provide either 'spec_path' or 'spec' with a 'name'")
+            return spec_path
+
+        name = request.get("name", "")
+        if not _SPEC_NAME_RE.match(name):
+            raise ValueError("Inline specs need a 'name' made of letters, digits, '-' or '_'")
+        specs_dir = Path(self.server.specs_dir)
+        specs_dir.mkdir(parents=True, exist_ok=True)
+        spec_path = specs_dir / f"{name}.json"
+        spec_path.write_text(json.dumps(request["spec"]), encoding="utf-8")
+        return str(spec_path)
+
+    def _stream(self, job: Job) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        offset = 0
+        while True:
+            chunks, done = job.wait_output(offset)
+            offset += len(chunks)
+            if chunks:
+                self._write_chunk({"output": "".join(chunks)})
+            if done and not chunks:
+                break
+        self._write_chunk({"status": job.status, "error": job.error})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, data: dict) -> None:
+        payload = (json.dumps(data) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(payload):x}\r\n".encode("ascii") + payload + b"\r\n")
+        self.wfile.flush()
+
+
+class _TCPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def create_server(
+    jobs: JobQueue,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: str | None = None,
+    specs_dir: str = DEFAULT_SPECS_DIR,
+    token: str | None = None
+):
+    """
+    Create (but do not start) the HTTP server, on a Unix socket if socket_path is given.
+    Over TCP, requests need `token` (default: load_token()).
+    """
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = _UnixServer(socket_path, DeployRequestHandler)
+        os.chmod(socket_path, 0o600)
+        server.token = None
+    else:
+        server = _TCPServer((host, port), DeployRequestHandler)
+        server.token = token or load_token()
+
+    server.jobs = jobs
+    server.specs_dir = specs_dir
+    return server
+
+
+def load_token(token_file: str | Path = DEFAULT_TOKEN_FILE) -> str:
+    """
+    Token for TCP clients: DEPLOY_SERVER_TOKEN, else the one saved in token_file
+    (created on first use, readable by the current user only).
+    """
+    if os.environ.get("DEPLOY_SERVER_TOKEN"):
+        return os.environ["DEPLOY_SERVER_TOKEN"]
+    token_file = Path(token_file)
+    if token_file.exists():
+        return token_file.read_text(encoding="utf-8").strip()
+    token_file.parent.mkdir(parents=True, exist_ok=True)
+    token_file.parent.chmod(0o700)
+    token = secrets.token_urlsafe(32)
+    fd = os.open(token_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token + "\n")
+    return token
+
+
+def install_output_routing() -> None:
+    """Route stdout per job (idempotent)."""
+    if not isinstance(sys.stdout, _RoutingStream):
+        sys.stdout = _RoutingStream(sys.stdout)
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: str | None = None,
+    workers: int = 1,
+    workspaces_root: str = DEFAULT_WORKSPACES_ROOT
+) -> None:
+    """Start the deploy server and block until interrupted."""
+    templates = preload_templates()
+
+    server = create_server(JobQueue(workers, workspaces_root), host, port, socket_path)
+    address = socket_path or f"http://{host}:{server.server_address[1]}"
+    emit("server.start", f"🛰  Deploy server listening on {address}", BANNER, address=address)
+    if not socket_path:
+        emit("server.token", f"  Send 'Authorization: Bearer <token>', token in {DEFAULT_TOKEN_FILE} or DEPLOY_SERVER_TOKEN", DETAIL)
+    emit("server.warm", f"  {templates} templates preloaded, {workers} worker(s)", DETAIL, templates=templates, workers=workers)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        emit("server.stop", "Shutting down deploy server", WARNING)
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
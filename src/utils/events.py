@@ -0,0 +1,217 @@
+"""
+Structured progress events.
+
+Code reports progress with `emit(kind, message, level, **fields)` instead of
+printing. The active sink decides how an event is shown:
+
+- RichSink: formatted lines for a terminal (default)
+- QuietSink: warnings and errors only
+- JsonSink: one JSON object per line, easy to aggregate across batch and
+  fleet runs
+
+    emit("generate.file", "✓ main.tf généré", SUCCESS, file="main.tf")
+
+Fields bound with `bind(spec=...)` are added to every event emitted in the
+same context (thread or task), so concurrent runs can be told apart.
+"""
+import contextvars
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any
+
+
+# Levels
+STEP = "step"          # Start of a pipeline step
+BANNER = "banner"      # Start or end of a whole run
+INFO = "info"
+DETAIL = "detail"      # Secondary information
+SUCCESS = "success"
+WARNING = "warning"
+ERROR = "error"
+OUTPUT = "output"      # Raw output of an external command (Terraform)
+
+LEVELS = (STEP, BANNER, INFO, DETAIL, SUCCESS, WARNING, ERROR, OUTPUT)
+
+
+class Event:
+    """One progress event. `columns`/`rows` are set for tabular events."""
+
+    __slots__ = ("kind", "message", "level", "fields", "timestamp", "columns", "rows")
+
+    def __init__(
+        self,
+        kind: str,
+        message: str,
+        level: str = INFO,
+        fields: dict[str, Any] | None = None,
+        columns: list[str] | None = None,
+        rows: list[list] | None = None
+    ):
+        self.kind = kind
+        self.message = message
+        self.level = level
+        self.fields = fields or {}
+        self.timestamp = time.time()
+        self.columns = columns
+        self.rows = rows
+
+    def to_dict(self) -> dict:
+        data = {
+            "ts": round(self.timestamp, 3),
+            "kind": self.kind,
+            "level": self.level,
+            "message": self.message,
+            **self.fields,
+        }
+        if self.rows is not None:
+            data["columns"] = self.columns
+            data["rows"] = self.rows
+        return data
+
+
+class Sink:
+    """Receives every emitted event."""
+
+    def handle(self, event: Event) -> None:
+        raise NotImplementedError
+
+
+class RichSink(Sink):
+    """Terminal output with rich (colours, panels, tables)."""
+
+    STYLES = {
+        STEP: "bold cyan",
+        INFO: "cyan",
+        DETAIL: "dim",
+        SUCCESS: "green",
+        WARNING: "yellow",
+        ERROR: "red",
+    }
+
+    def __init__(self):
+        # Imported here so JSON and quiet runs never pay for rich
+        from rich.console import Console
+        # No file given: rich writes to whatever sys.stdout is at print time
+        self.console = Console()
+
+    def handle(self, event: Event) -> None:
+        from rich.markup import escape
+
+        if event.level == OUTPUT:
+            # Raw command output, written as-is
+            sys.stdout.write(event.message)
+            sys.stdout.flush()
+        elif event.rows is not None:
+            from rich.table import Table
+            table = Table(title=event.message)
+            for index, column in enumerate(event.columns or []):
+                table.add_column(column, style="cyan" if index == 0 else None, justify="left" if index == 0 else "right")
+            for row in event.rows:
+                table.add_row(*(str(cell) for cell in row))
+            self.console.print(table)
+        elif event.level == BANNER:
+            from rich.panel import Panel
+            success = event.fields.get("success")
+            style = "bold blue" if success is None else "bold green" if success else "bold red"
+            self.console.print(Panel.fit(f"[{style}]{escape(event.message)}[/{style}]"))
+        else:
+            style = self.STYLES.get(event.level, "")
+            prefix = "\n" if event.level == STEP else ""
+            text = escape(event.message)
+            self.console.print(f"{prefix}[{style}]{text}[/{style}]" if style else text)
+
+
+class QuietSink(Sink):
+    """
+    Only warnings, errors and values printed for scripts (`deploy outputs NAME`),
+    as plain text. The streamed output of external commands stays hidden.
+    """
+
+    def handle(self, event: Event) -> None:
+        if event.level == OUTPUT and event.kind != "command.output":
+            sys.stdout.write(event.message)
+            sys.stdout.flush()
+        elif event.level in (WARNING, ERROR):
+            sys.stdout.write(event.message.strip() + "\n")
+            if event.fields.get("output"):
+                # Output of the failed command, so the error stays diagnosable
+                sys.stdout.write(event.fields["output"].rstrip() + "\n")
+
+
+class JsonSink(Sink):
+    """Newline-delimited JSON, one object per event."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def handle(self, event: Event) -> None:
+        line = json.dumps(event.to_dict(), default=str) + "\n"
+        with self._lock:
+            sys.stdout.write(line)
+            sys.stdout.flush()
+
+
+SINKS = {"rich": RichSink, "quiet": QuietSink, "json": JsonSink}
+
+_default_sink: Sink | None = None
+_sink_override: contextvars.ContextVar = contextvars.ContextVar("event_sink", default=None)
+_bound_fields: contextvars.ContextVar = contextvars.ContextVar("event_fields", default={})
+
+
+def make_sink(name: str) -> Sink:
+    """Create a sink from its name (rich, quiet or json)."""
+    try:
+        return SINKS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown output format '{name}'. Must be one of: {', '.join(SINKS)}")
+
+
+def configure(sink: Sink | str) -> None:
+    """Set the process-wide sink."""
+    global _default_sink
+    _default_sink = make_sink(sink) if isinstance(sink, str) else sink
+
+
+def get_sink() -> Sink:
+    global _default_sink
+    sink = _sink_override.get()
+    if sink is not None:
+        return sink
+    if _default_sink is None:
+        _default_sink = RichSink()
+    return _default_sink
+
+
+@contextmanager
+def use_sink(sink: Sink | str):
+    """Use another sink in the current context only (e.g. one server job)."""
+    token = _sink_override.set(make_sink(sink) if isinstance(sink, str) else sink)
+    try:
+        yield
+    finally:
+        _sink_override.reset(token)
+
+
+@contextmanager
+def bind(**fields):
+    """Add fields to every event emitted in the current context."""
+    token = _bound_fields.set({**_bound_fields.get(), **fields})
+    try:
+        yield
+    finally:
+        _bound_fields.reset(token)
+
+
+def emit(kind: str, message: str, level: str = INFO, **fields) -> None:
+    """Report one progress event to the active sink."""
+    bound = _bound_fields.get()
+    get_sink().handle(Event(kind, message, level, {**bound, **fields} if bound else fields))
+
+
+def emit_table(kind: str, title: str, columns: list[str], rows: list[list], **fields) -> None:
+    """Report tabular data (rendered as a table on a terminal)."""
+    bound = _bound_fields.get()
+    get_sink().handle(Event(kind, title, INFO, {**bound, **fields}, columns=columns, rows=rows))
@@ -4,11 +4,12 @@ Main parser that orchestrates syntactic and semantic validation.
 import json
 import yaml
 from pathlib import Path
-from typing import Union, Dict, Any
+from typing import Union, Dict, Any, Optional
 from pydantic import ValidationError as PydanticValidationError
 
 from models.models import DeploymentSpec
 from validators.semantic_validator import validate_spec_semantics
+from utils.events import emit, SUCCESS, WARNING, ERROR, DETAIL
 
 
 class ParseError(Exception):
@@ -22,8 +23,9 @@ class SpecParser:
     Handles both YAML and JSON formats.
     """
     
-    def __init__(self, spec_file: Union[str, Path]):
+    def __init__(self, spec_file: Union[str, Path], boot_times: Optional[Dict[str, float]] = None):
         self.spec_file = Path(spec_file)
+        self.boot_times = boot_times
         self.raw_data: Dict[str, Any] = {}
         self.spec: DeploymentSpec | None = None
     
@@ -33,37 +35,35 @@ class SpecParser:
         Returns validated DeploymentSpec object.
         Raises ParseError if validation fails.
         """
-        print(f"📄 Parsing specification file: {self.spec_file}")
+        emit("spec.parse", f"📄 Parsing specification file: {self.spec_file}", DETAIL, file=str(self.spec_file))
         
         # Step 1: Load file
         self.raw_data = self._load_file()
-        print("✓ File loaded successfully")
+        emit("spec.loaded", "✓ File loaded successfully", SUCCESS)
         
         # Step 2: Syntactic validation (Pydantic)
         try:
             self.spec = DeploymentSpec(**self.raw_data)
-            print("✓ Syntactic validation passed")
+            emit("spec.syntax_valid", "✓ Syntactic validation passed", SUCCESS)
         except PydanticValidationError as e:
             self._handle_pydantic_errors(e)
         
         # Step 3: Semantic validation
-        is_valid, errors, warnings = validate_spec_semantics(self.spec)
+        is_valid, errors, warnings = validate_spec_semantics(self.spec, self.boot_times)
         
         # Display warnings
         if warnings:
-            print("\n⚠️  Warnings:")
             for warning in warnings:
-                print(f"  • {warning}")
+                emit("spec.warning", f"⚠️  {warning}", WARNING)
         
         # Handle errors
         if errors:
-            print("\n❌ Semantic validation failed:")
             for error in errors:
-                print(f"  • {error}")
+                emit("spec.semantic_error", f"❌ {error}", ERROR)
             raise ParseError(f"Semantic validation failed with {len(errors)} error(s)")
         
-        print("✓ Semantic validation passed")
-        print("\n✅ All validations passed! Specification is valid.\n")
+        emit("spec.semantic_valid", "✓ Semantic validation passed", SUCCESS)
+        emit("spec.valid", "✅ All validations passed! Specification is valid.", SUCCESS, warnings=len(warnings))
         return self.spec
     
     def _load_file(self) -> Dict[str, Any]:
@@ -91,17 +91,19 @@ class SpecParser:
     
     def _handle_pydantic_errors(self, e: PydanticValidationError):
         """Format and display Pydantic validation errors"""
-        print("\n❌ Syntactic validation failed:\n")
-        
         for error in e.errors():
             location = " → ".join(str(loc) for loc in error['loc'])
             message = error['msg']
             error_type = error['type']
             
-            print(f"  Location: {location}")
-            print(f"  Error: {message}")
-            print(f"  Type: {error_type}")
-            print()
+            emit(
+                "spec.syntax_error",
+                f"❌ {location}: {message} ({error_type})",
+                ERROR,
+                location=location,
+                error=message,
+                type=error_type
+            )
         
         raise ParseError(f"Syntactic validation failed with {len(e.errors())} error(s)")
     
@@ -131,12 +133,17 @@ class SpecParser:
         }
 
 
-def parse_deployment_spec(spec_file: Union[str, Path]) -> DeploymentSpec:
+def parse_deployment_spec(
+    spec_file: Union[str, Path],
+    boot_times: Optional[Dict[str, float]] = None
+) -> DeploymentSpec:
     """
     Convenience function to parse a deployment specification file.
     
     Args:
         spec_file: Path to YAML or JSON specification file
+        boot_times: Optional measured boot time per service (seconds),
+            used to check health check grace periods
         
     Returns:
         Validated DeploymentSpec object
@@ -144,5 +151,5 @@ def parse_deployment_spec(spec_file: Union[str, Path]) -> DeploymentSpec:
     Raises:
         ParseError: If validation fails
     """
-    parser = SpecParser(spec_file)
+    parser = SpecParser(spec_file, boot_times)
     return parser.parse()
\ No newline at end of file
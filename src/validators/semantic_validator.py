@@ -2,8 +2,14 @@
 Semantic validation layer - validates logical consistency.
 Runs AFTER syntactic validation (Pydantic models).
 """
-from typing import List, Dict, Set
-from models import DeploymentSpec, Service, ServiceType
+from typing import List, Dict, Optional, Set
+from models import DeploymentSpec, Service, ServiceType, WorkloadProfile, ScalingMetric
+from infrastructure.mappers import (
+    INSTANCE_CATALOG, RDS_INSTANCE_TYPES, DEFAULT_HEALTH_CHECK_GRACE_PERIOD, DEFAULT_LOAD_BALANCER_GROUP,
+    get_scaling_config_for_service, needs_load_balancer, get_task_size_for_service, is_valid_fargate_task_size,
+    get_rds_instance_type_for_service, map_docker_image_to_rds_engine, get_rds_storage_settings,
+    get_gp3_baseline, get_gp3_provisioning_threshold
+)
 
 
 class ValidationError(Exception):
@@ -31,8 +37,15 @@ class SemanticValidator:
     # Services that can run application code
     COMPUTE_SERVICES = {'EC2', 'ECS'}
     
-    def __init__(self, spec: DeploymentSpec):
+    # A grace period this many times the measured boot time delays replacements for nothing
+    GRACE_PERIOD_BOOT_RATIO = 3
+    # ...as long as it is also at least this many seconds above it
+    GRACE_PERIOD_MIN_SLACK = 120
+    
+    def __init__(self, spec: DeploymentSpec, boot_times: Optional[Dict[str, float]] = None):
         self.spec = spec
+        # Measured boot time per service (seconds), from past deployments
+        self.boot_times = boot_times or {}
         self.errors: List[str] = []
         self.warnings: List[str] = []
     
@@ -51,7 +64,14 @@ class SemanticValidator:
         self._validate_port_conflicts()
         self._validate_environment_references()
         self._validate_scaling_for_type()
+        self._validate_profiles()
+        self._validate_instance_overrides()
+        self._validate_warm_pools()
+        self._validate_load_balancers()
+        self._validate_shared_load_balancers()
+        self._validate_ecs()
         self._validate_rds_specific()
+        self._validate_databases()
         self._validate_security_concerns()
         
         return len(self.errors) == 0, self.errors, self.warnings
@@ -175,6 +195,197 @@ class SemanticValidator:
                         f"Service '{service.name}' is type RDS with scaling.max > 1. "
                         f"RDS doesn't support horizontal scaling like EC2. This will be ignored."
                     )
+            
+            sc = service.scaling
+            if not sc or service.type not in (ServiceType.EC2, ServiceType.ECS):
+                continue
+            # Request count per target is an ALB metric: the service needs a load balancer
+            if sc.metric == ScalingMetric.REQUEST_COUNT and not service.ports:
+                self.errors.append(
+                    f"Service '{service.name}' scales on request_count but exposes no ports, so it has no load balancer. "
+                    f"Use metric 'cpu' or 'custom', or add ports."
+                )
+            if sc.metric == ScalingMetric.CUSTOM and sc.target is None:
+                self.errors.append(
+                    f"Service '{service.name}' scales on a custom metric but has no scaling.target."
+                )
+            if sc.min == sc.max and (sc.metric or sc.target is not None or sc.steps):
+                self.warnings.append(
+                    f"Service '{service.name}' has scaling.min == scaling.max ({sc.min}). "
+                    f"The group cannot change size, so no scaling policy is generated."
+                )
+    
+    def _validate_profiles(self):
+        """Workload profiles select EC2 instance types and RDS performance-tier classes"""
+        for service in self.spec.application.services:
+            if service.type == ServiceType.RDS and service.profile in (WorkloadProfile.COMPUTE, WorkloadProfile.NETWORK):
+                self.warnings.append(
+                    f"RDS service '{service.name}' has profile '{WorkloadProfile(service.profile).value}', "
+                    f"which has no RDS instance family. The general-purpose db.m7g family will be used."
+                )
+            elif service.profile and service.type != ServiceType.RDS and not self._runs_on_instances(service):
+                self.warnings.append(
+                    f"Service '{service.name}' has profile '{WorkloadProfile(service.profile).value}' but is not an EC2 service. "
+                    f"Profiles only apply to EC2 instance types. This will be ignored."
+                )
+    
+    def _validate_instance_overrides(self):
+        """Explicit instance types must exist for the service type"""
+        for service in self.spec.application.services:
+            if service.type == ServiceType.ECS and service.instance_type and not self._runs_on_instances(service):
+                self.warnings.append(
+                    f"Service '{service.name}' sets 'instance_type' but runs on Fargate. "
+                    f"Fargate tasks are sized by machine_size or ecs.cpu/ecs.memory. This will be ignored."
+                )
+                continue
+            if not service.instance_type:
+                continue
+            if service.machine_size:
+                self.warnings.append(
+                    f"Service '{service.name}' sets both 'instance_type' and 'machine_size'. "
+                    f"'instance_type' wins; 'machine_size' will be ignored."
+                )
+            if self._runs_on_instances(service) and service.instance_type not in INSTANCE_CATALOG:
+                self.errors.append(
+                    f"Service '{service.name}' has unknown EC2 instance type '{service.instance_type}'. "
+                    f"Must be one of: {', '.join(sorted(INSTANCE_CATALOG))}"
+                )
+            elif service.type == ServiceType.RDS and service.instance_type not in RDS_INSTANCE_TYPES:
+                self.errors.append(
+                    f"Service '{service.name}' has unknown RDS instance type '{service.instance_type}'. "
+                    f"Must be one of: {', '.join(sorted(RDS_INSTANCE_TYPES))}"
+                )
+    
+    def _validate_warm_pools(self):
+        """Warm pools and grace periods only matter for Auto Scaling Groups"""
+        for service in self.spec.application.services:
+            sc = service.scaling
+            if service.type == ServiceType.ECS:
+                # The grace period also applies to the ECS service (ALB health checks after task start)
+                if sc and sc.warm_pool:
+                    self.warnings.append(
+                        f"Service '{service.name}' sets warm_pool but is an ECS service. "
+                        f"Tasks start in seconds and need no warm pool. This will be ignored."
+                    )
+                continue
+            if service.type != ServiceType.EC2:
+                if sc and (sc.warm_pool or sc.health_check_grace_period is not None):
+                    self.warnings.append(
+                        f"Service '{service.name}' sets warm_pool or health_check_grace_period but is not an EC2 service. "
+                        f"This will be ignored."
+                    )
+                continue
+            
+            min_size, max_size, _ = get_scaling_config_for_service(service, self.spec.infrastructure.scalability)
+            if max_size <= 1:
+                continue
+            if sc and sc.warm_pool and max_size <= min_size:
+                self.warnings.append(
+                    f"Service '{service.name}' has a warm pool but scaling.min == scaling.max. "
+                    f"The group never scales out, so no warm pool is generated."
+                )
+            
+            grace = DEFAULT_HEALTH_CHECK_GRACE_PERIOD
+            if sc and sc.health_check_grace_period is not None:
+                grace = sc.health_check_grace_period
+            boot = self.boot_times.get(service.name)
+            if boot and grace > self.GRACE_PERIOD_BOOT_RATIO * boot and grace - boot >= self.GRACE_PERIOD_MIN_SLACK:
+                self.warnings.append(
+                    f"Service '{service.name}' has health_check_grace_period {grace}s but its instances booted in "
+                    f"{boot:.0f}s (p95 of past deployments). Unhealthy instances stay in service for the whole "
+                    f"grace period; consider lowering scaling.health_check_grace_period."
+                )
+    
+    def _validate_load_balancers(self):
+        """Load balancer settings need an ALB: an EC2 service with ports and Auto Scaling"""
+        for service in self.spec.application.services:
+            lb = service.load_balancer
+            if not lb:
+                continue
+            if service.type not in (ServiceType.EC2, ServiceType.ECS):
+                self.warnings.append(
+                    f"Service '{service.name}' sets load_balancer but is not an EC2 or ECS service. This will be ignored."
+                )
+                continue
+            if lb.port is not None and lb.port not in service.ports:
+                self.errors.append(
+                    f"Service '{service.name}' routes load balancer traffic to port {lb.port}, "
+                    f"which is not one of its ports {service.ports}."
+                )
+            if not needs_load_balancer(service, self.spec.infrastructure.scalability):
+                self.warnings.append(
+                    f"Service '{service.name}' sets load_balancer but gets no load balancer "
+                    f"(it needs ports, and scaling.max > 1 for EC2). This will be ignored."
+                )
+    
+    def _validate_shared_load_balancers(self):
+        """Host/path routing only exists in shared mode, where each group needs unambiguous rules"""
+        if self.spec.infrastructure.load_balancer_mode != "shared":
+            for service in self.spec.application.services:
+                lb = service.load_balancer
+                if lb and (lb.group or lb.hosts or lb.paths or lb.priority is not None):
+                    self.warnings.append(
+                        f"Service '{service.name}' sets load_balancer group/hosts/paths/priority but "
+                        f"infrastructure.load_balancer_mode is 'per_service'. This will be ignored."
+                    )
+            return
+        
+        scalability = self.spec.infrastructure.scalability
+        groups: Dict[str, List[Service]] = {}
+        for service in self.spec.application.services:
+            if needs_load_balancer(service, scalability):
+                lb = service.load_balancer
+                groups.setdefault((lb.group if lb else None) or DEFAULT_LOAD_BALANCER_GROUP, []).append(service)
+        
+        for group, members in groups.items():
+            catch_all = [s.name for s in members if not (s.load_balancer and (s.load_balancer.hosts or s.load_balancer.paths))]
+            if len(catch_all) > 1:
+                self.errors.append(
+                    f"Services {', '.join(catch_all)} share the '{group}' load balancer without hosts or paths. "
+                    f"Only one service per group can receive unmatched requests."
+                )
+            priorities: Dict[int, List[str]] = {}
+            for s in members:
+                if s.load_balancer and s.load_balancer.priority is not None:
+                    priorities.setdefault(s.load_balancer.priority, []).append(s.name)
+            for priority, names in sorted(priorities.items()):
+                if len(names) > 1:
+                    self.errors.append(
+                        f"Services {', '.join(names)} use the same listener rule priority {priority} "
+                        f"on the '{group}' load balancer."
+                    )
+    
+    def _runs_on_instances(self, service: Service) -> bool:
+        """EC2 services and ECS services on the EC2 launch type run on instance types we pick"""
+        if service.type == ServiceType.ECS:
+            return bool(service.ecs and service.ecs.launch_type == "EC2")
+        return service.type == ServiceType.EC2
+    
+    def _validate_ecs(self):
+        """ECS task definitions need a registry image and, on Fargate, a supported task size"""
+        for service in self.spec.application.services:
+            if service.type != ServiceType.ECS:
+                if service.ecs:
+                    self.warnings.append(
+                        f"Service '{service.name}' sets ecs but is not an ECS service. This will be ignored."
+                    )
+                continue
+            if service.dockerfile_path and not service.image:
+                self.errors.append(
+                    f"Service '{service.name}' is type ECS but has no image. "
+                    f"ECS tasks run a pushed image; build and push it, then set 'image'."
+                )
+            cpu, memory = get_task_size_for_service(service, self.spec.infrastructure.machine_size)
+            if not self._runs_on_instances(service) and not is_valid_fargate_task_size(cpu, memory):
+                self.errors.append(
+                    f"Service '{service.name}' requests {cpu} CPU units and {memory} MiB, "
+                    f"which is not a Fargate task size. See the Fargate CPU/memory combinations."
+                )
+            if service.scaling and service.scaling.steps:
+                self.warnings.append(
+                    f"Service '{service.name}' sets scaling.steps but is an ECS service. "
+                    f"Tasks scale with target tracking only; the steps will be ignored."
+                )
     
     def _validate_rds_specific(self):
         """RDS-specific validation"""
@@ -198,6 +409,66 @@ class SemanticValidator:
                         f"Standard database ports are: {expected_ports}"
                     )
     
+    def _validate_databases(self):
+        """RDS storage must be provisionable as requested; database settings only apply to RDS"""
+        infra = self.spec.infrastructure
+        for service in self.spec.application.services:
+            if service.type != ServiceType.RDS:
+                if service.database:
+                    self.warnings.append(
+                        f"Service '{service.name}' sets database but is not an RDS service. This will be ignored."
+                    )
+                continue
+            if not service.image or (service.instance_type and service.instance_type not in RDS_INSTANCE_TYPES):
+                continue
+            try:
+                engine = map_docker_image_to_rds_engine(service.image)
+            except ValueError:
+                continue
+            instance_type = get_rds_instance_type_for_service(
+                infra.machine_size, infra.scalability, service.machine_size, service.instance_type, service.profile
+            )
+            storage = get_rds_storage_settings(service, engine, instance_type)
+            size = storage["allocated_storage"]
+            iops, throughput = storage["iops"], storage["throughput"]
+            
+            if storage["storage_type"] == "gp3" and (iops or throughput):
+                threshold = get_gp3_provisioning_threshold(engine)
+                baseline_iops, baseline_throughput = get_gp3_baseline(engine, size)
+                if size < threshold:
+                    self.errors.append(
+                        f"RDS service '{service.name}' provisions gp3 IOPS or throughput on {size} GiB. "
+                        f"{engine} gp3 volumes below {threshold} GiB have a fixed baseline "
+                        f"({baseline_iops} IOPS, {baseline_throughput} MiB/s); raise database.storage_gb."
+                    )
+                elif (iops and iops < baseline_iops) or (throughput and throughput < baseline_throughput):
+                    self.errors.append(
+                        f"RDS service '{service.name}' provisions less than the gp3 baseline of a {size} GiB volume "
+                        f"({baseline_iops} IOPS, {baseline_throughput} MiB/s)."
+                    )
+                if iops and iops > 64000:
+                    self.errors.append(f"RDS service '{service.name}' requests {iops} IOPS; gp3 allows at most 64000.")
+                if throughput and throughput > storage["effective_iops"] / 4:
+                    self.errors.append(
+                        f"RDS service '{service.name}' requests {throughput} MiB/s for {storage['effective_iops']} IOPS. "
+                        f"gp3 allows at most 0.25 MiB/s per provisioned IOPS."
+                    )
+            if storage["storage_type"] == "io2":
+                if size < 100:
+                    self.errors.append(
+                        f"RDS service '{service.name}' uses io2 storage on {size} GiB; io2 needs at least 100 GiB."
+                    )
+                elif iops > size * 1000:
+                    self.errors.append(
+                        f"RDS service '{service.name}' requests {iops} IOPS on {size} GiB of io2. "
+                        f"io2 allows at most 1000 IOPS per GiB."
+                    )
+            if storage["performance_insights"] and instance_type.endswith((".micro", ".small")):
+                self.warnings.append(
+                    f"RDS service '{service.name}' enables Performance Insights on {instance_type}, "
+                    f"which does not support it. Use a larger instance class."
+                )
+    
     def _validate_security_concerns(self):
         """Check for common security issues"""
         # Check for hardcoded passwords
@@ -227,10 +498,14 @@ class SemanticValidator:
                 )
 
 
-def validate_spec_semantics(spec: DeploymentSpec) -> tuple[bool, List[str], List[str]]:
+def validate_spec_semantics(
+    spec: DeploymentSpec,
+    boot_times: Optional[Dict[str, float]] = None
+) -> tuple[bool, List[str], List[str]]:
     """
     Convenience function to run semantic validation.
+    boot_times: optional measured boot time per service (seconds)
     Returns: (is_valid, errors, warnings)
     """
-    validator = SemanticValidator(spec)
+    validator = SemanticValidator(spec, boot_times)
     return validator.validate()
\ No newline at end of file
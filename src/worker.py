@@ -0,0 +1,196 @@
+"""
+Resident Python worker for the `deploy` Node wrapper.
+
+With DEPLOY_DAEMON=1, bin/deploy.js does not start a new interpreter per
+call. It sends the command line to this worker over a Unix socket instead, so
+repeated calls (`deploy validate` from git hooks or an IDE) skip the
+interpreter boot and the imports.
+
+Protocol (newline-delimited JSON over one connection per command):
+
+    client -> worker   {"argv": ["validate", "spec.yaml"], "cwd": "/path", "stdin": ""}
+    worker -> client   {"stream": "stdout" | "stderr", "data": "..."}   (repeated)
+    worker -> client   {"exit": 0}
+
+Commands run one at a time, since they change the working directory and the
+process-wide stdio. The worker exits after `idle_timeout` seconds without a
+command.
+
+The socket lives in a per-user directory ($XDG_RUNTIME_DIR, else a 0700
+directory in the temp dir whose owner is checked), is created 0600, and a
+socket owned by another user is never used or replaced.
+"""
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import threading
+import traceback
+from contextlib import contextmanager
+
+
+DEFAULT_IDLE_TIMEOUT = 900
+SOCKET_NAME = "ctrl-alt-deploy.sock"
+
+
+def socket_dir() -> str:
+    """Per-user directory of the socket: $XDG_RUNTIME_DIR, else ctrl-alt-deploy-<uid> in the temp dir."""
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return os.environ["XDG_RUNTIME_DIR"]
+    return os.path.join(tempfile.gettempdir(), f"ctrl-alt-deploy-{os.getuid()}")
+
+
+def default_socket_path() -> str:
+    """Socket used by the wrapper and the worker (DEPLOY_DAEMON_SOCKET overrides it)."""
+    return os.environ.get("DEPLOY_DAEMON_SOCKET") or os.path.join(socket_dir(), SOCKET_NAME)
+
+
+def ensure_private_dir(path: str) -> None:
+    """
+    Create `path` (0700) if needed. Raises PermissionError unless it is a
+    directory owned by the current user and closed to everyone else: another
+    user could otherwise create the socket first and receive the commands.
+    """
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{path} must be a directory owned by you and closed to other users (0700)")
+
+
+def is_own_socket(socket_path: str) -> bool:
+    """Whether socket_path is a socket owned by the current user."""
+    info = os.lstat(socket_path)
+    return stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid()
+
+
+class _FrameWriter(io.TextIOBase):
+    """Text stream that forwards every write to the client as a frame."""
+
+    def __init__(self, wfile, stream: str, tty: bool = False):
+        self.wfile = wfile
+        self.stream = stream
+        self.tty = tty
+
+    def write(self, text: str) -> int:
+        if text:
+            frame = json.dumps({"stream": self.stream, "data": text}) + "\n"
+            self.wfile.write(frame.encode("utf-8"))
+        return len(text)
+
+    def flush(self) -> None:
+        self.wfile.flush()
+
+    def isatty(self) -> bool:
+        return self.tty
+
+
+@contextmanager
+def _client_process(cwd: str, stdin: str, stdout, stderr):
+    """Temporarily point the working directory and stdio at the client's."""
+    saved = (os.getcwd(), sys.stdin, sys.stdout, sys.stderr)
+    os.chdir(cwd)
+    sys.stdin, sys.stdout, sys.stderr = io.StringIO(stdin), stdout, stderr
+    try:
+        yield
+    finally:
+        os.chdir(saved[0])
+        sys.stdin, sys.stdout, sys.stderr = saved[1:]
+
+
+def run_command(argv: list[str], cwd: str, stdin: str, stdout, stderr) -> int:
+    """Run one `deploy` command line in this process and return its exit code."""
+    from cli import app
+
+    with _client_process(cwd, stdin, stdout, stderr):
+        try:
+            app(args=argv, prog_name="deploy")
+            return 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                return e.code or 0
+            print(e.code, file=sys.stderr)
+            return 1
+        except Exception:
+            traceback.print_exc()
+            return 1
+
+
+class _CommandHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            return
+
+        tty = bool(request.get("tty", False))
+        code = run_command(
+            [str(arg) for arg in request.get("argv", [])],
+            request.get("cwd") or os.getcwd(),
+            request.get("stdin", ""),
+            _FrameWriter(self.wfile, "stdout", tty),
+            _FrameWriter(self.wfile, "stderr", tty)
+        )
+        self.wfile.write((json.dumps({"exit": code}) + "\n").encode("utf-8"))
+
+
+class _WorkerServer(socketserver.UnixStreamServer):
+    idle = False
+
+    def handle_timeout(self) -> None:
+        self.idle = True
+
+
+def _is_alive(socket_path: str) -> bool:
+    """Whether another worker already answers on this socket."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            probe.connect(socket_path)
+        return True
+    except OSError:
+        return False
+
+
+def serve_worker(socket_path: str | None = None, idle_timeout: float = DEFAULT_IDLE_TIMEOUT) -> None:
+    """Serve commands on a Unix socket until idle for `idle_timeout` seconds."""
+    socket_path = socket_path or default_socket_path()
+    if os.path.dirname(socket_path) == socket_dir():
+        ensure_private_dir(socket_dir())
+    if os.path.lexists(socket_path):
+        if not is_own_socket(socket_path):
+            raise PermissionError(f"{socket_path} exists and is not a socket owned by you")
+        if _is_alive(socket_path):
+            return
+        os.unlink(socket_path)
+
+    # Warm up: load the CLI and everything it imports before the first command
+    import cli  # noqa: F401
+    from infrastructure.generators.terraform_generator import preload_templates
+    preload_templates()
+
+    # Created 0600 from the start: no window where another user can connect
+    previous_umask = os.umask(0o177)
+    try:
+        server = _WorkerServer(socket_path, _CommandHandler)
+    finally:
+        os.umask(previous_umask)
+    server.timeout = idle_timeout
+    if threading.current_thread() is threading.main_thread():
+        # Remove the socket on `kill` too
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        while not server.idle:
+            server.handle_request()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
@@ -0,0 +1,11 @@
+"""
+Configuration commune des tests.
+"""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_deploy_home(tmp_path, monkeypatch):
+    """Chaque test utilise son propre répertoire utilisateur (historique des temps, ...)"""
+    monkeypatch.setenv("CTRL_ALT_DEPLOY_HOME", str(tmp_path / "deploy-home"))
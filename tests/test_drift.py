@@ -0,0 +1,165 @@
+"""
+Tests pour la détection de dérive (`deploy drift`).
+
+Ces tests vérifient que :
+- Les ressources dérivées sont lues dans les événements `resource_drift`
+- Le code de sortie 2 de `-detailed-exitcode` n'est pas traité comme un échec
+- Les résultats sont mis en cache (TTL) tant que fichiers et état sont inchangés
+- Un workspace verrouillé par un déploiement est signalé sans être vérifié
+"""
+
+import sys
+import json
+import time
+import tempfile
+from pathlib import Path
+from shutil import rmtree
+
+# Ajouter src au path Python
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+import pytest
+from drift import DriftDetector, StartLimiter, discover_workspaces, default_workspaces, parse_drift_log, CLEAN, DRIFTED, FAILED, BUSY
+from infrastructure.executors.runners import CommandRunner, CommandResult
+from infrastructure.workspace import Workspace, RESOURCES_FILE
+
+DRIFT_EVENT = {
+    "@level": "info",
+    "@message": "aws_instance.backend: Drift detected (update)",
+    "type": "resource_drift",
+    "change": {
+        "resource": {"addr": "aws_instance.backend", "resource_type": "aws_instance"},
+        "action": "update"
+    }
+}
+
+
+class FakeTerraform(CommandRunner):
+    """Runner qui simule `terraform plan -refresh-only` pour chaque workspace"""
+
+    def __init__(self, drifted: set[str] = frozenset(), failing: set[str] = frozenset()):
+        self.drifted = drifted
+        self.failing = failing
+        self.commands = []
+
+    def run(self, command, cwd, stdout_path=None):
+        self.commands.append((Path(cwd).name, command))
+        if command[1] == "init":
+            (Path(cwd) / ".terraform").mkdir(exist_ok=True)
+            return CommandResult(command, 0, "", 0.0)
+
+        name = Path(cwd).name
+        if name in self.failing:
+            return CommandResult(command, 1, "Error: No valid credential sources found", 0.0)
+        lines = [{"type": "version", "terraform": "1.6.6"}]
+        if name in self.drifted:
+            lines.append(DRIFT_EVENT)
+        Path(stdout_path).write_text("\n".join(json.dumps(line) for line in lines) + "\n")
+        return CommandResult(command, 2 if name in self.drifted else 0, "", 0.0)
+
+    def plans(self) -> list[str]:
+        return [name for name, command in self.commands if command[1] == "plan"]
+
+
+class TestDrift:
+    """Tests pour DriftDetector"""
+
+    def setup_method(self):
+        """Setup avant chaque test"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        for name in ("shop", "blog", "api"):
+            workspace_dir = self.test_dir / name
+            workspace_dir.mkdir()
+            (workspace_dir / "main.tf").write_text('provider "aws" {}\n')
+            Workspace(workspace_dir).write_json(RESOURCES_FILE, {"backend": ["aws_instance.backend"]})
+        self.workspaces = discover_workspaces(self.test_dir)
+
+    def teardown_method(self):
+        """Cleanup après chaque test"""
+        if self.test_dir.exists():
+            rmtree(self.test_dir)
+
+    def test_discover_workspaces(self):
+        """Test que seuls les répertoires avec des fichiers .tf sont retenus"""
+        (self.test_dir / "empty").mkdir()
+        assert [path.name for path in discover_workspaces(self.test_dir)] == ["api", "blog", "shop"]
+
+    def test_default_workspaces_include_run_output(self):
+        """Test que le workspace de `deploy run` est vérifié avec ceux du mode flotte"""
+        output_dir = self.test_dir / "api"
+        fleet_root = self.test_dir / "fleet"
+        (fleet_root / "shop").mkdir(parents=True)
+        (fleet_root / "shop" / "main.tf").write_text('provider "aws" {}\n')
+
+        assert default_workspaces(output_dir, fleet_root) == [output_dir, fleet_root / "shop"]
+        assert default_workspaces(self.test_dir / "missing", fleet_root) == [fleet_root / "shop"]
+
+    def test_drift_report(self):
+        """Test du statut de chaque workspace et des ressources dérivées"""
+        runner = FakeTerraform(drifted={"shop"}, failing={"blog"})
+        results = {r.workspace.name: r for r in DriftDetector(workers=3, runner=runner).run(self.workspaces)}
+
+        assert results["api"].status == CLEAN
+        assert results["blog"].status == FAILED
+        assert results["shop"].status == DRIFTED
+        assert results["shop"].resources == [{
+            "address": "aws_instance.backend", "resource_type": "aws_instance",
+            "action": "update", "service": "backend"
+        }]
+
+        plan = next(command for name, command in runner.commands if command[1] == "plan")
+        assert "-refresh-only" in plan and "-detailed-exitcode" in plan
+        assert "-parallelism=4" in plan
+
+    def test_results_are_cached_until_state_changes(self):
+        """Test du cache avec TTL, invalidé par un changement d'état"""
+        runner = FakeTerraform(drifted={"shop"})
+        DriftDetector(runner=runner).run(self.workspaces)
+        assert len(runner.plans()) == 3
+
+        results = DriftDetector(runner=runner).run(self.workspaces)
+        assert len(runner.plans()) == 3
+        assert all(result.cached for result in results)
+        assert next(r for r in results if r.workspace.name == "shop").status == DRIFTED
+
+        (self.test_dir / "api" / "terraform.tfstate").write_text('{"serial": 2, "lineage": "x"}')
+        DriftDetector(runner=runner).run(self.workspaces)
+        assert runner.plans()[3:] == ["api"]
+
+        DriftDetector(runner=runner, ttl=0).run(self.workspaces)
+        assert len(runner.plans()) == 7
+
+    def test_failed_check_is_not_cached(self):
+        """Test qu'une erreur est revérifiée au prochain passage"""
+        runner = FakeTerraform(failing={"api"})
+        DriftDetector(runner=runner).run(self.workspaces)
+        DriftDetector(runner=runner).run(self.workspaces)
+        assert runner.plans().count("api") == 2
+
+    def test_locked_workspace_is_busy(self):
+        """Test qu'un déploiement en cours n'est pas perturbé"""
+        runner = FakeTerraform()
+        with Workspace(self.test_dir / "shop").lock():
+            results = DriftDetector(runner=runner).run(self.workspaces)
+        assert next(r for r in results if r.workspace.name == "shop").status == BUSY
+        assert "shop" not in runner.plans()
+
+    def test_start_limiter_spaces_starts(self):
+        """Test de l'espacement minimal entre deux démarrages"""
+        limiter = StartLimiter(0.1)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.wait()
+        assert time.monotonic() - start >= 0.2
+
+    def test_parse_drift_log_ignores_other_events(self):
+        """Test que seuls les événements resource_drift sont retenus"""
+        log = self.test_dir / "drift.jsonl"
+        log.write_text("\n".join([
+            json.dumps({"type": "version"}),
+            json.dumps(DRIFT_EVENT),
+            "not json \"resource_drift\"",
+            json.dumps({"type": "change_summary", "changes": {"operation": "plan"}}),
+        ]))
+        assert [r["address"] for r in parse_drift_log(log)] == ["aws_instance.backend"]
@@ -0,0 +1,93 @@
+"""
+Tests pour le journal d'événements structuré.
+
+Ces tests vérifient que :
+- Le sink JSON écrit un objet par ligne, avec les champs liés par bind()
+- Le sink silencieux ne garde que les avertissements, les erreurs et les valeurs pour les scripts
+- use_sink() ne change le sink que dans le contexte courant
+"""
+
+import sys
+import json
+import threading
+from pathlib import Path
+
+# Ajouter src au path Python
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+import pytest
+from utils import events
+from utils.events import emit, emit_table, bind, use_sink, JsonSink, QuietSink, WARNING, ERROR, SUCCESS, OUTPUT
+
+
+class RecordingSink(events.Sink):
+    """Sink qui garde les événements reçus"""
+
+    def __init__(self):
+        self.events = []
+
+    def handle(self, event):
+        self.events.append(event)
+
+
+class TestEvents:
+    """Tests pour l'émetteur d'événements"""
+
+    def test_json_sink_one_object_per_line(self, capsys):
+        """Test du format NDJSON et des champs liés"""
+        with use_sink(JsonSink()):
+            with bind(spec="a.yaml"):
+                emit("generate.file", "✓ main.tf généré", SUCCESS, file="main.tf")
+            emit_table("plan.summary", "Plan", ["Service", "Create"], [["backend", 2]])
+
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert lines[0]["kind"] == "generate.file"
+        assert lines[0]["spec"] == "a.yaml"
+        assert lines[0]["file"] == "main.tf"
+        assert "spec" not in lines[1]
+        assert lines[1]["rows"] == [["backend", 2]]
+
+    def test_quiet_sink_keeps_warnings_and_errors(self, capsys):
+        """Test du mode silencieux"""
+        with use_sink(QuietSink()):
+            emit("spec.loaded", "✓ File loaded successfully", SUCCESS)
+            emit("spec.warning", "⚠️  careful", WARNING)
+            emit("terraform.failed", "✗ Command failed", ERROR, output="Error: boom")
+
+        assert capsys.readouterr().out == "⚠️  careful\n✗ Command failed\nError: boom\n"
+
+    def test_quiet_sink_prints_values_for_scripts(self, capsys):
+        """Test que le mode silencieux écrit les valeurs brutes, mais pas la sortie de Terraform"""
+        with use_sink(QuietSink()):
+            emit("command.output", "aws_instance.backend: Creating...\n", OUTPUT)
+            emit("outputs.value", "backend-alb.elb.amazonaws.com\n", OUTPUT, name="backend_lb_dns")
+
+        assert capsys.readouterr().out == "backend-alb.elb.amazonaws.com\n"
+
+    def test_use_sink_is_context_local(self):
+        """Test qu'un sink de job n'affecte pas les autres threads"""
+        job_sink, other_sink = RecordingSink(), RecordingSink()
+        ready, done = threading.Event(), threading.Event()
+
+        def other_thread():
+            with use_sink(other_sink):
+                ready.set()
+                done.wait(5)
+                emit("other", "other")
+
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+        ready.wait(5)
+        with use_sink(job_sink):
+            emit("job", "job")
+        done.set()
+        thread.join(5)
+
+        assert [e.kind for e in job_sink.events] == ["job"]
+        assert [e.kind for e in other_sink.events] == ["other"]
+
+    def test_unknown_sink_name(self):
+        """Test d'un format de sortie inconnu"""
+        with pytest.raises(ValueError):
+            events.make_sink("xml")
@@ -0,0 +1,97 @@
+"""
+Tests pour le catalogue d'instances et la sélection par profil de charge.
+
+Ces tests vérifient que :
+- Chaque profil choisit une famille de génération actuelle, non burstable
+- Le profil "arm" choisit un type Graviton (arm64)
+- Sans profil, le mapping t3 historique est conservé
+- L'architecture est déduite du catalogue ou du nom de famille
+- Un type exact (instance_type) est prioritaire et doit être connu
+"""
+
+import sys
+from pathlib import Path
+
+# Ajouter src au path Python
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+import pytest
+from models.models import MachineSize, WorkloadProfile
+from infrastructure.mappers.instance_mapper import (
+    get_instance_type_for_service,
+    select_instance_type_for_profile,
+    PROFILE_REQUIREMENTS
+)
+from infrastructure.mappers.instance_catalog import (
+    INSTANCE_CATALOG, find_instance_types, instance_architecture, ARM64, X86_64
+)
+from infrastructure.mappers.rds_mapper import get_rds_instance_type_for_service
+from models.models import Scalability
+
+
+class TestInstanceCatalog:
+    """Tests pour le catalogue et la sélection par profil"""
+
+    @pytest.mark.parametrize("profile,expected", [
+        (WorkloadProfile.COMPUTE, "c7i.large"),
+        (WorkloadProfile.BALANCED, "m7i.large"),
+        (WorkloadProfile.MEMORY, "r7i.large"),
+        (WorkloadProfile.NETWORK, "c6in.large"),
+        (WorkloadProfile.ARM, "m7g.large"),
+    ])
+    def test_profile_families(self, profile, expected):
+        """Test de la famille choisie pour chaque profil"""
+        assert select_instance_type_for_profile(profile, MachineSize.S) == expected
+
+    def test_every_profile_and_size_is_covered(self):
+        """Test que le catalogue couvre tous les besoins, sans type burstable"""
+        for profile, sizes in PROFILE_REQUIREMENTS.items():
+            for size, (vcpu, memory, network) in sizes.items():
+                chosen = INSTANCE_CATALOG[select_instance_type_for_profile(profile, size)]
+                assert not chosen.burstable and chosen.current_generation
+                assert chosen.vcpu >= vcpu and chosen.memory_gib >= memory and chosen.network_gbps >= network
+                assert chosen.architecture == (ARM64 if profile == WorkloadProfile.ARM else X86_64)
+
+    def test_xl_gives_more_than_four_vcpus(self):
+        """Test que la taille XL dépasse les 4 vCPU du t3.xlarge"""
+        chosen = select_instance_type_for_profile(WorkloadProfile.BALANCED, MachineSize.XL)
+        assert INSTANCE_CATALOG[chosen].vcpu == 16
+
+    def test_default_mapping_without_profile(self):
+        """Test que l'absence de profil garde le mapping t3"""
+        assert get_instance_type_for_service(MachineSize.M) == "t3.medium"
+        assert get_instance_type_for_service(MachineSize.M, profile="memory") == "r7i.xlarge"
+
+    def test_cheapest_candidate_first(self):
+        """Test du tri par prix"""
+        candidates = find_instance_types(2, 4)
+        prices = [c.hourly_price for c in candidates]
+        assert prices == sorted(prices)
+        assert all(not c.burstable for c in candidates)
+
+    def test_architecture(self):
+        """Test de l'architecture des types connus et inconnus"""
+        assert instance_architecture("c7g.large") == ARM64
+        assert instance_architecture("t3.micro") == X86_64
+        assert instance_architecture("m8g.large") == ARM64
+        assert instance_architecture("c7gn.16xlarge") == ARM64
+        assert instance_architecture("m7i-flex.large") == X86_64
+
+    def test_instance_type_override(self):
+        """Test qu'un type exact est prioritaire sur la taille et validé"""
+        assert get_instance_type_for_service(MachineSize.S, instance_type="m5.large") == "m5.large"
+        with pytest.raises(ValueError):
+            get_instance_type_for_service(MachineSize.S, instance_type="x9z.large")
+
+    def test_rds_instance_type_priority(self):
+        """Test de la priorité type exact > taille du service > scalabilité > taille globale"""
+        assert get_rds_instance_type_for_service(MachineSize.S, Scalability.HIGH) == "db.t3.large"
+        assert get_rds_instance_type_for_service(
+            MachineSize.S, Scalability.HIGH, service_machine_size=MachineSize.XL
+        ) == "db.t3.xlarge"
+        assert get_rds_instance_type_for_service(
+            MachineSize.S, Scalability.LOW, service_machine_size=MachineSize.L, instance_type="db.m7g.xlarge"
+        ) == "db.m7g.xlarge"
+        with pytest.raises(ValueError):
+            get_rds_instance_type_for_service(MachineSize.S, Scalability.LOW, instance_type="db.x9.large")
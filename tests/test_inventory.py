@@ -0,0 +1,165 @@
+"""
+Tests pour l'inventaire local (état Terraform + outputs).
+
+Ces tests vérifient que :
+- Les ressources de l'état sont indexées par service, type et ID
+- Les outputs sont indexés par service, sans stocker les valeurs sensibles
+- Une reconstruction remplace entièrement l'ancien index
+- Un `deploy run` (rejoué) met à jour l'inventaire
+- `deploy -o quiet outputs NAME` n'écrit que la valeur, pour les scripts
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+from shutil import rmtree
+
+# Ajouter src au path Python
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+import pytest
+from typer.testing import CliRunner
+from cli import app
+from utils.events import configure
+from infrastructure.inventory import Inventory, iter_state_instances
+from infrastructure.executors.runners import ReplayRunner
+from infrastructure.workspace import Workspace, INVENTORY_FILE
+from orchestrator import DeploymentOrchestrator
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+STATE = {
+    "version": 4,
+    "serial": 12,
+    "lineage": "3f1c2a9e",
+    "outputs": {},
+    "resources": [
+        {
+            "mode": "data", "type": "aws_ami", "name": "ubuntu",
+            "instances": [{"attributes": {"id": "ami-0123"}}]
+        },
+        {
+            "mode": "managed", "type": "aws_vpc", "name": "main",
+            "instances": [{"attributes": {"id": "vpc-0a1b", "arn": "arn:aws:ec2:vpc/vpc-0a1b", "tags": {"Name": "main"}}}]
+        },
+        {
+            "mode": "managed", "type": "aws_instance", "name": "backend",
+            "instances": [
+                {"index_key": 0, "attributes": {"id": "i-0001", "public_ip": "54.1.1.1"}},
+                {"index_key": 1, "attributes": {"id": "i-0002", "public_ip": ""}}
+            ]
+        },
+        {
+            "module": "module.db", "mode": "managed", "type": "aws_db_instance", "name": "postgres",
+            "instances": [{"attributes": {"id": "db-1", "endpoint": "db.example:5432"}}]
+        }
+    ]
+}
+
+OUTPUTS = {
+    "backend_lb_dns": {"sensitive": False, "type": "string", "value": "backend-alb.elb.amazonaws.com"},
+    "postgres_db_port": {"sensitive": False, "type": "number", "value": 5432},
+    "postgres_password": {"sensitive": True, "type": "string", "value": "s3cret"},
+    "vpc_id": {"sensitive": False, "type": "string", "value": "vpc-0a1b"}
+}
+
+ADDRESSES = {"backend": ["aws_instance.backend"], "postgres": ["module.db.aws_db_instance.postgres"]}
+
+
+class TestInventory:
+    """Tests pour Inventory"""
+
+    def setup_method(self):
+        """Setup avant chaque test"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.state_file = self.test_dir / "terraform.tfstate"
+        self.state_file.write_text(json.dumps(STATE))
+        self.outputs_file = self.test_dir / "outputs.json"
+        self.outputs_file.write_text(json.dumps(OUTPUTS))
+        self.inventory = Inventory(self.test_dir / INVENTORY_FILE)
+
+    def teardown_method(self):
+        """Cleanup après chaque test"""
+        if self.test_dir.exists():
+            rmtree(self.test_dir)
+
+    def test_state_instances_addresses(self):
+        """Test des adresses Terraform reconstruites depuis l'état"""
+        addresses = [record["address"] for record in iter_state_instances(self.state_file)]
+        assert addresses == [
+            "data.aws_ami.ubuntu",
+            "aws_vpc.main",
+            "aws_instance.backend[0]",
+            "aws_instance.backend[1]",
+            "module.db.aws_db_instance.postgres",
+        ]
+
+    def test_resources_indexed_by_service_type_and_id(self):
+        """Test des filtres service / type / ID"""
+        counts = self.inventory.rebuild(self.state_file, self.outputs_file, ADDRESSES, {"serial": 12})
+        assert counts == {"resources": 5, "outputs": 4}
+        assert self.inventory.info()["serial"] == 12
+
+        backend = self.inventory.resources(service="backend")
+        assert [r["resource_id"] for r in backend] == ["i-0001", "i-0002"]
+        # Les attributs vides ne sont pas conservés
+        assert backend[0]["attributes"] == {"public_ip": "54.1.1.1"}
+        assert backend[1]["attributes"] == {}
+
+        vpc = self.inventory.resources(resource_type="aws_vpc")[0]
+        assert vpc["service"] == "(shared)"
+        assert "tags" not in vpc["attributes"]
+
+        assert self.inventory.resources(resource_id="db-1")[0]["service"] == "postgres"
+
+    def test_outputs_by_service_without_secrets(self):
+        """Test des outputs et des valeurs sensibles"""
+        self.inventory.rebuild(self.state_file, self.outputs_file, ADDRESSES)
+
+        assert self.inventory.output("backend_lb_dns")["value"] == "backend-alb.elb.amazonaws.com"
+        assert self.inventory.output("postgres_db_port")["value"] == 5432
+        assert [o["name"] for o in self.inventory.outputs(service="postgres")] == [
+            "postgres_db_port", "postgres_password"
+        ]
+
+        secret = self.inventory.output("postgres_password")
+        assert secret["sensitive"] and secret["value"] is None
+        assert b"s3cret" not in self.inventory.path.read_bytes()
+        assert self.inventory.output("missing") is None
+
+    def test_rebuild_replaces_previous_index(self):
+        """Test qu'une reconstruction ne garde rien de l'ancien index"""
+        self.inventory.rebuild(self.state_file, self.outputs_file, ADDRESSES)
+        self.inventory.rebuild(None, None)
+
+        assert self.inventory.resources() == []
+        assert self.inventory.outputs() == []
+        assert not self.inventory.path.with_suffix(".db.tmp").exists()
+
+    def test_replayed_run_updates_inventory(self):
+        """Test qu'un déploiement rejoué remplit l'inventaire"""
+        output_dir = self.test_dir / "terraform"
+        orchestrator = DeploymentOrchestrator(
+            output_dir=str(output_dir),
+            runner=ReplayRunner(FIXTURES / "terraform_cassette.json", time_scale=0, echo=False)
+        )
+        assert orchestrator.run(str(Path(__file__).parent.parent / "examples" / "sample-spec.yaml"))
+
+        inventory = Inventory(Workspace(output_dir).metadata_dir / INVENTORY_FILE)
+        assert inventory.output("backend_lb_dns")["service"] == "backend"
+        assert inventory.output("vpc_id")["service"] == "(shared)"
+
+    def test_quiet_outputs_prints_raw_value(self):
+        """Test de `deploy -o quiet outputs NAME`, utilisé dans $(...)"""
+        workspace = Workspace(self.test_dir / "ws")
+        workspace.metadata_dir.mkdir(parents=True)
+        Inventory(workspace.metadata_dir / INVENTORY_FILE).rebuild(self.state_file, self.outputs_file, ADDRESSES)
+
+        try:
+            result = CliRunner().invoke(app, ["-o", "quiet", "outputs", "backend_lb_dns", "--workspace", str(workspace.terraform_dir)])
+        finally:
+            configure("rich")
+        assert result.exit_code == 0
+        assert result.output == "backend-alb.elb.amazonaws.com\n"
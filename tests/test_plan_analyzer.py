@@ -0,0 +1,106 @@
+"""
+Tests pour l'analyse de plan Terraform en streaming.
+
+Ces tests vérifient que :
+- Le tableau resource_changes est lu élément par élément, quel que soit le découpage
+- Le résumé par service compte correctement create/update/replace/delete
+"""
+
+import sys
+import io
+import json
+from pathlib import Path
+
+# Ajouter src au path Python
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+import pytest
+from infrastructure.json_stream import iter_json_array
+from infrastructure.executors.plan_analyzer import PlanAnalyzer, classify_actions, SHARED
+
+PLAN_FIXTURE = Path(__file__).parent / "fixtures" / "terraform_cassette.plan.json"
+
+
+class TestJsonStream:
+    """Tests pour iter_json_array"""
+
+    DOCUMENT = {
+        "decoy": 'text with "resource_changes": [ inside',
+        "nested": {"resource_changes": [{"address": "wrong"}]},
+        "resource_changes": [{"address": "a.b", "value": "quote \" and \\ backslash"}, {"n": 12345}],
+        "after": [1, 2, 3]
+    }
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 65536])
+    def test_streams_top_level_array(self, chunk_size):
+        """Test que seul le tableau de premier niveau est lu, quel que soit le découpage"""
+        text = json.dumps(self.DOCUMENT)
+        items = list(iter_json_array(io.StringIO(text), "resource_changes", chunk_size))
+        assert items == self.DOCUMENT["resource_changes"]
+
+    @pytest.mark.parametrize("number", ["12.5", "1e10", "-3.25E-2", "123456"])
+    def test_number_across_chunk_boundary(self, number):
+        """Test qu'un nombre coupé en fin de fenêtre ("12." puis "5") est décodé en entier"""
+        prefix = '{"resource_changes": ['
+        text = prefix + number + ', 7]}'
+        for cut in range(1, len(number)):
+            # La première lecture s'arrête au milieu du nombre
+            items = list(iter_json_array(io.StringIO(text), "resource_changes", len(prefix) + cut))
+            assert items == [json.loads(number), 7]
+
+    def test_missing_key(self):
+        """Test qu'une clé absente ne produit aucun élément"""
+        text = json.dumps(self.DOCUMENT)
+        assert list(iter_json_array(io.StringIO(text), "missing")) == []
+
+    def test_is_lazy(self):
+        """Test que les éléments sont produits au fil de la lecture"""
+        text = '{"resource_changes": [{"a": 1}, {"a": 2}, BROKEN'
+        items = iter_json_array(io.StringIO(text), "resource_changes", chunk_size=4)
+        assert next(items) == {"a": 1}
+        assert next(items) == {"a": 2}
+
+
+class TestPlanAnalyzer:
+    """Tests pour PlanAnalyzer"""
+
+    RESOURCES = {
+        "backend": ["aws_instance.backend", "aws_security_group.backend_sg"],
+        "database": ["aws_db_instance.database"]
+    }
+
+    def test_classify_actions(self):
+        """Test de la classification des actions Terraform"""
+        assert classify_actions(["create"]) == "create"
+        assert classify_actions(["delete", "create"]) == "replace"
+        assert classify_actions(["create", "delete"]) == "replace"
+        assert classify_actions(["no-op"]) is None
+        assert classify_actions(["read"]) is None
+
+    def test_service_for(self):
+        """Test de l'attribution des adresses aux services"""
+        analyzer = PlanAnalyzer(self.RESOURCES)
+        assert analyzer.service_for("aws_instance.backend") == "backend"
+        assert analyzer.service_for("aws_lb.backend_lb") == "backend"
+        assert analyzer.service_for("aws_subnet.public[0]") == SHARED
+
+    def test_summary(self):
+        """Test du résumé par service sur un plan enregistré"""
+        summary = PlanAnalyzer(self.RESOURCES).analyze(PLAN_FIXTURE)
+
+        assert summary.services["backend"] == {"create": 0, "update": 1, "replace": 1, "delete": 0}
+        assert summary.services[SHARED]["create"] == 2
+        assert "database" not in summary.services  # no-op
+        assert summary.totals() == {"create": 2, "update": 1, "replace": 1, "delete": 0}
+        assert summary.resource_types["aws_instance"]["replace"] == 1
+
+    def test_replacement_reasons(self):
+        """Test que les raisons de remplacement sont conservées"""
+        summary = PlanAnalyzer(self.RESOURCES).analyze(PLAN_FIXTURE)
+        assert summary.replacements == [{
+            "service": "backend",
+            "address": "aws_instance.backend",
+            "reason": "replace_because_cannot_update",
+            "attributes": "user_data"
+        }]
@@ -0,0 +1,182 @@
+"""
+Tests pour la classification des échecs Terraform et les retries.
+
+Ces tests vérifient que :
+- Les erreurs de throttling AWS sont reconnues comme transitoires
+- L'exécuteur réessaie avec backoff et réduit -parallelism
+- Les erreurs permanentes ne sont pas réessayées
+"""
+
+import sys
+import json
+import random
+from pathlib import Path
+
+# Ajouter src au path Python
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+import pytest
+from infrastructure.executors.retry import (
+    RetryPolicy, classify_failure, with_parallelism, THROTTLED, TRANSIENT, PERMANENT
+)
+from infrastructure.executors.runners import CommandRunner, CommandResult
+from infrastructure.executors.terraform_executor import TerraformExecutor
+from infrastructure.timing_store import parse_apply_log
+
+
+class ScriptedRunner(CommandRunner):
+    """Runner qui renvoie une suite de résultats prédéfinis"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.commands = []
+
+    def run(self, command, cwd, stdout_path=None):
+        self.commands.append(command)
+        returncode, output = self.results.pop(0)
+        return CommandResult(command, returncode, output, 1.0)
+
+
+class JsonLogRunner(ScriptedRunner):
+    """ScriptedRunner dont chaque tentative écrit un événement apply_complete sur stdout"""
+
+    def run(self, command, cwd, stdout_path=None):
+        result = super().run(command, cwd, stdout_path)
+        if stdout_path is not None:
+            event = {
+                "type": "apply_complete",
+                "hook": {"resource": {"addr": f"aws_instance.n{len(self.commands)}", "resource_type": "aws_instance"},
+                         "action": "create", "elapsed_seconds": 10},
+            }
+            # Pas de saut de ligne final : tentative interrompue
+            Path(stdout_path).write_text(json.dumps(event))
+        return result
+
+
+def make_policy(**kwargs) -> RetryPolicy:
+    """Politique sans attente réelle et déterministe"""
+    return RetryPolicy(sleep=lambda seconds: None, rng=random.Random(0), **kwargs)
+
+
+class TestClassification:
+    """Tests pour classify_failure"""
+
+    def test_throttling(self):
+        """Test des codes de throttling AWS"""
+        assert classify_failure("Error: creating EC2 Instance: RequestLimitExceeded: Request limit exceeded.") == THROTTLED
+        assert classify_failure("api error Throttling: Rate exceeded") == THROTTLED
+
+    def test_transient(self):
+        """Test des erreurs réseau"""
+        assert classify_failure("read tcp 10.0.0.1:443: connection reset by peer") == TRANSIENT
+
+    def test_permanent(self):
+        """Test d'une erreur de configuration"""
+        assert classify_failure('Error: Reference to undeclared resource "aws_lb.x"') == PERMANENT
+
+
+class TestRetryPolicy:
+    """Tests pour RetryPolicy"""
+
+    def test_delay_is_bounded(self):
+        """Test que le backoff reste sous le plafond exponentiel"""
+        policy = make_policy(base_delay=2.0, max_delay=10.0)
+        for attempt in range(1, 8):
+            assert 0 <= policy.delay(attempt) <= min(10.0, 2.0 * 2 ** (attempt - 1))
+
+    def test_parallelism_halves(self):
+        """Test de la réduction de parallélisme"""
+        policy = make_policy()
+        assert policy.next_parallelism(10) == 5
+        assert policy.next_parallelism(1) == 1
+
+    def test_with_parallelism_replaces_flag(self):
+        """Test que le flag -parallelism est remplacé, pas dupliqué"""
+        command = with_parallelism(["terraform", "apply", "-parallelism=5"], 2)
+        assert command == ["terraform", "apply", "-parallelism=2"]
+
+    def test_with_parallelism_goes_before_plan_file(self):
+        """Test que le flag reste avant le fichier de plan"""
+        command = with_parallelism(["terraform", "apply", "-auto-approve", ".deploy/tfplan"], 5)
+        assert command == ["terraform", "apply", "-auto-approve", "-parallelism=5", ".deploy/tfplan"]
+
+
+class TestExecutorRetries:
+    """Tests des retries dans TerraformExecutor"""
+
+    def test_throttled_apply_is_retried_with_lower_parallelism(self, tmp_path):
+        """Test qu'un apply throttlé est relancé avec moins de parallélisme"""
+        runner = ScriptedRunner([
+            (1, "Error: RequestLimitExceeded"),
+            (1, "Error: Throttling: Rate exceeded"),
+            (0, "Apply complete!"),
+        ])
+        executor = TerraformExecutor(tmp_path, runner=runner, retry_policy=make_policy())
+
+        assert executor.apply()
+        assert runner.commands[1][-1] == "-parallelism=5"
+        assert runner.commands[2][-1] == "-parallelism=2"
+        assert executor.retries == 2
+        assert executor.retry_seconds >= 2.0  # two failed attempts of 1s each
+
+    def test_saved_plan_is_planned_again_before_retry(self, tmp_path):
+        """Test qu'un apply de plan sauvegardé re-planifie avant de réessayer"""
+        runner = ScriptedRunner([
+            (1, "Error: RequestLimitExceeded"),
+            (0, "Plan: 1 to add"),
+            (0, "Apply complete!"),
+        ])
+        executor = TerraformExecutor(tmp_path, runner=runner, retry_policy=make_policy())
+
+        assert executor.apply(plan_file=".deploy/tfplan")
+        assert runner.commands[0][-1] == ".deploy/tfplan"
+        assert runner.commands[1][:4] == ["terraform", "plan", "-input=false", "-out=.deploy/tfplan"]
+        assert "-parallelism=5" in runner.commands[1]
+        assert runner.commands[2][-2:] == ["-parallelism=5", ".deploy/tfplan"]
+
+    def test_apply_log_keeps_every_attempt(self, tmp_path):
+        """Test que le log -json garde les ressources appliquées par les tentatives échouées"""
+        runner = JsonLogRunner([
+            (1, "Error: RequestLimitExceeded"),
+            (0, "Apply complete!"),
+        ])
+        executor = TerraformExecutor(tmp_path, runner=runner, retry_policy=make_policy())
+        log = tmp_path / "apply.jsonl"
+        log.write_text("run précédent\n")
+
+        assert executor.apply(json_log=log)
+        addresses = [record["address"] for record in parse_apply_log(log)]
+        assert addresses == ["aws_instance.n1", "aws_instance.n2"]
+        assert "run précédent" not in log.read_text()
+        assert not (tmp_path / "apply.jsonl.attempt").exists()
+
+    def test_permanent_failure_is_not_retried(self, tmp_path):
+        """Test qu'une erreur permanente échoue immédiatement"""
+        runner = ScriptedRunner([(1, "Error: Invalid reference")])
+        executor = TerraformExecutor(tmp_path, runner=runner, retry_policy=make_policy())
+
+        assert not executor.plan()
+        assert len(runner.commands) == 1
+
+    def test_gives_up_after_max_attempts(self, tmp_path):
+        """Test de l'abandon après le nombre maximum de tentatives"""
+        runner = ScriptedRunner([(1, "i/o timeout")] * 3)
+        executor = TerraformExecutor(tmp_path, runner=runner, retry_policy=make_policy(max_attempts=3))
+
+        assert not executor.init()
+        assert len(runner.commands) == 3
+        # init n'a pas de -parallelism
+        assert all(command == ["terraform", "init"] for command in runner.commands)
+
+    def test_throttled_refresh_keeps_parallelism_cap(self, tmp_path):
+        """Test que le parallélisme réduit part du plafond demandé, et que le code 2 n'est pas un échec"""
+        runner = ScriptedRunner([
+            (1, "Error: RequestLimitExceeded"),
+            (2, ""),
+        ])
+        executor = TerraformExecutor(tmp_path, runner=runner, retry_policy=make_policy())
+
+        assert executor.plan_refresh_only(tmp_path / "drift.jsonl", parallelism=4) == 2
+        assert runner.commands[0][-1] == "-parallelism=4"
+        assert runner.commands[1][-1] == "-parallelism=2"
@@ -0,0 +1,90 @@
+"""
+Tests unitaires pour les métadonnées de workspace (.deploy/).
+
+Ces tests vérifient que :
+- L'empreinte change quand les fichiers générés ou le state changent
+- Le chemin rapide "rien n'a changé" est correctement détecté
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+from shutil import rmtree
+
+# Ajouter src au path Python
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+import pytest
+from infrastructure.workspace import Workspace
+
+
+class TestWorkspace:
+    """Tests pour Workspace"""
+
+    def setup_method(self):
+        """Setup avant chaque test"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        (self.test_dir / "main.tf").write_text('provider "aws" {}\n')
+        (self.test_dir / "vpc.tf").write_text('resource "aws_vpc" "main" {}\n')
+
+    def teardown_method(self):
+        """Cleanup après chaque test"""
+        if self.test_dir.exists():
+            rmtree(self.test_dir)
+
+    def write_state(self, serial: int):
+        """Écrit un terraform.tfstate minimal"""
+        state = {"version": 4, "terraform_version": "1.6.0", "serial": serial,
+                 "lineage": "abc-123", "outputs": {}, "resources": []}
+        (self.test_dir / "terraform.tfstate").write_text(json.dumps(state))
+
+    def test_tree_hash_is_stable(self):
+        """Test que le hash ne dépend que du contenu"""
+        workspace = Workspace(self.test_dir)
+        assert workspace.tree_hash() == workspace.tree_hash()
+
+    def test_tree_hash_changes_on_edit(self):
+        """Test que modifier un fichier .tf change le hash"""
+        workspace = Workspace(self.test_dir)
+        before = workspace.tree_hash()
+        (self.test_dir / "vpc.tf").write_text('resource "aws_vpc" "other" {}\n')
+        assert workspace.tree_hash() != before
+
+    def test_state_identity(self):
+        """Test lecture du serial et du lineage"""
+        self.write_state(7)
+        identity = Workspace(self.test_dir).state_identity()
+        assert identity == {"serial": 7, "lineage": "abc-123"}
+
+    def test_state_identity_without_state(self):
+        """Test sans terraform.tfstate"""
+        identity = Workspace(self.test_dir).state_identity()
+        assert identity["serial"] is None
+
+    def test_not_up_to_date_without_fingerprint(self):
+        """Test qu'un workspace jamais déployé n'est pas à jour"""
+        assert not Workspace(self.test_dir).is_up_to_date()
+
+    def test_up_to_date_after_record(self):
+        """Test que l'empreinte enregistrée court-circuite le déploiement"""
+        self.write_state(3)
+        workspace = Workspace(self.test_dir)
+        workspace.record_fingerprint()
+        assert workspace.is_up_to_date()
+
+    def test_state_change_invalidates_fingerprint(self):
+        """Test qu'un nouveau serial invalide l'empreinte"""
+        self.write_state(3)
+        workspace = Workspace(self.test_dir)
+        workspace.record_fingerprint()
+        self.write_state(4)
+        assert not workspace.is_up_to_date()
+
+    def test_config_change_invalidates_fingerprint(self):
+        """Test qu'un fichier généré modifié invalide l'empreinte"""
+        workspace = Workspace(self.test_dir)
+        workspace.record_fingerprint()
+        (self.test_dir / "backend_asg.tf").write_text("# new service\n")
+        assert not workspace.is_up_to_date()